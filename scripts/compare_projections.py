@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from typing import Any, Dict, List
+
+from authorship_attribution.train import train
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(
+        description="Train once per projection backend and compare fit time, "
+        "bundle size and validation AUC."
+    )
+    p.add_argument("--csv", required=True)
+    p.add_argument("--out-dir", default="aa_projection_runs")
+    p.add_argument("--text-col", default="text")
+    p.add_argument("--author-col", default="author")
+    p.add_argument(
+        "--backends", default="svd,svd_sample,random", help="Comma-separated backends"
+    )
+    p.add_argument("--svd-dim", type=int, default=256)
+    p.add_argument("--max-char-features", type=int, default=50_000)
+    p.add_argument("--projection-sample", type=int, default=10_000)
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+
+    rows: List[Dict[str, Any]] = []
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        res = train(
+            csv_path=args.csv,
+            text_col=args.text_col,
+            author_col=args.author_col,
+            out_dir=os.path.join(args.out_dir, backend),
+            svd_dim=args.svd_dim,
+            max_char_features=args.max_char_features,
+            seed=args.seed,
+            projection=backend,
+            projection_sample=args.projection_sample,
+            use_cache=False,  # fit time must be measured, not loaded
+        )
+        rows.append({**res["projection"], "val_f1": res["val_f1"]})
+
+    print(f"{'backend':<12}{'fit_s':>10}{'bundle_MB':>12}{'val_auc':>10}{'val_f1':>10}")
+    for r in rows:
+        print(
+            f"{r['backend']:<12}{r['fit_seconds']:>10.2f}"
+            f"{r['bundle_bytes'] / 1e6:>12.2f}{r['val_auc']:>10.4f}{r['val_f1']:>10.4f}"
+        )
+    with open(os.path.join(args.out_dir, "projection_comparison.json"), "w") as f:
+        json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
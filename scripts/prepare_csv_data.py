@@ -2,11 +2,137 @@
 from __future__ import annotations
 
 import argparse
+import io
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
+from typing import Deque, List, Set, Tuple
 
 import pandas as pd
 
 
+def setup_logging(level: str) -> None:
+    lvl = getattr(logging, level.upper(), logging.INFO)
+    logging.basicConfig(
+        level=lvl,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+
+def _record_boundary(block: bytes, last: bool) -> int | None:
+    """
+    Offset just past a newline that ends a CSV record (first or last one in
+    `block`). A newline ends a record iff an even number of quote chars
+    precede it, since quoted fields (incl. "" escapes) contain pairs.
+    """
+    if last:
+        total = block.count(b'"')
+        i = block.rfind(b"\n")
+        while i != -1:
+            if (total - block.count(b'"', i + 1)) % 2 == 0:
+                return i + 1
+            i = block.rfind(b"\n", 0, i)
+    else:
+        i = block.find(b"\n")
+        while i != -1:
+            if block.count(b'"', 0, i) % 2 == 0:
+                return i + 1
+            i = block.find(b"\n", i + 1)
+    return None
+
+
+def split_csv_ranges(source: Path, block_size: int) -> Tuple[int, List[Tuple[int, int]]]:
+    """
+    Scan the file once (at C speed) and cut it into record-aligned byte
+    ranges of about `block_size` bytes. Returns (header_end, ranges).
+    """
+    size = source.stat().st_size
+    ranges: List[Tuple[int, int]] = []
+    with source.open("rb") as f:
+        header_end = None
+        n = block_size
+        while header_end is None:
+            f.seek(0)
+            block = f.read(n)
+            header_end = _record_boundary(block, last=False)
+            if header_end is None and len(block) < n:
+                header_end = len(block)  # header only, no trailing newline
+            n *= 2
+
+        pos = header_end
+        n = block_size
+        while pos < size:
+            f.seek(pos)
+            block = f.read(n)
+            if pos + len(block) >= size:
+                ranges.append((pos, size))
+                break
+            cut = _record_boundary(block, last=True)
+            if cut is None:
+                n *= 2  # a single record is longer than the block
+                continue
+            ranges.append((pos, pos + cut))
+            pos += cut
+            n = block_size
+    return header_end, ranges
+
+
+def _parse_range(
+    task: Tuple[int, Path, int, int, List[str], str, str, int, Path],
+) -> Tuple[int, Counter[str], Counter[str], int]:
+    """
+    Parse one byte range, count authors and spill long texts to a pickle.
+
+    Returns (index, counts of all non-null rows, counts of rows passing the
+    length filter, parsed rows).
+    """
+    idx, source, start, end, columns, author_col, text_col, min_len, spill = task
+    usecols = [author_col, text_col]
+    with source.open("rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    try:
+        df = pd.read_csv(
+            io.BytesIO(data),
+            header=None,
+            names=columns,
+            usecols=usecols,
+            dtype="string",  # type: ignore[arg-type]
+        )
+    except pd.errors.EmptyDataError:
+        df = pd.DataFrame({c: pd.Series(dtype="string") for c in columns})[usecols]
+    rows = len(df)
+    df = df.dropna(subset=usecols)
+    df = df.rename(columns={author_col: "author", text_col: "text"})
+    counts_all: Counter[str] = Counter(df["author"].value_counts().to_dict())
+    df = df[df["text"].str.len().ge(min_len)]
+    counts_long: Counter[str] = Counter(df["author"].value_counts().to_dict())
+    df.to_pickle(spill)
+    return idx, counts_all, counts_long, rows
+
+
+_KEEP_AUTHORS: Set[str] = set()
+
+
+def _init_writer(keep_authors: Set[str]) -> None:
+    global _KEEP_AUTHORS
+    _KEEP_AUTHORS = keep_authors
+
+
+def _write_part(task: Tuple[Path, Path]) -> int:
+    spill, part = task
+    df = pd.read_pickle(spill)
+    df = df[df["author"].isin(_KEEP_AUTHORS)]
+    df.to_csv(part, index=False, header=False)
+    return len(df)
+
+
 def prepare_csv_data(
     source: Path,
     out_csv: Path,
@@ -14,35 +140,126 @@ def prepare_csv_data(
     text_col: str = "reviewText",
     min_review_count: int = 3,
     min_review_length: int = 200,
+    workers: int = 1,
+    block_size: int = 64 << 20,
+    count_after_length_filter: bool = False,
+    spill_dir: Path | None = None,
 ) -> int:
     """
     Prepare CSV review data by filtering authors and reviews.
 
     - Keeps rows with non-null author/text.
-    - Keeps authors with at least `min_review_count` reviews.
+    - Keeps authors with at least `min_review_count` reviews (counted over
+      all non-null rows, or only over rows passing the length filter when
+      `count_after_length_filter` is set).
     - Keeps texts of length >= `min_review_length`.
     - Writes a CSV with columns: author, text.
 
+    The source is cut into record-aligned byte ranges that worker processes
+    parse in parallel; long texts are spilled per range and written out in
+    source order once the author counts are reduced, so memory stays near
+    one block per worker plus the author counts.
+
     Returns:
         Number of rows written.
     """
     if not source.is_file():
         raise FileNotFoundError(f"Input file not found: {source}")
+    logger = logging.getLogger(__name__)
 
     usecols = [author_col, text_col]
-    df = pd.read_csv(source, usecols=usecols, dtype="string")  # type: ignore[arg-type]
-    df = df.dropna(subset=usecols).copy()
-    df = df.rename(columns={author_col: "author", text_col: "text"})
-    df["text"] = df["text"].astype(str)
+    columns = pd.read_csv(source, nrows=0).columns.tolist()
+    missing = [c for c in usecols if c not in columns]
+    if missing:
+        raise KeyError(f"Missing required columns in input: {missing}")
 
-    counts = df["author"].value_counts()
-    keep_authors = set(counts[counts >= min_review_count].index)
-    df = df[df["author"].isin(keep_authors)].copy()
-    df = df[df["text"].str.len().ge(min_review_length)].copy()
+    t0 = time.perf_counter()
+    _, ranges = split_csv_ranges(source, block_size)
+    total_bytes = sum(b - a for a, b in ranges)
+    logger.info(
+        "Split %s into %d ranges in %.1fs",
+        f"{total_bytes:,} bytes",
+        len(ranges),
+        time.perf_counter() - t0,
+    )
 
     out_csv.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(out_csv, index=False)
-    return len(df)
+    tmp_root = Path(
+        tempfile.mkdtemp(prefix="prepare_csv_", dir=spill_dir or out_csv.parent)
+    )
+    try:
+        spills = [tmp_root / f"range_{i:05d}.pkl" for i in range(len(ranges))]
+        counts_all: Counter[str] = Counter()
+        counts_long: Counter[str] = Counter()
+        total_rows = done_bytes = 0
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as ex:
+            # Bound the number of in-flight ranges to keep memory flat
+            pending: Deque[Future] = deque()
+
+            def reduce_one() -> None:
+                nonlocal total_rows, done_bytes
+                idx, c_all, c_long, rows = pending.popleft().result()
+                counts_all.update(c_all)
+                counts_long.update(c_long)
+                total_rows += rows
+                done_bytes += ranges[idx][1] - ranges[idx][0]
+                elapsed = max(time.perf_counter() - t0, 1e-9)
+                logger.info(
+                    "Parse | %.1f%% rows=%s authors=%s | %s rows/s %.1f MB/s",
+                    100.0 * done_bytes / max(1, total_bytes),
+                    f"{total_rows:,}",
+                    f"{len(counts_all):,}",
+                    f"{total_rows / elapsed:,.0f}",
+                    done_bytes / elapsed / 1e6,
+                )
+
+            for i, (a, b) in enumerate(ranges):
+                task = (
+                    i, source, a, b, columns, author_col, text_col,
+                    min_review_length, spills[i],
+                )  # fmt: skip
+                pending.append(ex.submit(_parse_range, task))
+                if len(pending) >= 2 * max(1, workers):
+                    reduce_one()
+            while pending:
+                reduce_one()
+
+        counts = counts_long if count_after_length_filter else counts_all
+        keep_authors = {a for a, c in counts.items() if c >= min_review_count}
+        del counts_all, counts_long, counts
+        logger.info(
+            "Authors meeting min_review_count=%d: %s",
+            min_review_count,
+            f"{len(keep_authors):,}",
+        )
+
+        parts = [tmp_root / f"part_{i:05d}.csv" for i in range(len(ranges))]
+        with ProcessPoolExecutor(
+            max_workers=max(1, workers),
+            initializer=_init_writer,
+            initargs=(keep_authors,),
+        ) as ex:
+            written = sum(ex.map(_write_part, zip(spills, parts)))
+
+        header = [c for c in columns if c in usecols]
+        header = ["author" if c == author_col else "text" for c in header]
+        with out_csv.open("w", encoding="utf-8", newline="") as out:
+            pd.DataFrame(columns=header).to_csv(out, index=False)
+            for part in parts:
+                with part.open("r", encoding="utf-8", newline="") as src:
+                    shutil.copyfileobj(src, out, 1 << 24)
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+    elapsed = time.perf_counter() - t0
+    logger.info(
+        "Done | rows=%s written=%s in %.1fs (%s rows/s)",
+        f"{total_rows:,}",
+        f"{written:,}",
+        elapsed,
+        f"{total_rows / max(elapsed, 1e-9):,.0f}",
+    )
+    return written
 
 
 def parse_args() -> argparse.Namespace:
@@ -57,11 +274,26 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--text-col", type=str, default="reviewText")
     p.add_argument("--min-review-count", type=int, default=3)
     p.add_argument("--min-review-length", type=int, default=200)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument(
+        "--block-mb", type=int, default=64, help="Approximate bytes per parse range."
+    )
+    p.add_argument(
+        "--count-after-length-filter",
+        action="store_true",
+        help="Count only reviews that pass --min-review-length toward "
+        "--min-review-count (like prepare_json_data.py).",
+    )
+    p.add_argument("--spill-dir", type=Path, default=None)
+    p.add_argument(
+        "--log-level", type=str, default="INFO", help="DEBUG, INFO, WARNING, ERROR"
+    )
     return p.parse_args()
 
 
 def main() -> None:
     args = parse_args()
+    setup_logging(args.log_level)
     written = prepare_csv_data(
         source=args.source,
         out_csv=args.out,
@@ -69,6 +301,10 @@ def main() -> None:
         text_col=args.text_col,
         min_review_count=args.min_review_count,
         min_review_length=args.min_review_length,
+        workers=args.workers,
+        block_size=args.block_mb << 20,
+        count_after_length_filter=args.count_after_length_filter,
+        spill_dir=args.spill_dir,
     )
     print(f"Wrote {written} rows to {args.out}")
 
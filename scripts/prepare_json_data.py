@@ -2,13 +2,28 @@
 from __future__ import annotations
 
 import argparse
+import csv
+import json
 import logging
+import os
+import resource
+import shutil
+import tempfile
+import time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable, List, Set
+from typing import Dict, Iterable, List, Set, Tuple
 
 import pandas as pd
 
+try:  # optional, much faster JSON parsing
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on environment
+    _json_loads = json.loads
+
 
 def setup_logging(level: str) -> None:
     lvl = getattr(logging, level.upper(), logging.INFO)
@@ -175,6 +190,204 @@ def compute_keep_authors(counts: Counter[str], min_review_count: int) -> Set[str
     return keep
 
 
+# ---------------- single-pass parallel mode ---------------- #
+
+
+def split_byte_ranges(source: Path, n_ranges: int) -> List[Tuple[int, int]]:
+    """
+    Split the file into ~equal byte ranges that start at line boundaries.
+    """
+    size = source.stat().st_size
+    bounds = [0]
+    with source.open("rb") as f:
+        for k in range(1, n_ranges):
+            f.seek(max(bounds[-1], size * k // n_ranges))
+            f.readline()  # move to the start of the next line
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _spill_range(
+    task: Tuple[int, Path, int, int, Path, int, List[str]],
+) -> Tuple[int, Counter[str], int, int]:
+    """
+    Parse one byte range and spill length-filtered (author, text) rows.
+
+    Rows keep source order within the range, and ranges are emitted in
+    order, so the final output matches the two-pass script row for row.
+    """
+    idx, source, start, end, spill, min_review_length, required_cols = task
+    author_key, text_key = required_cols
+    counts: Counter[str] = Counter()
+    rows = kept = 0
+    with source.open("rb") as f, spill.open("w", encoding="utf-8", newline="") as out:
+        writer = csv.writer(out, lineterminator="\n")
+        f.seek(start)
+        pos = start
+        for line in f:
+            pos += len(line)
+            if line.strip():
+                rows += 1
+                obj = _json_loads(line)
+                author, text = obj.get(author_key), obj.get(text_key)
+                if author is not None and text is not None:
+                    author, text = str(author), str(text)
+                    if len(text) >= min_review_length:
+                        writer.writerow((author, text))
+                        counts[author] += 1
+                        kept += 1
+            if pos >= end:
+                break
+    return idx, counts, rows, kept
+
+
+_KEEP_AUTHORS: Set[str] = set()
+
+
+def _init_filter_worker(keep_authors: Set[str]) -> None:
+    global _KEEP_AUTHORS
+    _KEEP_AUTHORS = keep_authors
+
+
+def _filter_spill(task: Tuple[Path, Path]) -> int:
+    spill, part = task
+    written = 0
+    with spill.open("r", encoding="utf-8", newline="") as src, part.open(
+        "w", encoding="utf-8", newline=""
+    ) as out:
+        writer = csv.writer(out, lineterminator="\n")
+        for row in csv.reader(src):
+            if row[0] in _KEEP_AUTHORS:
+                writer.writerow(row)
+                written += 1
+    return written
+
+
+def _peak_rss_mb() -> Tuple[float, float]:
+    # ru_maxrss is in KiB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+
+def _write_output(parts: List[Path], out_path: Path) -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if out_path.suffix.lower() != ".parquet":
+        with out_path.open("wb") as out:
+            out.write(b"author,text\n")
+            for part in parts:
+                with part.open("rb") as src:
+                    shutil.copyfileobj(src, out, 1 << 24)
+        return
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:  # optional dependency
+        raise ImportError("Writing Parquet output requires pyarrow.") from e
+    schema = pa.schema([("author", pa.string()), ("text", pa.string())])
+    with pq.ParquetWriter(out_path, schema) as writer:
+        for part in parts:
+            df = pd.read_csv(
+                part,
+                names=["author", "text"],
+                dtype="string",  # type: ignore[arg-type]
+                keep_default_na=False,
+            )
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+
+
+def prepare_parallel(
+    source: Path,
+    out_path: Path,
+    min_review_count: int,
+    min_review_length: int,
+    workers: int,
+    required_cols: List[str],
+    spill_dir: Path | None = None,
+) -> int:
+    """
+    Read the source once: byte ranges are parsed in a process pool and their
+    length-filtered rows spilled to disk, then per-range spills are filtered
+    by `min_review_count` in parallel and concatenated in source order.
+    """
+    logger = logging.getLogger(__name__)
+    t0 = time.perf_counter()
+    ranges = split_byte_ranges(source, max(1, workers) * 4)
+    tmp_root = Path(
+        tempfile.mkdtemp(prefix="prepare_json_", dir=spill_dir or out_path.parent)
+    )
+    try:
+        tasks = [
+            (i, source, a, b, tmp_root / f"range_{i:05d}.csv", min_review_length, required_cols)
+            for i, (a, b) in enumerate(ranges)
+        ]
+        counts: Counter[str] = Counter()
+        total_rows = total_kept = 0
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for done, (_, c, rows, kept) in enumerate(ex.map(_spill_range, tasks), 1):
+                counts.update(c)
+                total_rows += rows
+                total_kept += kept
+                elapsed = time.perf_counter() - t0
+                logger.info(
+                    "Parse | ranges=%d/%d rows=%s len>= %d rows=%s | %s rows/s",
+                    done,
+                    len(tasks),
+                    f"{total_rows:,}",
+                    min_review_length,
+                    f"{total_kept:,}",
+                    f"{total_rows / max(elapsed, 1e-9):,.0f}",
+                )
+        t_parse = time.perf_counter() - t0
+        logger.info(
+            "Parse complete | total_rows=%s unique_authors=%s in %.1fs (%s rows/s)",
+            f"{total_rows:,}",
+            f"{len(counts):,}",
+            t_parse,
+            f"{total_rows / max(t_parse, 1e-9):,.0f}",
+        )
+
+        keep_authors = compute_keep_authors(counts, min_review_count)
+        expected_rows = sum(counts[a] for a in keep_authors)
+        del counts
+        logger.info("Expected rows to write (after filters): %s", f"{expected_rows:,}")
+
+        parts = [tmp_root / f"part_{i:05d}.csv" for i in range(len(tasks))]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_filter_worker,
+            initargs=(keep_authors,),
+        ) as ex:
+            written = sum(ex.map(_filter_spill, zip((t[4] for t in tasks), parts)))
+        _write_output(parts, out_path)
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+    elapsed = time.perf_counter() - t0
+    own_mb, child_mb = _peak_rss_mb()
+    logger.info(
+        "Write complete | written_rows=%s -> %s | total %.1fs (%s rows/s) | "
+        "peak RSS main=%.0f MiB worker=%.0f MiB",
+        f"{written:,}",
+        out_path,
+        elapsed,
+        f"{total_rows / max(elapsed, 1e-9):,.0f}",
+        own_mb,
+        child_mb,
+    )
+    if written != expected_rows:
+        logger.warning(
+            "Wrote %s rows, but expected %s.", f"{written:,}", f"{expected_rows:,}"
+        )
+    return written
+
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Prepare Yelp reviews CSV with low memory.")
     p.add_argument(
@@ -186,6 +399,19 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--min-review-count", type=int, default=4)
     p.add_argument("--min-review-length", type=int, default=500)
     p.add_argument("--chunksize", type=int, default=1_000_000)
+    p.add_argument(
+        "--mode",
+        choices=["parallel", "two-pass"],
+        default="parallel",
+        help="parallel: one read, multi-core; two-pass: pandas chunks on one core",
+    )
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument(
+        "--spill-dir",
+        type=Path,
+        default=None,
+        help="Directory for temporary spill files (default: next to --out).",
+    )
     p.add_argument(
         "--log-level", type=str, default="DEBUG", help="DEBUG, INFO, WARNING, ERROR"
     )
@@ -198,16 +424,31 @@ def main() -> None:
     logger = logging.getLogger(__name__)
 
     logger.info(
-        "Config | source=%s out=%s min_count=%d min_length=%d chunksize=%s",
+        "Config | source=%s out=%s min_count=%d min_length=%d chunksize=%s mode=%s workers=%d",
         args.source,
         args.out,
         args.min_review_count,
         args.min_review_length,
         f"{args.chunksize:,}",
+        args.mode,
+        args.workers,
     )
 
     validate_source(args.source)
 
+    if args.mode == "parallel":
+        prepare_parallel(
+            source=args.source,
+            out_path=args.out,
+            min_review_count=args.min_review_count,
+            min_review_length=args.min_review_length,
+            workers=args.workers,
+            required_cols=["user_id", "text"],
+            spill_dir=args.spill_dir,
+        )
+        logger.info("Done.")
+        return
+
     # Pass 1: count reviews per author after length filter
     counts = pass1_count_authors(
         source=args.source,
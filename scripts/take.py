@@ -1,18 +1,181 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import hashlib
+import heapq
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
 import pandas as pd
 
-input_filename = "data/yelp_reviews.csv"
-output_filename = "data/yelp_reviews_small.csv"
-rows_to_keep = 90000
+from authorship_attribution.data import iter_corpus_chunks
+
+
+def setup_logging(level: str) -> None:
+    lvl = getattr(logging, level.upper(), logging.INFO)
+    logging.basicConfig(
+        level=lvl,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+
+def author_hash(author: str, seed: int) -> int:
+    """
+    Deterministic 64-bit hash of an author name (independent of PYTHONHASHSEED).
+    """
+    h = hashlib.blake2b(author.encode("utf-8"), digest_size=8, key=str(seed).encode())
+    return int.from_bytes(h.digest(), "little")
+
+
+@dataclass
+class _AuthorSample:
+    """
+    Texts kept for one author: all of them, or a reservoir of `cap` texts.
+    """
+
+    rng: random.Random
+    seen: int = 0
+    rows: List[Tuple[int, str]] = field(default_factory=list)
+
+    def offer(self, seq: int, text: str, cap: int | None) -> None:
+        self.seen += 1
+        if cap is None or len(self.rows) < cap:
+            self.rows.append((seq, text))
+            return
+        j = self.rng.randrange(self.seen)
+        if j < cap:
+            self.rows[j] = (seq, text)
+
+
+def sample_authors(
+    source: Path,
+    n_authors: int,
+    max_texts_per_author: int | None = None,
+    seed: int = 42,
+    text_col: str = "text",
+    author_col: str = "author",
+    chunksize: int = 100_000,
+) -> Tuple[List[str], List[str]]:
+    """
+    Stream the corpus once and keep `n_authors` whole authors.
+
+    Authors are chosen as the bottom-k by a seeded hash, so the selection
+    is a uniform random sample of authors that does not depend on row order.
+    The admission threshold only decreases, so every selected author was
+    admitted at its first row and keeps all of its texts (or a seeded
+    reservoir of `max_texts_per_author`). Memory is bounded by the sample.
+
+    Returns (authors, texts) in source order.
+    """
+    if n_authors < 1:
+        raise ValueError("n_authors must be >= 1")
+    logger = logging.getLogger(__name__)
+    t0 = time.perf_counter()
 
-try:
-    df = pd.read_csv(input_filename, nrows=rows_to_keep)
-    df.to_csv(output_filename, index=False)
+    selected: Dict[str, _AuthorSample] = {}
+    heap: List[Tuple[int, str]] = []  # max-heap of (-hash, author)
+    seq = 0
+    for authors, texts in iter_corpus_chunks(
+        source, text_col=text_col, author_col=author_col, chunksize=chunksize
+    ):
+        for a, t in zip(authors, texts):
+            seq += 1
+            sample = selected.get(a)
+            if sample is None:
+                h = author_hash(a, seed)
+                if len(heap) >= n_authors:
+                    if h >= -heap[0][0]:
+                        continue
+                    _, evicted = heapq.heapreplace(heap, (-h, a))
+                    del selected[evicted]
+                else:
+                    heapq.heappush(heap, (-h, a))
+                sample = selected[a] = _AuthorSample(rng=random.Random(h ^ seed))
+            sample.offer(seq, t, max_texts_per_author)
+        logger.info(
+            "Scanned rows=%s selected_authors=%s | %s rows/s",
+            f"{seq:,}",
+            f"{len(selected):,}",
+            f"{seq / max(time.perf_counter() - t0, 1e-9):,.0f}",
+        )
 
-    print(
-        f"Successfully created '{output_filename}' with the header and first {rows_to_keep} rows."
+    rows = sorted(
+        (s, a, t) for a, sample in selected.items() for s, t in sample.rows
     )
+    return [a for _, a, _ in rows], [t for _, _, t in rows]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Subsample whole authors from a corpus in one streaming pass."
+    )
+    p.add_argument(
+        "--source",
+        type=Path,
+        default=Path("data/yelp_reviews.csv"),
+        help="CSV, Parquet or NDJSON (optionally compressed).",
+    )
+    p.add_argument("--out", type=Path, default=Path("data/yelp_reviews_small.csv"))
+    p.add_argument("--authors", type=int, default=10_000, help="Authors to keep.")
+    p.add_argument(
+        "--max-texts-per-author",
+        type=int,
+        default=0,
+        help="Reservoir-sample at most this many texts per author (0 = all).",
+    )
+    p.add_argument(
+        "--min-texts",
+        type=int,
+        default=1,
+        help="Drop selected authors with fewer texts (may undershoot --authors).",
+    )
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--text-col", type=str, default="text")
+    p.add_argument("--author-col", type=str, default="author")
+    p.add_argument("--chunksize", type=int, default=100_000)
+    p.add_argument(
+        "--log-level", type=str, default="INFO", help="DEBUG, INFO, WARNING, ERROR"
+    )
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging(args.log_level)
+    logger = logging.getLogger(__name__)
+
+    if not args.source.is_file():
+        raise FileNotFoundError(f"Input file not found: {args.source}")
+
+    authors, texts = sample_authors(
+        args.source,
+        n_authors=args.authors,
+        max_texts_per_author=args.max_texts_per_author or None,
+        seed=args.seed,
+        text_col=args.text_col,
+        author_col=args.author_col,
+        chunksize=args.chunksize,
+    )
+    df = pd.DataFrame({"author": authors, "text": texts})
+    if args.min_texts > 1:
+        counts = df["author"].map(df["author"].value_counts())
+        df = df[counts >= args.min_texts]
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(args.out, index=False)
+    logger.info(
+        "Wrote %s rows from %s authors to %s",
+        f"{len(df):,}",
+        f"{df['author'].nunique():,}",
+        args.out,
+    )
+
 
-except FileNotFoundError:
-    print(f"Error: The file '{input_filename}' was not found.")
-except Exception as e:
-    print(f"An error occurred: {e}")
+if __name__ == "__main__":
+    main()
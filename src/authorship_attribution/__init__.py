@@ -1,7 +1,17 @@
+from authorship_attribution.async_verifier import AsyncVerifier
 from authorship_attribution.models import Verifier
+from authorship_attribution.profiles import AuthorProfile
+from authorship_attribution.registry import ModelRegistry
 from authorship_attribution.train import load_model, train
 
-__all__ = ["train", "load_model", "Verifier"]
+__all__ = [
+    "train",
+    "load_model",
+    "Verifier",
+    "AsyncVerifier",
+    "ModelRegistry",
+    "AuthorProfile",
+]
 
 
 def main() -> None:
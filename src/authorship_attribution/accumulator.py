@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from authorship_attribution.features import (
+    FeatureExtractor,
+    StyleTally,
+    _char_tallies,
+    _word_re,
+)
+
+_ELLIPSIS = 12  # index of the "..." tally in _CHAR_TALLIES
+_ws_run_re = re.compile(r"\s\s+")  # TfidfVectorizer's whitespace collapsing
+_trailing_ws_re = re.compile(r"\s*\Z")
+_trailing_word_re = re.compile(r"[A-Za-z']*\Z")
+_dots_re = re.compile(r"\.{3,}")
+
+_STATE_VERSION = 1
+
+
+class DocumentAccumulator:
+    """
+    Running embedding of one growing document (chat log, forum thread).
+
+    append() updates char n-gram counts in the extractor's vocabulary, the
+    TF-IDF x SVD projection of the changed columns, token/function-word
+    counts and the stylometric tallies, all from the new chunk alone.
+    embedding() equals extractor.transform([full_text])[0] up to float
+    rounding.
+
+    Whatever the next chunk could still change is held back until it
+    arrives: the trailing whitespace run (the vectorizer collapses runs of
+    2+ whitespace into one space), the trailing partial word, and the
+    trailing run of dots ("..." is counted left to right, i.e. len // 3
+    per run of dots).
+    """
+
+    def __init__(self, extractor: FeatureExtractor):
+        if not isinstance(extractor, FeatureExtractor):
+            raise TypeError("DocumentAccumulator needs a fitted FeatureExtractor.")
+        if extractor.window_chars is not None:
+            raise ValueError("Windowed document mode cannot be accumulated.")
+        if extractor.char_vec.norm != "l2" or not extractor.char_vec.sublinear_tf:
+            raise ValueError("Expected a sublinear-tf, l2-normalised char vectorizer.")
+        self.extractor = extractor
+        self._idf = np.asarray(extractor.char_vec.idf_, dtype=np.float64)
+        self._components = extractor.svd.components_  # dense, or sparse (random)
+        self._fingerprint: str | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts: Dict[int, int] = {}  # vocabulary column -> n-gram count
+        self.context = ""  # last (max_n - 1) chars of the committed stream
+        self.pending_ws = ""  # trailing whitespace run, not yet committed
+        self.pending_word = ""  # trailing word characters (lowercased)
+        self.dot_run = 0  # trailing run of '.' in the raw text
+        self.ellipses = 0  # "..." counted in completed dot runs
+        self.tally = StyleTally()
+        self.n_chars = 0
+        self._proj = np.zeros(self.extractor.svd_dim, dtype=np.float64)
+        self._sq = 0.0  # squared norm of the tf-idf row
+
+    def __len__(self) -> int:
+        return self.n_chars
+
+    # -------- tf-idf x svd bookkeeping -------- #
+    def _weights(self, counts: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        w = np.zeros(len(cols), dtype=np.float64)
+        nz = counts > 0
+        w[nz] = (1.0 + np.log(counts[nz])) * self._idf[cols[nz]]
+        return w
+
+    def _change(self, delta: Dict[int, int]) -> Tuple[np.ndarray, float, List[int]]:
+        """
+        (projection change, squared-norm change, new counts) for adding
+        `delta` to the n-gram counts; touches only the changed columns.
+        """
+        cols = np.fromiter(delta, dtype=np.int64, count=len(delta))
+        old = np.array([self.counts.get(c, 0) for c in cols.tolist()], dtype=np.float64)
+        new = old + np.fromiter(delta.values(), dtype=np.float64, count=len(delta))
+        w_old, w_new = self._weights(old, cols), self._weights(new, cols)
+        d_proj = np.asarray(self._components[:, cols] @ (w_new - w_old)).ravel()
+        d_sq = float(w_new @ w_new - w_old @ w_old)
+        return d_proj, d_sq, [int(n) for n in new.tolist()]
+
+    def _apply(self, delta: Dict[int, int]) -> None:
+        if not delta:
+            return
+        d_proj, d_sq, new = self._change(delta)
+        self._proj += d_proj
+        self._sq += d_sq
+        self.counts.update(zip(delta, new))
+
+    def _ngram_delta(self, context: str, seg: str) -> Dict[int, int]:
+        """
+        Vocabulary n-grams of context + seg that end inside seg.
+        """
+        lo, hi = self.extractor.char_ngram_range
+        s = context + seg
+        k = len(context)
+        grams = [
+            s[i : i + n]
+            for n in range(lo, hi + 1)
+            for i in range(max(0, k - n + 1), len(s) - n + 1)
+        ]
+        cols = self.extractor.char_columns(grams)
+        cols, counts = np.unique(cols[cols >= 0], return_counts=True)
+        return dict(zip(cols.tolist(), counts.tolist()))
+
+    def _commit(self, seg: str) -> None:
+        self._apply(self._ngram_delta(self.context, seg))
+        keep = self.extractor.char_ngram_range[1] - 1
+        self.context = (self.context + seg)[-keep:] if keep > 0 else ""
+
+    # -------- appending -------- #
+    def append(self, chunk: str) -> "DocumentAccumulator":
+        if not chunk:
+            return self
+        self.n_chars += len(chunk)
+        lower = chunk.lower()
+
+        # Char n-grams over the vectorizer's view of the text
+        stream = self.pending_ws + (lower if self.extractor.text_lowercase else chunk)
+        cut = _trailing_ws_re.search(stream).start()  # type: ignore[union-attr]
+        if cut > 0:
+            self._commit(_ws_run_re.sub(" ", stream[:cut]))
+        self.pending_ws = stream[cut:]
+
+        if self.extractor.use_function_words:
+            # Tokens: the last word may continue in the next chunk
+            words = self.pending_word + lower
+            cut = _trailing_word_re.search(words).start()  # type: ignore[union-attr]
+            self.tally.add_tokens(_word_re.findall(words[:cut]))
+            self.pending_word = words[cut:]
+
+            # Character tallies; "..." is resolved per run of dots
+            chars = _char_tallies(chunk)
+            chars[_ELLIPSIS] = 0
+            self.tally.chars += chars
+            lead = len(chunk) - len(chunk.lstrip("."))
+            if lead == len(chunk):
+                self.dot_run += lead
+            else:
+                self.ellipses += (self.dot_run + lead) // 3
+                body = chunk[lead:]
+                trail = len(body) - len(body.rstrip("."))
+                middle = body[: len(body) - trail]
+                self.ellipses += sum(len(r) // 3 for r in _dots_re.findall(middle))
+                self.dot_run = trail
+        return self
+
+    def extend(self, chunks: Iterable[str]) -> "DocumentAccumulator":
+        for chunk in chunks:
+            self.append(chunk)
+        return self
+
+    # -------- output -------- #
+    def embedding(self) -> np.ndarray:
+        """
+        (output_dim,) float32 embedding of everything appended so far.
+        """
+        ex = self.extractor
+        proj, sq = self._proj, self._sq
+        if self.pending_ws:
+            # The held-back run ends the document: one char, or one space
+            tail = self.pending_ws if len(self.pending_ws) == 1 else " "
+            delta = self._ngram_delta(self.context, tail)
+            if delta:
+                d_proj, d_sq, _ = self._change(delta)
+                proj, sq = proj + d_proj, sq + d_sq
+        svd_row = proj / np.sqrt(sq) if sq > 0 else np.zeros_like(proj)
+        if not ex.use_function_words:
+            return svd_row.astype(np.float32)
+        if ex.fw_scaler is None:
+            raise RuntimeError(
+                "Function-word scaler not initialized; call fit() first."
+            )
+        tally = StyleTally(
+            fw_counts=self.tally.fw_counts.copy(),
+            n_tokens=self.tally.n_tokens,
+            token_chars=self.tally.token_chars,
+            types=Counter(self.tally.types),
+            chars=self.tally.chars.copy(),
+        )
+        if self.pending_word:
+            tally.add_tokens([self.pending_word])
+        tally.chars[_ELLIPSIS] = self.ellipses + self.dot_run // 3
+        fw = ex.fw_scaler.transform(tally.features()[None, :])[0]
+        return np.concatenate([svd_row, fw]).astype(np.float32)
+
+    # -------- persistence -------- #
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            self._fingerprint = self.extractor.fingerprint()
+        return self._fingerprint
+
+    def state_dict(self) -> Dict[str, Any]:
+        """
+        JSON-serialisable state; restore with from_state() against the same
+        extractor (checked by fingerprint).
+        """
+        return {
+            "version": _STATE_VERSION,
+            "extractor_fingerprint": self.fingerprint(),
+            "counts": [[int(c), n] for c, n in self.counts.items()],
+            "context": self.context,
+            "pending_ws": self.pending_ws,
+            "pending_word": self.pending_word,
+            "dot_run": self.dot_run,
+            "ellipses": self.ellipses,
+            "n_chars": self.n_chars,
+            "fw_counts": self.tally.fw_counts.tolist(),
+            "n_tokens": self.tally.n_tokens,
+            "token_chars": self.tally.token_chars,
+            "types": dict(self.tally.types),
+            "chars": self.tally.chars.tolist(),
+        }
+
+    @classmethod
+    def from_state(
+        cls, extractor: FeatureExtractor, state: Dict[str, Any]
+    ) -> "DocumentAccumulator":
+        if state.get("version") != _STATE_VERSION:
+            raise ValueError("Unsupported accumulator state version.")
+        acc = cls(extractor)
+        if state["extractor_fingerprint"] != acc.fingerprint():
+            raise ValueError("Accumulator state belongs to a different extractor.")
+        acc.context = state["context"]
+        acc.pending_ws = state["pending_ws"]
+        acc.pending_word = state["pending_word"]
+        acc.dot_run = int(state["dot_run"])
+        acc.ellipses = int(state["ellipses"])
+        acc.n_chars = int(state["n_chars"])
+        acc.tally = StyleTally(
+            fw_counts=np.asarray(state["fw_counts"], dtype=np.int64),
+            n_tokens=int(state["n_tokens"]),
+            token_chars=int(state["token_chars"]),
+            types=Counter(state["types"]),
+            chars=np.asarray(state["chars"], dtype=np.int64),
+        )
+        # Rebuilding the projection from the counts also drops any drift
+        acc._apply({int(c): int(n) for c, n in state["counts"]})
+        return acc
+
+    def dumps(self) -> str:
+        return json.dumps(self.state_dict(), ensure_ascii=False)
+
+    @classmethod
+    def loads(cls, extractor: FeatureExtractor, data: str) -> "DocumentAccumulator":
+        return cls.from_state(extractor, json.loads(data))
+
+
+def accumulate(extractor: FeatureExtractor, chunks: List[str]) -> DocumentAccumulator:
+    """
+    Accumulator over `chunks` appended in order.
+    """
+    return DocumentAccumulator(extractor).extend(chunks)
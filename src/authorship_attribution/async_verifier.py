@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from authorship_attribution import runtime
+from authorship_attribution.models import (
+    ModelBundle,
+    Verifier,
+    init_verifier_worker,
+    worker_verifier,
+)
+
+
+def _verify_batch_in_worker(
+    texts_a: List[str], texts_b: List[str]
+) -> List[Dict[str, Any]]:
+    return worker_verifier().verify_batch(texts_a, texts_b)
+
+
+def _verify_bundle_batch(
+    bundle: ModelBundle, texts_a: List[str], texts_b: List[str]
+) -> List[Dict[str, Any]]:
+    return Verifier(bundle).verify_batch(texts_a, texts_b)
+
+
+@dataclass
+class _Request:
+    text_a: str
+    text_b: str
+    future: asyncio.Future
+
+
+class AsyncVerifier:
+    """
+    asyncio front end for a ModelBundle.
+
+    verify() enqueues the pair and awaits its result; a background task
+    drains the queue into micro-batches (up to `max_batch_size` pairs or
+    `max_wait_ms` after the first one) and scores each batch with
+    Verifier.verify_batch in a thread or process pool, so the event loop
+    never runs the TF-IDF/SVD/classifier pass. The queue holds at most
+    `max_queue` pairs: producers awaiting verify() block when it is full.
+    Cancelled or timed-out requests still queued are dropped from batches.
+    """
+
+    def __init__(
+        self,
+        bundle: ModelBundle,
+        executor: str | Executor = "thread",
+        max_workers: int = 1,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        max_queue: int = 1024,
+    ):
+        if max_batch_size < 1 or max_queue < 1 or max_workers < 1:
+            raise ValueError("max_batch_size, max_queue and max_workers must be >= 1")
+        self.bundle = bundle
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+        self.max_workers = max_workers
+        self._verifier = Verifier(bundle)
+        self._own_executor = not isinstance(executor, Executor)
+        # How batches reach the model: "local" calls this process's Verifier
+        # from a pool thread, "worker" uses the bundle loaded by the pool
+        # initializer, "ship" pickles the bundle with every batch (for a
+        # caller-supplied process pool).
+        if executor == "thread":
+            self._executor: Executor = ThreadPoolExecutor(max_workers=max_workers)
+            self._mode = "local"
+        elif executor == "process":
+            self._executor = runtime.process_pool(
+                max_workers, initializer=init_verifier_worker, initargs=(bundle,)
+            )
+            self._mode = "worker"
+        elif isinstance(executor, Executor):
+            self._executor = executor
+            self._mode = "ship" if isinstance(executor, ProcessPoolExecutor) else "local"
+        else:
+            raise ValueError("executor must be 'thread', 'process' or an Executor")
+        self._queue: asyncio.Queue[_Request] | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._batcher: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+        # Requests taken off the queue by the batcher but not yet handed to
+        # a scoring task; aclose() fails them if it cancels the batcher
+        self._held: List[_Request] = []
+        self._closed = False
+
+    @staticmethod
+    def from_path(path: str, **kwargs: Any) -> "AsyncVerifier":
+        return AsyncVerifier(ModelBundle.load(path), **kwargs)
+
+    async def start(self) -> None:
+        if self._closed:
+            raise RuntimeError("AsyncVerifier is closed.")
+        if self._batcher is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._slots = asyncio.Semaphore(self.max_workers)
+            self._batcher = asyncio.create_task(self._run())
+
+    async def verify(
+        self, text_a: str, text_b: str, timeout: float | None = None
+    ) -> Dict[str, Any]:
+        """
+        Same result as Verifier.verify. `timeout` covers queueing and scoring;
+        on expiry asyncio.TimeoutError is raised and the pair is abandoned.
+        """
+        await self.start()
+        assert self._queue is not None
+        fut = asyncio.get_running_loop().create_future()
+        req = _Request(text_a, text_b, fut)
+
+        async def submit_and_wait() -> Dict[str, Any]:
+            await self._queue.put(req)  # type: ignore[union-attr]
+            if self._closed:
+                # Woken by a drain after aclose(): nobody batches the queue
+                # any more, so fail it (this pair included), which in turn
+                # wakes the next blocked producer
+                self._fail_queued()
+            return await fut
+
+        try:
+            return await asyncio.wait_for(submit_and_wait(), timeout)
+        finally:
+            fut.cancel()  # no-op when already resolved
+
+    async def score_proba(
+        self, text_a: str, text_b: str, timeout: float | None = None
+    ) -> float:
+        res = await self.verify(text_a, text_b, timeout=timeout)
+        return float(res["probability_same_author"])
+
+    async def _next_batch(self) -> List[_Request]:
+        assert self._queue is not None
+        batch = self._held
+        batch.append(await self._queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return [r for r in batch if not r.future.done()]
+
+    async def _run(self) -> None:
+        assert self._slots is not None
+        while True:
+            self._held = []
+            batch = self._held = await self._next_batch()
+            if not batch:
+                continue
+            await self._slots.acquire()
+            batch = [r for r in batch if not r.future.done()]
+            self._held = []
+            if not batch:
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self._score(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _score(self, batch: List[_Request]) -> None:
+        assert self._slots is not None
+        loop = asyncio.get_running_loop()
+        texts_a = [r.text_a for r in batch]
+        texts_b = [r.text_b for r in batch]
+        try:
+            if self._mode == "local":
+                call = loop.run_in_executor(
+                    self._executor, self._verifier.verify_batch, texts_a, texts_b
+                )
+            elif self._mode == "worker":
+                call = loop.run_in_executor(
+                    self._executor, _verify_batch_in_worker, texts_a, texts_b
+                )
+            else:
+                call = loop.run_in_executor(
+                    self._executor, _verify_bundle_batch, self.bundle, texts_a, texts_b
+                )
+            results = await call
+        except Exception as exc:  # propagate to every awaiter of the batch
+            logging.getLogger(__name__).exception("Batch of %d pairs failed", len(batch))
+            for r in batch:
+                if not r.future.done():
+                    r.future.set_exception(exc)
+        else:
+            for r, res in zip(batch, results):
+                if not r.future.done():
+                    r.future.set_result(res)
+        finally:
+            self._slots.release()
+
+    async def aclose(self) -> None:
+        """
+        Stop batching, fail queued and held requests (and producers still
+        blocked on a full queue) and shut down an owned pool.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        for req in self._held:
+            if not req.future.done():
+                req.future.set_exception(RuntimeError("AsyncVerifier closed."))
+        self._held = []
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        self._fail_queued()
+        if self._own_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fail_queued(self) -> None:
+        if self._queue is None:
+            return
+        while not self._queue.empty():
+            req = self._queue.get_nowait()
+            if not req.future.done():
+                req.future.set_exception(RuntimeError("AsyncVerifier closed."))
+
+    async def __aenter__(self) -> "AsyncVerifier":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
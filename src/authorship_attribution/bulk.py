@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import math
+import sys
+from collections import deque
+from concurrent.futures import Future
+from typing import IO, Any, Deque, Dict, Iterable, Iterator, List
+
+import pandas as pd
+
+from authorship_attribution import runtime
+from authorship_attribution.models import (
+    ModelBundle,
+    Verifier,
+    init_verifier_worker,
+    worker_verifier,
+)
+
+Record = Dict[str, Any]
+
+
+def _clean(value: Any) -> Any:
+    # pandas gives NaN/NA for empty CSV cells
+    if value is pd.NA or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value
+
+
+def iter_pair_records(
+    stream: IO[str],
+    fmt: str = "jsonl",
+    batch_size: int = 256,
+) -> Iterator[List[Record]]:
+    """
+    Read pair records from a text stream in batches of `batch_size`.
+
+    fmt="jsonl": one JSON object per line (blank lines skipped).
+    fmt="csv": a header row, then one record per row.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    if fmt == "jsonl":
+        batch: List[Record] = []
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError as exc:
+                rec = {"_error": f"invalid JSON: {exc}"}
+            batch.append(rec if isinstance(rec, dict) else {"_error": "not an object"})
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    elif fmt == "csv":
+        for chunk in pd.read_csv(stream, dtype="string", chunksize=batch_size):  # type: ignore[arg-type]
+            yield [
+                {k: _clean(v) for k, v in rec.items()}
+                for rec in chunk.to_dict("records")
+            ]
+    else:
+        raise ValueError("fmt must be 'jsonl' or 'csv'")
+
+
+def score_records(
+    verifier: Verifier,
+    records: List[Record],
+    text_a_field: str = "text_a",
+    text_b_field: str = "text_b",
+) -> List[Record]:
+    """
+    verify_batch() over the valid records; returns one output per input,
+    echoing the non-text fields, or an "error" for unusable records.
+    """
+    out: List[Record] = []
+    valid: List[int] = []
+    for i, rec in enumerate(records):
+        meta = {k: v for k, v in rec.items() if k not in (text_a_field, text_b_field)}
+        err = meta.pop("_error", None)
+        a, b = rec.get(text_a_field), rec.get(text_b_field)
+        if err is None and not (isinstance(a, str) and isinstance(b, str)):
+            err = f"record needs string fields '{text_a_field}' and '{text_b_field}'"
+        if err is not None:
+            meta["error"] = err
+        else:
+            valid.append(i)
+        out.append(meta)
+    if valid:
+        results = verifier.verify_batch(
+            [records[i][text_a_field] for i in valid],
+            [records[i][text_b_field] for i in valid],
+        )
+        for i, res in zip(valid, results):
+            out[i].update(res)
+    return out
+
+
+def _score_records_in_worker(
+    records: List[Record], text_a_field: str, text_b_field: str
+) -> List[Record]:
+    return score_records(worker_verifier(), records, text_a_field, text_b_field)
+
+
+def verify_stream(
+    bundle: ModelBundle,
+    batches: Iterable[List[Record]],
+    workers: int = 1,
+    text_a_field: str = "text_a",
+    text_b_field: str = "text_b",
+) -> Iterator[Record]:
+    """
+    Score record batches and yield results in input order. With workers > 1
+    batches go to a runtime process pool (bundle loaded once per worker) with
+    at most two batches per worker in flight, so memory stays bounded.
+    """
+    if workers <= 1:
+        verifier = Verifier(bundle)
+        for batch in batches:
+            yield from score_records(verifier, batch, text_a_field, text_b_field)
+        return
+    n_workers = runtime.get_config().pool_workers(workers)
+    with runtime.process_pool(
+        n_workers, initializer=init_verifier_worker, initargs=(bundle,)
+    ) as ex:
+        pending: Deque[Future] = deque()
+        for batch in batches:
+            pending.append(
+                ex.submit(_score_records_in_worker, batch, text_a_field, text_b_field)
+            )
+            if len(pending) >= 2 * n_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_jsonl(records: Iterable[Record], out: IO[str], flush_every: int = 256) -> int:
+    """
+    Write records as JSON lines, flushing periodically for pipelines.
+    """
+    n = 0
+    for rec in records:
+        out.write(json.dumps(rec, ensure_ascii=False, default=str))
+        out.write("\n")
+        n += 1
+        if n % flush_every == 0:
+            out.flush()
+    out.flush()
+    return n
+
+
+def open_pairs_input(path: str) -> IO[str]:
+    if path == "-":
+        return sys.stdin
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def pairs_format(path: str, fmt: str = "auto") -> str:
+    if fmt != "auto":
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
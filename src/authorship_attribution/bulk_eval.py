@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import runtime
+from .data import AuthorCorpus, corpus_format, load_author_corpus, sample_pairs
+from .embeddings import (
+    embed_in_memory,
+    embed_to_store,
+    open_embedding_store,
+    read_store_meta,
+    write_store_meta,
+)
+from .evaluation import ScoreCurve
+from .features import FeatureExtractor
+from .models import ModelBundle, pairwise_features
+from .pair_matrix import ParallelPairBuilder
+from .utils import ensure_dir, params_sha256, texts_sha256
+
+
+def read_pairs(
+    path: str,
+    col_a: str = "a",
+    col_b: str = "b",
+    label_col: str = "label",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Explicit evaluation pairs: row indices into the loaded corpus plus a
+    0/1 same-author label, from CSV, Parquet or NDJSON.
+    """
+    fmt = corpus_format(path)
+    cols = [col_a, col_b, label_col]
+    if fmt == "csv":
+        df = pd.read_csv(path, usecols=cols)
+    elif fmt == "parquet":
+        df = pd.read_parquet(path, columns=cols)
+    else:
+        df = pd.read_json(path, lines=True)[cols]
+    pairs = df[[col_a, col_b]].to_numpy(dtype=np.int64)
+    labels = df[label_col].to_numpy(dtype=np.int64)
+    if not np.isin(labels, (0, 1)).all():
+        raise ValueError(f"'{label_col}' must be 0 or 1.")
+    return pairs, labels
+
+
+def corpus_embeddings(
+    extractor: FeatureExtractor,
+    corpus: AuthorCorpus,
+    batch_size: int = 4096,
+    workers: int = 1,
+    cache_dir: str | None = None,
+    hash_algo: str = "sha256",
+) -> np.ndarray:
+    """
+    Embed every corpus text once. With a cache dir the store is keyed by
+    the extractor fingerprint and the texts digest and reused when both match.
+    """
+    logger = logging.getLogger(__name__)
+    if cache_dir is None:
+        return embed_in_memory(extractor, corpus.texts, batch_size, workers)
+    meta = {
+        "n_rows": len(corpus),
+        "dim": int(extractor.output_dim),
+        "extractor_fingerprint": extractor.fingerprint(),
+        "texts_digest": texts_sha256(corpus.texts, algo=hash_algo),
+        "hash_algo": hash_algo,
+    }
+    path = ensure_dir(cache_dir) / f"emb_eval_{params_sha256(meta)}.npy"
+    if path.is_file() and read_store_meta(path) == meta:
+        logger.info("Cache hit: opening embeddings from %s", path)
+        return open_embedding_store(path)
+    logger.info("Transforming texts to embeddings -> %s", path)
+    X = embed_to_store(extractor, corpus.texts, path, batch_size, workers)
+    write_store_meta(path, meta)
+    return X
+
+
+def score_pairs(
+    bundle: ModelBundle,
+    X: np.ndarray,
+    pairs: np.ndarray,
+    chunk_size: int = 16_384,
+    workers: int | None = 1,
+) -> np.ndarray:
+    """
+    Same-author probabilities for index pairs into X, built and scored one
+    chunk at a time so the pair feature matrix never exists in full. With
+    workers > 1, blocks of scaled pair features come from a shared-memory
+    worker pool (ParallelPairBuilder).
+    """
+    probs = np.empty(len(pairs), dtype=np.float64)
+    if workers != 1 and bundle.metric is None:
+        with ParallelPairBuilder(
+            X, workers=workers, scaler=bundle.pair_scaler, chunk_size=chunk_size
+        ) as builder:
+            block = 4 * chunk_size * builder.workers
+            for start in range(0, len(pairs), block):
+                with runtime.stage("pairwise"):
+                    pf = builder.build(pairs[start : start + block])
+                with runtime.stage("classifier"):
+                    p = bundle.classifier.predict_proba(pf)[:, 1]
+                probs[start : start + len(p)] = p
+        return probs
+    for start in range(0, len(pairs), chunk_size):
+        p = pairs[start : start + chunk_size]
+        if bundle.metric is not None:
+            with runtime.stage("classifier"):
+                probs[start : start + len(p)] = bundle.metric.pair_proba(
+                    X[p[:, 0]], X[p[:, 1]]
+                )
+            continue
+        with runtime.stage("pairwise"):
+            pf = pairwise_features(X[p[:, 0]], X[p[:, 1]])
+        with runtime.stage("classifier"):
+            if bundle.pair_scaler is not None:
+                pf = bundle.pair_scaler.transform(pf)
+            probs[start : start + len(p)] = bundle.classifier.predict_proba(pf)[:, 1]
+    return probs
+
+
+def evaluate(
+    model_path: str,
+    csv_path: str,
+    text_col: str = "text",
+    author_col: str = "author",
+    pairs_path: str | None = None,
+    min_text_len: int = 50,
+    min_texts_per_author: int = 2,
+    max_pos_per_author: int | None = 100,
+    negatives_per_positive: int = 3,
+    seed: int = 42,
+    embed_batch_size: int = 4096,
+    embed_workers: int = 1,
+    score_chunk_size: int = 16_384,
+    pair_workers: int | None = 1,
+    cache_dir: str | None = None,
+    hash_algo: str = "sha256",
+    curves_out: str | None = None,
+    bundle: ModelBundle | None = None,
+) -> Dict[str, Any]:
+    """
+    Evaluate a saved bundle on a labelled corpus without retraining.
+
+    Pairs are sampled with sample_pairs() or read from `pairs_path` (row
+    indices into the corpus as loaded here). Reports AUC, metrics at the
+    bundle threshold, the best-F1 threshold on this data and throughput.
+    """
+    logger = logging.getLogger(__name__)
+    t_start = time.perf_counter()
+    bundle = bundle or ModelBundle.load(model_path)
+
+    corpus = load_author_corpus(
+        csv_path,
+        text_col=text_col,
+        author_col=author_col,
+        min_text_len=min_text_len,
+        min_texts_per_author=min_texts_per_author,
+    )
+    logger.info("Loaded %d texts from %d authors.", len(corpus), corpus.n_authors)
+
+    if pairs_path is not None:
+        pairs, labels = read_pairs(pairs_path)
+        if len(pairs) and (pairs.min() < 0 or pairs.max() >= len(corpus)):
+            raise ValueError(
+                f"Pair indices must be in [0, {len(corpus)}) for the loaded corpus."
+            )
+    else:
+        pairs, labels = sample_pairs(
+            corpus.authors,
+            max_pos_per_author=max_pos_per_author,
+            negatives_per_positive=negatives_per_positive,
+            seed=seed,
+        )
+    if len(np.unique(labels)) < 2:
+        raise ValueError("Evaluation needs both same-author and different-author pairs.")
+    logger.info("Evaluating %d pairs (%d positive).", len(pairs), int(labels.sum()))
+
+    # Only texts that appear in a pair are embedded
+    used = np.unique(pairs)
+    subset = corpus.select(used) if len(used) < len(corpus) else corpus
+    if subset is not corpus:
+        pairs = np.searchsorted(used, pairs)
+
+    t0 = time.perf_counter()
+    with runtime.stage("embed"):
+        X = corpus_embeddings(
+            bundle.extractor,
+            subset,
+            batch_size=embed_batch_size,
+            workers=embed_workers,
+            cache_dir=cache_dir,
+            hash_algo=hash_algo,
+        )
+    embed_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    probs = score_pairs(
+        bundle, X, pairs, chunk_size=score_chunk_size, workers=pair_workers
+    )
+    score_seconds = time.perf_counter() - t0
+
+    curve = ScoreCurve.from_scores(labels, probs)
+    at_bundle = curve.at_threshold(float(bundle.threshold))
+    best_thr = curve.best_threshold()
+    at_best = curve.at_threshold(best_thr)
+    if curves_out is not None:
+        curve.save(curves_out)
+
+    total = time.perf_counter() - t_start
+    res = {
+        "model_path": model_path,
+        "n_texts": int(len(corpus)),
+        "n_texts_embedded": int(len(subset)),
+        "n_authors": int(corpus.n_authors),
+        "n_pairs": int(len(pairs)),
+        "n_positive": int(labels.sum()),
+        "auc": curve.roc_auc(),
+        "bundle_threshold": {k: float(v) for k, v in at_bundle.items()},
+        "best_threshold": {k: float(v) for k, v in at_best.items()},
+        "throughput": {
+            "embed_seconds": embed_seconds,
+            "texts_per_second": len(subset) / max(embed_seconds, 1e-9),
+            "score_seconds": score_seconds,
+            "pairs_per_second": len(pairs) / max(score_seconds, 1e-9),
+            "total_seconds": total,
+        },
+        "curves_path": str(Path(curves_out)) if curves_out is not None else None,
+    }
+    logger.info(
+        "AUC %.4f | F1 %.4f at bundle threshold %.4f | best F1 %.4f at %.4f",
+        res["auc"],
+        at_bundle["f1"],
+        bundle.threshold,
+        at_best["f1"],
+        best_thr,
+    )
+    return res
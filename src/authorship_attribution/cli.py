@@ -2,16 +2,76 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 from typing import Optional
 
-from authorship_attribution.models import Verifier
+import pandas as pd
+
+from authorship_attribution import runtime, telemetry
+from authorship_attribution.bulk import (
+    iter_pair_records,
+    open_pairs_input,
+    pairs_format,
+    verify_stream,
+    write_jsonl,
+)
+from authorship_attribution.bulk_eval import evaluate
+from authorship_attribution.data import load_author_corpus
+from authorship_attribution.dedup import dedup_texts
+from authorship_attribution.models import ModelBundle, Verifier
+from authorship_attribution.profiles import AGGREGATIONS, AuthorProfile
+from authorship_attribution.shards import (
+    CorpusSpec,
+    embed_shard,
+    load_extractor,
+    merge_shards,
+    run_local_shards,
+)
 from authorship_attribution.train import train
 
 
+def _add_document_mode_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--window-chars",
+        type=int,
+        default=None,
+        help="Embed texts longer than this as pooled char windows.",
+    )
+    p.add_argument(
+        "--max-doc-chars",
+        type=int,
+        default=None,
+        help="Cap on chars embedded per document in window mode.",
+    )
+    p.add_argument(
+        "--window-sampling", choices=["head", "uniform", "random"], default="head"
+    )
+    p.add_argument("--window-pooling", choices=["mean", "length"], default="mean")
+
+
+def _min_df_arg(value: str) -> int | float:
+    # sklearn takes an int count >= 1 or a float fraction in (0, 1]
+    x = float(value)
+    return int(x) if x >= 1 and x.is_integer() else x
+
+
+def _add_threads_arg(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--threads",
+        default=None,
+        help=f"BLAS/OpenMP and worker thread budget, e.g. '8' or '8,fit=4,classifier=2' "
+        f"(stages: {', '.join(runtime.STAGES)}). Defaults to ${runtime.THREADS_ENV}.",
+    )
+
+
 def train_main() -> int:
     p = argparse.ArgumentParser(description="Train an authorship verification model.")
-    p.add_argument("--csv", required=True, help="Path to CSV with columns: author,text")
+    p.add_argument(
+        "--csv",
+        required=True,
+        help="Corpus with author/text columns: CSV, Parquet or NDJSON (.gz/.zst ok)",
+    )
     p.add_argument("--text-col", default="text")
     p.add_argument("--author-col", default="author")
     p.add_argument("--out-dir", default="aa_model")
@@ -23,7 +83,7 @@ def train_main() -> int:
     p.add_argument("--svd-dim", type=int, default=512)
     p.add_argument(
         "--char-min-df",
-        type=float,
+        type=_min_df_arg,
         default=5,
         help="min_df for char TF-IDF (int>=1 or fraction in (0,1)",
     )
@@ -34,6 +94,84 @@ def train_main() -> int:
     p.add_argument(
         "--cache-dir", type=str, default=None, help="Custom cache directory."
     )
+    p.add_argument(
+        "--embed-batch-size",
+        type=int,
+        default=4096,
+        help="Texts per batch when writing the embedding store.",
+    )
+    p.add_argument(
+        "--hash-algo",
+        choices=["sha256", "blake2b"],
+        default="sha256",
+        help="Digest for cache fingerprints (keyed blake2b is faster without SHA-NI).",
+    )
+    p.add_argument(
+        "--hash-workers",
+        type=int,
+        default=None,
+        help="Threads for hashing texts (default: all cores).",
+    )
+    p.add_argument(
+        "--pair-workers",
+        type=int,
+        default=1,
+        help="Worker processes building the pair feature matrices over "
+        "shared memory (share the --threads budget).",
+    )
+    p.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=None,
+        help="Remove near-duplicate texts (MinHash Jaccard >= this) before splitting.",
+    )
+    p.add_argument("--dedup-keep", choices=["first", "none"], default="first")
+    p.add_argument(
+        "--views",
+        default=None,
+        help="Comma-separated extractor views sharing one preprocessing pass, "
+        "e.g. 'char,style,word' (default: classic char + function-word extractor).",
+    )
+    p.add_argument("--word-min", type=int, default=1, help="Word view n-gram min")
+    p.add_argument("--word-max", type=int, default=2, help="Word view n-gram max")
+    p.add_argument("--max-word-features", type=int, default=50_000)
+    p.add_argument("--word-svd-dim", type=int, default=128)
+    p.add_argument(
+        "--word-min-df",
+        type=_min_df_arg,
+        default=None,
+        help="min_df for the word view (default: same as --char-min-df).",
+    )
+    p.add_argument(
+        "--model-type",
+        choices=["logistic", "bilinear"],
+        default="logistic",
+        help="'bilinear' saves a low-rank metric (calibrated cosine of projected "
+        "embeddings) instead of the pairwise logistic model; both are reported.",
+    )
+    p.add_argument(
+        "--projection",
+        choices=["svd", "svd_sample", "random"],
+        default="svd",
+        help="Char n-gram projection: TruncatedSVD, SVD fitted on a row sample, "
+        "or a seeded sparse random projection (not stored in the bundle).",
+    )
+    p.add_argument(
+        "--projection-sample",
+        type=int,
+        default=10_000,
+        help="Rows used to fit the SVD with --projection svd_sample.",
+    )
+    p.add_argument("--metric-rank", type=int, default=64)
+    p.add_argument("--metric-epochs", type=int, default=20)
+    p.add_argument(
+        "--embeddings",
+        default=None,
+        help="Precomputed embedding store (e.g. from aa-embed merge) to use "
+        "instead of transforming the corpus.",
+    )
+    _add_document_mode_args(p)
+    _add_threads_arg(p)
     args = p.parse_args()
 
     res = train(
@@ -54,13 +192,249 @@ def train_main() -> int:
         seed=args.seed,
         use_cache=not args.no_cache,
         cache_dir=args.cache_dir,
+        embed_batch_size=args.embed_batch_size,
+        hash_algo=args.hash_algo,
+        hash_workers=args.hash_workers,
+        dedup_threshold=args.dedup_threshold,
+        dedup_keep=args.dedup_keep,
+        window_chars=args.window_chars,
+        max_doc_chars=args.max_doc_chars,
+        window_sampling=args.window_sampling,
+        window_pooling=args.window_pooling,
+        embeddings_path=args.embeddings,
+        threads=args.threads,
+        views=[v.strip() for v in args.views.split(",") if v.strip()]
+        if args.views
+        else None,
+        word_ngram_range=(args.word_min, args.word_max),
+        max_word_features=args.max_word_features,
+        word_svd_dim=args.word_svd_dim,
+        word_min_df=args.word_min_df,
+        model_type=args.model_type,
+        metric_rank=args.metric_rank,
+        metric_epochs=args.metric_epochs,
+        projection=args.projection,
+        projection_sample=args.projection_sample,
+        pair_workers=args.pair_workers,
     )
     print(json.dumps(res, indent=2))
     return 0
 
 
+def _add_embed_corpus_args(p: argparse.ArgumentParser) -> None:
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--model", help="Model bundle (aa_model.joblib) with the extractor")
+    src.add_argument("--extractor", help="Cached extractor_*.joblib from aa-train")
+    p.add_argument("--csv", required=True, help="Corpus (same file passed to aa-train)")
+    p.add_argument("--text-col", default="text")
+    p.add_argument("--author-col", default="author")
+    p.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=None,
+        help="Must match the aa-train run the embeddings are for.",
+    )
+    p.add_argument("--dedup-keep", choices=["first", "none"], default="first")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--num-shards", type=int, required=True)
+    p.add_argument("--shard-dir", required=True, help="Shared directory for shard files")
+    p.add_argument("--batch-size", type=int, default=4096)
+    p.add_argument("--hash-algo", choices=["sha256", "blake2b"], default="sha256")
+
+
+def _corpus_spec(args: argparse.Namespace) -> CorpusSpec:
+    return CorpusSpec(
+        path=args.csv,
+        text_col=args.text_col,
+        author_col=args.author_col,
+        dedup_threshold=args.dedup_threshold,
+        dedup_keep=args.dedup_keep,
+        seed=args.seed,
+    )
+
+
+def embed_main() -> int:
+    p = argparse.ArgumentParser(
+        description="Compute corpus embeddings in shards and merge them into a store."
+    )
+    _add_threads_arg(p)
+    sub = p.add_subparsers(dest="command", required=True)
+    ps = sub.add_parser("shard", help="Embed shard INDEX of --num-shards")
+    _add_embed_corpus_args(ps)
+    ps.add_argument("--shard-index", type=int, required=True)
+    pm = sub.add_parser("merge", help="Validate shards and write the embedding store")
+    pm.add_argument("--shard-dir", required=True)
+    pm.add_argument("--out", required=True, help="Output store (.npy)")
+    pl = sub.add_parser("local", help="Run all shards in local processes, then merge")
+    _add_embed_corpus_args(pl)
+    pl.add_argument("--out", required=True, help="Output store (.npy)")
+    pl.add_argument("--workers", type=int, default=None)
+    args = p.parse_args()
+    runtime.configure(args.threads)
+
+    if args.command == "shard":
+        extractor = load_extractor(args.model or args.extractor)
+        path = embed_shard(
+            extractor,
+            _corpus_spec(args).load_texts(),
+            args.shard_index,
+            args.num_shards,
+            args.shard_dir,
+            batch_size=args.batch_size,
+            hash_algo=args.hash_algo,
+        )
+        print(json.dumps({"shard": str(path)}, indent=2))
+    elif args.command == "merge":
+        path = merge_shards(args.shard_dir, args.out)
+        print(json.dumps({"store": str(path)}, indent=2))
+    else:
+        path = run_local_shards(
+            args.model or args.extractor,
+            _corpus_spec(args),
+            args.num_shards,
+            args.shard_dir,
+            args.out,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            hash_algo=args.hash_algo,
+        )
+        print(json.dumps({"store": str(path)}, indent=2))
+    return 0
+
+
+def dedup_main() -> int:
+    p = argparse.ArgumentParser(
+        description="Remove near-duplicate texts from a corpus (MinHash + LSH)."
+    )
+    p.add_argument("--csv", required=True, help="Input corpus (CSV, Parquet or NDJSON)")
+    p.add_argument("--out", required=True, help="Output CSV with columns: author,text")
+    p.add_argument("--text-col", default="text")
+    p.add_argument("--author-col", default="author")
+    p.add_argument("--min-text-len", type=int, default=1)
+    p.add_argument("--threshold", type=float, default=0.8)
+    p.add_argument("--keep", choices=["first", "none"], default="first")
+    p.add_argument("--num-perm", type=int, default=128)
+    p.add_argument("--shingle-size", type=int, default=5)
+    p.add_argument("--seed", type=int, default=42)
+    _add_threads_arg(p)
+    args = p.parse_args()
+    runtime.configure(args.threads)
+
+    corpus = load_author_corpus(
+        args.csv,
+        text_col=args.text_col,
+        author_col=args.author_col,
+        min_text_len=args.min_text_len,
+        min_texts_per_author=1,
+    )
+    res = dedup_texts(
+        corpus.texts,
+        threshold=args.threshold,
+        num_perm=args.num_perm,
+        shingle_size=args.shingle_size,
+        keep=args.keep,
+        seed=args.seed,
+    )
+    kept = corpus.select(res.keep)
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({"author": kept.authors, "text": kept.texts}).to_csv(
+        args.out, index=False
+    )
+    summary = {
+        "texts_before": len(corpus),
+        "texts_after": len(kept),
+        "removed": res.n_removed,
+        "clusters": res.n_clusters,
+        "seconds": res.seconds,
+        "out": args.out,
+    }
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
 def eval_main() -> int:
-    print("Use aa-train to see validation metrics and a saved model.")
+    p = argparse.ArgumentParser(
+        description="Evaluate a saved model on a labelled corpus (no retraining)."
+    )
+    p.add_argument("--model", required=True, help="Path to aa_model.joblib")
+    p.add_argument(
+        "--csv",
+        required=True,
+        help="Corpus with author/text columns: CSV, Parquet or NDJSON (.gz/.zst ok)",
+    )
+    p.add_argument("--text-col", default="text")
+    p.add_argument("--author-col", default="author")
+    p.add_argument(
+        "--pairs",
+        default=None,
+        help="Explicit pairs (columns a,b,label) indexing the loaded corpus rows; "
+        "sampled with sample_pairs() when omitted.",
+    )
+    p.add_argument("--min-text-len", type=int, default=50)
+    p.add_argument("--min-texts-per-author", type=int, default=2)
+    p.add_argument("--max-pos-per-author", type=int, default=100)
+    p.add_argument("--negatives-per-positive", type=int, default=3)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--embed-batch-size", type=int, default=4096)
+    p.add_argument(
+        "--embed-workers",
+        type=int,
+        default=1,
+        help="Worker processes for embedding (share the --threads budget).",
+    )
+    p.add_argument(
+        "--score-chunk-size",
+        type=int,
+        default=16_384,
+        help="Pairs scored per chunk (bounds pair-feature memory).",
+    )
+    p.add_argument(
+        "--pair-workers",
+        type=int,
+        default=1,
+        help="Worker processes building pair features over shared memory.",
+    )
+    p.add_argument(
+        "--cache-dir", default=None, help="Reuse corpus embeddings across runs."
+    )
+    p.add_argument("--hash-algo", choices=["sha256", "blake2b"], default="sha256")
+    p.add_argument("--curves-out", default=None, help="Save ROC/PR curves (.npz)")
+    _add_document_mode_args(p)
+    _add_threads_arg(p)
+    args = p.parse_args()
+    runtime.configure(args.threads)
+
+    bundle = ModelBundle.load(args.model)
+    if args.window_chars is not None:
+        bundle.extractor.set_document_mode(
+            args.window_chars,
+            max_doc_chars=args.max_doc_chars,
+            sampling=args.window_sampling,
+            pooling=args.window_pooling,
+        )
+    res = evaluate(
+        model_path=args.model,
+        csv_path=args.csv,
+        text_col=args.text_col,
+        author_col=args.author_col,
+        pairs_path=args.pairs,
+        min_text_len=args.min_text_len,
+        min_texts_per_author=args.min_texts_per_author,
+        max_pos_per_author=args.max_pos_per_author
+        if args.max_pos_per_author > 0
+        else None,
+        negatives_per_positive=args.negatives_per_positive,
+        seed=args.seed,
+        embed_batch_size=args.embed_batch_size,
+        embed_workers=args.embed_workers,
+        score_chunk_size=args.score_chunk_size,
+        pair_workers=args.pair_workers,
+        cache_dir=args.cache_dir,
+        hash_algo=args.hash_algo,
+        curves_out=args.curves_out,
+        bundle=bundle,
+    )
+    print(json.dumps(res, indent=2))
     return 0
 
 
@@ -77,21 +451,130 @@ def _read_text_arg(text: Optional[str], file: Optional[str]) -> str:
 
 def verify_main() -> int:
     p = argparse.ArgumentParser(
-        description="Verify if two texts are by the same author."
+        description="Verify if two texts are by the same author, score a "
+        "stream of pairs with --pairs, or verify text A against a set of "
+        "known texts with --known / --profile."
     )
     p.add_argument("--model", required=True, help="Path to aa_model.joblib")
-    g = p.add_mutually_exclusive_group(required=True)
+    g = p.add_mutually_exclusive_group()
     g.add_argument("--text-a", help="Text A as string")
     g.add_argument("--file-a", help="Path to file for Text A")
-    h = p.add_mutually_exclusive_group(required=True)
+    h = p.add_mutually_exclusive_group()
     h.add_argument("--text-b", help="Text B as string")
     h.add_argument("--file-b", help="Path to file for Text B")
+    p.add_argument(
+        "--pairs",
+        default=None,
+        help="Pair records (JSON lines or CSV with text_a/text_b; '-' = stdin). "
+        "Results are written as JSON lines in input order.",
+    )
+    p.add_argument("--pairs-format", choices=["auto", "jsonl", "csv"], default="auto")
+    p.add_argument("--out", default="-", help="Output for --pairs ('-' = stdout)")
+    p.add_argument("--text-a-field", default="text_a")
+    p.add_argument("--text-b-field", default="text_b")
+    p.add_argument("--batch-size", type=int, default=256, help="Pairs per batch")
+    p.add_argument(
+        "--known",
+        nargs="+",
+        default=None,
+        help="Files with known texts of one candidate; text A is scored "
+        "against all of them.",
+    )
+    p.add_argument(
+        "--profile", default=None, help="Saved author profile (.npz) to score against"
+    )
+    p.add_argument(
+        "--save-profile",
+        default=None,
+        help="Write the profile built from --known here for later queries.",
+    )
+    p.add_argument(
+        "--aggregation",
+        choices=list(AGGREGATIONS),
+        default="mean",
+        help="Combine per-known-text probabilities by mean or max, or score "
+        "against the pooled profile vector.",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for --pairs (share the --threads budget).",
+    )
+    _add_document_mode_args(p)
+    _add_threads_arg(p)
+    p.add_argument(
+        "--metrics-out",
+        default=None,
+        help="Write inference metrics here (.prom = Prometheus text, else JSON).",
+    )
     args = p.parse_args()
+    # Compare with None: an explicit empty --text-a "" is still a text
+    has_a = args.text_a is not None or args.file_a is not None
+    has_b = args.text_b is not None or args.file_b is not None
+    single = has_a and has_b
+    as_set = args.known is not None or args.profile is not None
+    if as_set:
+        if args.known is not None and args.profile is not None:
+            p.error("--known and --profile are mutually exclusive")
+        if not has_a or has_b:
+            p.error("--known/--profile need --text-a/--file-a and no text B")
+        if args.pairs is not None:
+            p.error("--pairs cannot be combined with --known/--profile")
+    elif args.pairs is None and not single:
+        p.error("provide --text-a/--file-a and --text-b/--file-b, or --pairs")
+    if args.save_profile and args.known is None:
+        p.error("--save-profile needs --known")
+    if args.pairs is not None and (has_a or has_b):
+        p.error("--pairs cannot be combined with single-pair arguments")
+    runtime.configure(args.threads)
+    registry = telemetry.enable() if args.metrics_out else None
 
-    text_a = _read_text_arg(args.text_a, args.file_a)
-    text_b = _read_text_arg(args.text_b, args.file_b)
+    bundle = ModelBundle.load(args.model)
+    if args.window_chars is not None:
+        bundle.extractor.set_document_mode(
+            args.window_chars,
+            max_doc_chars=args.max_doc_chars,
+            sampling=args.window_sampling,
+            pooling=args.window_pooling,
+        )
 
-    verifier = Verifier.from_path(args.model)
-    res = verifier.verify(text_a, text_b)
-    print(json.dumps(res, indent=2))
+    if args.pairs is not None:
+        fmt = pairs_format(args.pairs, args.pairs_format)
+        src = open_pairs_input(args.pairs)
+        out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+        try:
+            results = verify_stream(
+                bundle,
+                iter_pair_records(src, fmt=fmt, batch_size=args.batch_size),
+                workers=args.workers,
+                text_a_field=args.text_a_field,
+                text_b_field=args.text_b_field,
+            )
+            write_jsonl(results, out)
+        finally:
+            if src is not sys.stdin:
+                src.close()
+            if out is not sys.stdout:
+                out.close()
+    elif as_set:
+        verifier = Verifier(bundle)
+        text_a = _read_text_arg(args.text_a, args.file_a)
+        if args.profile is not None:
+            profile = AuthorProfile.load(args.profile)
+        else:
+            profile = verifier.build_profile(
+                [_read_text_arg(None, f) for f in args.known]
+            )
+            if args.save_profile:
+                profile.save(args.save_profile)
+        res = verifier.verify_against_set(text_a, profile, args.aggregation)
+        print(json.dumps(res, indent=2))
+    else:
+        text_a = _read_text_arg(args.text_a, args.file_a)
+        text_b = _read_text_arg(args.text_b, args.file_b)
+        res = Verifier(bundle).verify(text_a, text_b)
+        print(json.dumps(res, indent=2))
+    if registry is not None:
+        registry.write(args.metrics_out)
     return 0
@@ -1,18 +1,155 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
-from typing import Dict, List, Sequence, Tuple
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 from collections import defaultdict
 
 
+_COMPRESSION_SUFFIXES = {".gz", ".bz2", ".xz", ".zst", ".zip"}
+_FORMAT_BY_SUFFIX = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".jsonl": "ndjson",
+    ".ndjson": "ndjson",
+    ".json": "ndjson",
+}
+
+
 @dataclass(frozen=True)
 class AuthorCorpus:
-    df: pd.DataFrame
+    """
+    Filtered corpus: one list of texts plus compact integer author codes.
+
+    `author_ids[i]` indexes `author_names`; codes follow first appearance.
+    """
+
     texts: List[str]
-    authors: List[str]
+    author_ids: np.ndarray
+    author_names: List[str]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def n_authors(self) -> int:
+        return len(self.author_names)
+
+    @property
+    def authors(self) -> List[str]:
+        """
+        Per-text author names (references into `author_names`, no copies).
+        """
+        names = self.author_names
+        return [names[i] for i in self.author_ids.tolist()]
+
+    def select(
+        self, indices: Sequence[int] | np.ndarray, min_texts_per_author: int = 1
+    ) -> "AuthorCorpus":
+        """
+        Sub-corpus of the given rows (in the given order), then drop authors
+        left with fewer than `min_texts_per_author` texts.
+        """
+        idx = np.asarray(indices, dtype=np.int64)
+        ids = self.author_ids[idx]
+        counts = np.bincount(ids, minlength=self.n_authors)
+        idx = idx[counts[ids] >= min_texts_per_author]
+        texts = self.texts
+        return _build_corpus(
+            [texts[i] for i in idx.tolist()], self.author_ids[idx], self.author_names
+        )
+
+
+def corpus_format(path: str | Path) -> str:
+    """
+    Infer 'csv', 'parquet' or 'ndjson' from the file name, ignoring a
+    trailing compression suffix (e.g. reviews.csv.gz, reviews.jsonl.zst).
+    """
+    suffixes = [s.lower() for s in Path(path).suffixes]
+    if suffixes and suffixes[-1] in _COMPRESSION_SUFFIXES:
+        suffixes = suffixes[:-1]
+    fmt = _FORMAT_BY_SUFFIX.get(suffixes[-1]) if suffixes else None
+    if fmt is None:
+        raise ValueError(
+            f"Cannot infer corpus format from '{path}'; "
+            "expected .csv, .parquet or .jsonl/.ndjson (optionally compressed)."
+        )
+    return fmt
+
+
+def iter_corpus_chunks(
+    path: str | Path,
+    text_col: str = "text",
+    author_col: str = "author",
+    chunksize: int = 100_000,
+) -> Iterator[Tuple[List[str], List[str]]]:
+    """
+    Stream (authors, texts) chunks, reading only the two needed columns.
+
+    Rows with a missing author or text are dropped; values come back as str.
+    """
+    fmt = corpus_format(path)
+    if fmt == "csv":
+        header = pd.read_csv(path, nrows=0).columns
+        if text_col not in header or author_col not in header:
+            raise ValueError(f"CSV must have '{author_col}' and '{text_col}' columns.")
+        frames: Iterable[pd.DataFrame] = pd.read_csv(
+            path,
+            usecols=[author_col, text_col],
+            dtype="string",  # type: ignore[arg-type]
+            chunksize=chunksize,
+        )
+    elif fmt == "ndjson":
+        frames = pd.read_json(  # pyright: ignore[reportCallIssue]
+            path,
+            lines=True,
+            chunksize=chunksize,
+            dtype={author_col: "string", text_col: "string"},  # pyright: ignore[reportArgumentType]
+        )
+    else:
+        yield from _iter_parquet_chunks(path, text_col, author_col, chunksize)
+        return
+
+    for chunk in frames:
+        if text_col not in chunk.columns or author_col not in chunk.columns:
+            raise ValueError(
+                f"Input must have '{author_col}' and '{text_col}' columns."
+            )
+        chunk = chunk[[author_col, text_col]].dropna()
+        yield (
+            chunk[author_col].astype(str).tolist(),
+            chunk[text_col].astype(str).tolist(),
+        )
+
+
+def _iter_parquet_chunks(
+    path: str | Path, text_col: str, author_col: str, chunksize: int
+) -> Iterator[Tuple[List[str], List[str]]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:  # optional dependency
+        raise ImportError("Reading Parquet corpora requires pyarrow.") from e
+
+    pf = pq.ParquetFile(path)
+    names = pf.schema_arrow.names
+    if text_col not in names or author_col not in names:
+        raise ValueError(f"Parquet must have '{author_col}' and '{text_col}' columns.")
+    for batch in pf.iter_batches(batch_size=chunksize, columns=[author_col, text_col]):
+        authors_raw = batch.column(author_col).to_pylist()
+        texts_raw = batch.column(text_col).to_pylist()
+        authors: List[str] = []
+        texts: List[str] = []
+        for a, t in zip(authors_raw, texts_raw):
+            if a is None or t is None:
+                continue
+            authors.append(str(a))
+            texts.append(str(t))
+        yield authors, texts
 
 
 def load_author_corpus(
@@ -21,26 +158,57 @@ def load_author_corpus(
     author_col: str = "author",
     min_text_len: int = 50,
     min_texts_per_author: int = 2,
-) -> Tuple[pd.DataFrame, List[str], List[str]]:
+    chunksize: int = 100_000,
+) -> AuthorCorpus:
     """
-    Load a CSV of author-text rows and apply minimal filtering.
+    Stream author-text rows from CSV/Parquet/NDJSON and apply minimal filtering.
+
+    Pass 1 keeps only texts of length >= `min_text_len` while reading chunks;
+    pass 2 drops authors with fewer than `min_texts_per_author` kept texts.
+    Only the kept strings are retained, so peak memory tracks their size.
     """
-    df = pd.read_csv(path)
-    if text_col not in df.columns or author_col not in df.columns:
-        raise ValueError(f"CSV must have '{author_col}' and '{text_col}' columns.")
-    df = df.dropna(subset=[text_col, author_col]).copy()
-    df[text_col] = df[text_col].astype(str)
-    df["__len__"] = df[text_col].str.len()
-    df = df[df["__len__"] >= min_text_len].copy()
-    df.drop(columns=["__len__"], inplace=True)
-
-    counts = df[author_col].value_counts()  # pyright: ignore[reportAttributeAccessIssue]
-    keep_authors = set(counts[counts >= min_texts_per_author].index)  # pyright: ignore[reportAttributeAccessIssue]
-    df = df[df[author_col].isin(keep_authors)].reset_index(drop=True)  # pyright: ignore[reportArgumentType, reportAttributeAccessIssue]
-
-    texts = df[text_col].tolist()
-    authors = df[author_col].tolist()
-    return df, texts, authors  # pyright: ignore[reportReturnType]
+    texts: List[str] = []
+    codes = array("i")
+    name_to_code: Dict[str, int] = {}
+    names: List[str] = []
+
+    for chunk_authors, chunk_texts in iter_corpus_chunks(
+        path, text_col=text_col, author_col=author_col, chunksize=chunksize
+    ):
+        for a, t in zip(chunk_authors, chunk_texts):
+            if len(t) < min_text_len:
+                continue
+            code = name_to_code.get(a)
+            if code is None:
+                code = name_to_code[a] = len(names)
+                names.append(a)
+            codes.append(code)
+            texts.append(t)
+    del name_to_code
+
+    author_ids = np.frombuffer(codes, dtype=np.int32) if codes else np.empty(0, np.int32)
+    counts = np.bincount(author_ids, minlength=len(names))
+    keep = counts[author_ids] >= min_texts_per_author
+    if not keep.all():
+        texts = [t for t, k in zip(texts, keep.tolist()) if k]
+        author_ids = author_ids[keep]
+
+    return _build_corpus(texts, author_ids, names)
+
+
+def _build_corpus(
+    texts: List[str], author_ids: np.ndarray, names: List[str]
+) -> AuthorCorpus:
+    # Re-code kept authors densely, in order of first appearance
+    kept_codes, first = np.unique(author_ids, return_index=True)
+    order = kept_codes[np.argsort(first)]
+    remap = np.full(len(names), -1, dtype=np.int32)
+    remap[order] = np.arange(len(order), dtype=np.int32)
+    return AuthorCorpus(
+        texts=texts,
+        author_ids=remap[author_ids],
+        author_names=[names[c] for c in order.tolist()],
+    )
 
 
 def group_split_by_author(
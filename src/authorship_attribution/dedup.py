@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_SHINGLE_BASE = np.uint64(1_000_003)
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """
+    splitmix64 finalizer: spreads rolling-hash values over all 64 bits.
+    """
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def shingle_hashes(text: str, shingle_size: int = 5, lowercase: bool = True) -> np.ndarray:
+    """
+    Unique 64-bit hashes of the text's UTF-8 byte shingles (vectorized).
+    """
+    t = text.lower() if lowercase else text
+    b = np.frombuffer(t.encode("utf-8", errors="replace"), dtype=np.uint8)
+    n = len(b) - shingle_size + 1
+    if n <= 0:
+        # Shorter than one shingle: the whole text is its only shingle
+        n, shingle_size = 1, len(b)
+    h = np.zeros(n, dtype=np.uint64)
+    for j in range(shingle_size):
+        h = h * _SHINGLE_BASE + b[j : j + n]
+    return np.unique(_mix64(h))
+
+
+def minhash_signatures(
+    texts: Sequence[str],
+    num_perm: int = 128,
+    shingle_size: int = 5,
+    lowercase: bool = True,
+    batch_size: int = 1000,
+    seed: int = 42,
+) -> np.ndarray:
+    """
+    MinHash signatures (N, num_perm) uint32 of char shingles.
+
+    Each permutation is a multiply-shift hash of the shingle hashes; batches
+    of texts are concatenated so the per-text minimum is one reduceat call.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    c = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    out = np.empty((len(texts), num_perm), dtype=np.uint32)
+    shift = np.uint64(32)
+    for start in range(0, len(texts), batch_size):
+        parts = [shingle_hashes(t, shingle_size, lowercase) for t in texts[start : start + batch_size]]
+        lens = np.fromiter((len(p) for p in parts), dtype=np.int64, count=len(parts))
+        offsets = np.concatenate([[0], np.cumsum(lens)[:-1]])
+        H = np.concatenate(parts)
+        block = out[start : start + len(parts)]
+        for p in range(num_perm):
+            hv = ((a[p] * H + c[p]) >> shift).astype(np.uint32)
+            block[:, p] = np.minimum.reduceat(hv, offsets)
+    return out
+
+
+def lsh_params(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    (bands, rows) with bands * rows == num_perm whose S-curve midpoint
+    (1 / bands) ** (1 / rows) is closest to the Jaccard threshold.
+    """
+    best = (num_perm, 1)
+    best_err = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        err = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+def near_duplicate_clusters(
+    signatures: np.ndarray,
+    threshold: float = 0.8,
+    bands: int | None = None,
+) -> np.ndarray:
+    """
+    Representative (smallest) row index of each row's near-duplicate cluster.
+
+    LSH banding proposes candidates; within a bucket every member is only
+    compared with the bucket's first member, so work is linear in N per
+    band. Candidates whose estimated Jaccard similarity (the fraction of
+    equal signature entries) reaches `threshold` are joined into clusters.
+    """
+    n, num_perm = signatures.shape
+    if bands is None:
+        bands, rows = lsh_params(num_perm, threshold)
+    else:
+        rows = num_perm // bands
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    left: List[np.ndarray] = []
+    right: List[np.ndarray] = []
+    for band in range(bands):
+        cols = signatures[:, band * rows : (band + 1) * rows].astype(np.uint64)
+        key = np.zeros(n, dtype=np.uint64)
+        for j in range(rows):
+            key = _mix64(key * _MERSENNE + cols[:, j])
+        order = np.argsort(key, kind="stable")
+        sk = key[order]
+        starts = np.flatnonzero(np.r_[True, sk[1:] != sk[:-1]])
+        run = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+        rep = order[starts[run]]
+        dup = rep != order
+        left.append(rep[dup])
+        right.append(order[dup])
+
+    i = np.concatenate(left)
+    j = np.concatenate(right)
+    if len(i):
+        pairs = np.unique(np.stack([i, j], axis=1), axis=0)
+        i, j = pairs[:, 0], pairs[:, 1]
+        sim = np.empty(len(i), dtype=np.float64)
+        for s in range(0, len(i), 100_000):
+            e = s + 100_000
+            sim[s:e] = np.mean(signatures[i[s:e]] == signatures[j[s:e]], axis=1)
+        ok = sim >= threshold
+        i, j = i[ok], j[ok]
+
+    graph = coo_matrix((np.ones(len(i), dtype=np.int8), (i, j)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    # Representative = smallest index in each component
+    first = np.full(labels.max() + 1, n, dtype=np.int64)
+    np.minimum.at(first, labels, np.arange(n))
+    return first[labels]
+
+
+@dataclass(frozen=True)
+class DedupResult:
+    keep: np.ndarray
+    representative: np.ndarray
+    n_removed: int
+    n_clusters: int
+    seconds: float
+
+
+def dedup_texts(
+    texts: Sequence[str],
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    shingle_size: int = 5,
+    keep: str = "first",
+    batch_size: int = 1000,
+    seed: int = 42,
+) -> DedupResult:
+    """
+    Find near-duplicate texts and choose which indices to keep.
+
+    keep="first" collapses each cluster of near-duplicates into its first
+    text; keep="none" drops every text that has a near-duplicate.
+    """
+    if keep not in ("first", "none"):
+        raise ValueError("keep must be 'first' or 'none'")
+    if not 0.0 < threshold <= 1.0:
+        raise ValueError("threshold must be in (0, 1].")
+    logger = logging.getLogger(__name__)
+    t0 = time.perf_counter()
+
+    sigs = minhash_signatures(
+        texts,
+        num_perm=num_perm,
+        shingle_size=shingle_size,
+        batch_size=batch_size,
+        seed=seed,
+    )
+    rep = near_duplicate_clusters(sigs, threshold=threshold)
+    idx = np.arange(len(texts))
+    sizes = np.bincount(rep, minlength=len(texts))
+    if keep == "first":
+        keep_idx = idx[rep == idx]
+    else:
+        keep_idx = idx[sizes[rep] == 1]
+    n_clusters = int(np.count_nonzero(sizes > 1))
+    seconds = time.perf_counter() - t0
+    logger.info(
+        "Dedup: %d of %d texts removed (%d near-duplicate clusters) in %.2fs",
+        len(texts) - len(keep_idx),
+        len(texts),
+        n_clusters,
+        seconds,
+    )
+    return DedupResult(
+        keep=keep_idx,
+        representative=rep,
+        n_removed=int(len(texts) - len(keep_idx)),
+        n_clusters=n_clusters,
+        seconds=seconds,
+    )
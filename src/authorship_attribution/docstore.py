@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from authorship_attribution.embeddings import (
+    EmbeddingStoreWriter,
+    iter_embeddings_logged,
+)
+
+_MANIFEST = "store.json"
+_FORMAT_VERSION = 1
+
+
+@dataclass
+class Segment:
+    """
+    One append-only block of documents.
+
+    emb:   (n, dim) float32 embeddings, row order
+    ids:   (n,) document IDs, row order
+    order: (n,) argsort of ids, for binary-search lookup
+    live:  (n,) bool, False once a row is removed or superseded (the only
+           file that is modified in place)
+    """
+
+    name: str
+    emb: np.ndarray
+    ids: np.ndarray
+    order: np.ndarray
+    live: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def find(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Row of each key in this segment, -1 where absent or dead.
+        """
+        if len(self) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.searchsorted(self.ids, keys, sorter=self.order)
+        pos = np.minimum(pos, len(self) - 1)
+        rows = np.asarray(self.order[pos], dtype=np.int64)
+        hit = (self.ids[rows] == keys) & self.live[rows]
+        return np.where(hit, rows, -1)
+
+
+class DocumentStore:
+    """
+    Disk-backed float32 document embeddings addressable by string ID.
+
+    Tied to one extractor fingerprint. Each add() writes a new memory-mapped
+    segment; remove() and re-adding an ID only flip live flags, and
+    compact() rewrites the live rows into one segment (run automatically
+    once there are more than `max_segments` segments or the dead fraction
+    exceeds `max_dead_fraction`). Opening reads the manifest and memory-maps
+    the segment files, so it costs the same for 10 documents or 10M.
+    Single writer; readers should reopen after a compaction.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        manifest: Dict[str, Any],
+        max_segments: int = 16,
+        max_dead_fraction: float = 0.25,
+    ):
+        self.path = Path(path)
+        self.manifest = manifest
+        self.max_segments = max_segments
+        self.max_dead_fraction = max_dead_fraction
+        self.segments: List[Segment] = [
+            self._open_segment(s["name"]) for s in manifest["segments"]
+        ]
+
+    # -------- opening -------- #
+    @classmethod
+    def create(cls, path: str | Path, extractor: Any, **kwargs: Any) -> "DocumentStore":
+        root = Path(path)
+        if (root / _MANIFEST).is_file():
+            raise FileExistsError(f"A document store already exists at {root}")
+        root.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "format_version": _FORMAT_VERSION,
+            "extractor_fingerprint": extractor.fingerprint(),
+            "dim": int(extractor.output_dim),
+            "next_segment": 0,
+            "segments": [],
+        }
+        store = cls(root, manifest, **kwargs)
+        store._save_manifest()
+        return store
+
+    @classmethod
+    def open(cls, path: str | Path, **kwargs: Any) -> "DocumentStore":
+        root = Path(path)
+        manifest = json.loads((root / _MANIFEST).read_text(encoding="utf-8"))
+        if manifest.get("format_version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported document store format in {root}")
+        return cls(root, manifest, **kwargs)
+
+    @classmethod
+    def open_or_create(
+        cls, path: str | Path, extractor: Any, **kwargs: Any
+    ) -> "DocumentStore":
+        if (Path(path) / _MANIFEST).is_file():
+            store = cls.open(path, **kwargs)
+            store.check_extractor(extractor)
+            return store
+        return cls.create(path, extractor, **kwargs)
+
+    @property
+    def fingerprint(self) -> str:
+        return self.manifest["extractor_fingerprint"]
+
+    @property
+    def dim(self) -> int:
+        return int(self.manifest["dim"])
+
+    def check_extractor(self, extractor: Any) -> None:
+        if extractor.fingerprint() != self.fingerprint:
+            raise ValueError(
+                f"Document store {self.path} was built with a different extractor "
+                "(fingerprint mismatch)."
+            )
+
+    def _file(self, name: str, part: str) -> Path:
+        return self.path / f"{name}.{part}.npy"
+
+    def _open_segment(self, name: str) -> Segment:
+        return Segment(
+            name=name,
+            emb=np.load(self._file(name, "emb"), mmap_mode="r"),
+            ids=np.load(self._file(name, "ids"), mmap_mode="r"),
+            order=np.load(self._file(name, "order"), mmap_mode="r"),
+            live=np.load(self._file(name, "live"), mmap_mode="r+"),
+        )
+
+    def _save_manifest(self) -> None:
+        tmp = self.path / (_MANIFEST + ".tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path / _MANIFEST)
+
+    # -------- size / lookup -------- #
+    def __len__(self) -> int:
+        return sum(int(s["live"]) for s in self.manifest["segments"])
+
+    @property
+    def n_rows(self) -> int:
+        return sum(int(s["rows"]) for s in self.manifest["segments"])
+
+    def __contains__(self, doc_id: str) -> bool:
+        return bool(self._locate(np.asarray([doc_id], dtype=str))[0][0] >= 0)
+
+    def _locate(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (segment index, row) per key; segment -1 when the ID is not live.
+        """
+        seg = np.full(len(keys), -1, dtype=np.int64)
+        row = np.full(len(keys), -1, dtype=np.int64)
+        for si in range(len(self.segments) - 1, -1, -1):
+            todo = np.flatnonzero(seg < 0)
+            if len(todo) == 0:
+                break
+            r = self.segments[si].find(keys[todo])
+            hit = r >= 0
+            seg[todo[hit]] = si
+            row[todo[hit]] = r[hit]
+        return seg, row
+
+    def get(self, doc_ids: Sequence[str]) -> np.ndarray:
+        """
+        (len(doc_ids), dim) embeddings; KeyError for unknown IDs.
+        """
+        keys = np.asarray(list(doc_ids), dtype=str)
+        seg, row = self._locate(keys)
+        if (seg < 0).any():
+            missing = keys[seg < 0][:5].tolist()
+            raise KeyError(f"Unknown document IDs: {missing}")
+        out = np.empty((len(keys), self.dim), dtype=np.float32)
+        for si in np.unique(seg):
+            m = seg == si
+            out[m] = self.segments[si].emb[row[m]]
+        return out
+
+    def iter_live(
+        self, chunk_size: int = 65_536
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (ids, embeddings) of the live rows in blocks of at most `chunk_size`
+        stored rows; fully live blocks are memmap slices, not copies.
+        """
+        for s in self.segments:
+            for start in range(0, len(s), chunk_size):
+                end = min(start + chunk_size, len(s))
+                live = np.asarray(s.live[start:end])
+                if live.all():
+                    yield s.ids[start:end], s.emb[start:end]
+                elif live.any():
+                    rows = start + np.flatnonzero(live)
+                    yield s.ids[rows], s.emb[rows]
+
+    # -------- mutation -------- #
+    def _kill(self, seg: np.ndarray, row: np.ndarray) -> int:
+        """
+        Mark rows dead; returns how many were live (repeats count once).
+        """
+        n = 0
+        for si in np.unique(seg[seg >= 0]):
+            s = self.segments[si]
+            rows = np.unique(row[seg == si])
+            rows = rows[np.asarray(s.live[rows])]
+            if len(rows) == 0:
+                continue
+            s.live[rows] = False
+            s.live.flush()
+            self.manifest["segments"][si]["live"] -= int(len(rows))
+            n += int(len(rows))
+        return n
+
+    def add(self, doc_ids: Sequence[str], embeddings: np.ndarray) -> None:
+        """
+        Append documents as a new segment; IDs already present are replaced.
+        """
+        keys = np.asarray(list(doc_ids), dtype=str)
+        emb = np.asarray(embeddings, dtype=np.float32)
+        if emb.shape != (len(keys), self.dim):
+            raise ValueError(f"Expected embeddings of shape ({len(keys)}, {self.dim})")
+        if len(np.unique(keys)) != len(keys):
+            raise ValueError("Duplicate IDs in one add() call.")
+        if len(keys) == 0:
+            return
+        self._kill(*self._locate(keys))
+
+        name = f"seg_{self.manifest['next_segment']:05d}"
+        with EmbeddingStoreWriter(self._file(name, "emb"), len(keys), self.dim) as w:
+            w.write(emb)
+        np.save(self._file(name, "ids"), keys)
+        np.save(self._file(name, "order"), np.argsort(keys, kind="stable"))
+        np.save(self._file(name, "live"), np.ones(len(keys), dtype=bool))
+        self.manifest["next_segment"] += 1
+        self.manifest["segments"].append(
+            {"name": name, "rows": int(len(keys)), "live": int(len(keys))}
+        )
+        self._save_manifest()  # the segment becomes visible here
+        self.segments.append(self._open_segment(name))
+        self.maybe_compact()
+
+    def add_texts(
+        self,
+        doc_ids: Sequence[str],
+        texts: Sequence[str],
+        extractor: Any,
+        batch_size: int = 4096,
+        workers: int = 1,
+    ) -> None:
+        if len(doc_ids) != len(texts):
+            raise ValueError("doc_ids and texts must have the same length.")
+        self.check_extractor(extractor)
+        blocks = list(iter_embeddings_logged(extractor, texts, batch_size, workers))
+        emb = np.vstack(blocks) if blocks else np.zeros((0, self.dim), np.float32)
+        self.add(doc_ids, emb)
+
+    def remove(self, doc_ids: Sequence[str]) -> int:
+        """
+        Drop documents by ID; returns how many distinct IDs were present.
+        """
+        keys = np.unique(np.asarray(list(doc_ids), dtype=str))
+        n = self._kill(*self._locate(keys))
+        if n:
+            self._save_manifest()
+            self.maybe_compact()
+        return n
+
+    def maybe_compact(self) -> bool:
+        rows = self.n_rows
+        dead = rows - len(self)
+        if len(self.segments) > self.max_segments or (
+            rows and dead / rows > self.max_dead_fraction
+        ):
+            self.compact()
+            return True
+        return False
+
+    def compact(self) -> None:
+        """
+        Rewrite all live rows into a single segment and delete the old files.
+        """
+        logger = logging.getLogger(__name__)
+        old = self.segments
+        n_live = len(self)
+        name = f"seg_{self.manifest['next_segment']:05d}"
+        ids_parts: List[np.ndarray] = []
+        with EmbeddingStoreWriter(self._file(name, "emb"), n_live, self.dim) as w:
+            for ids, emb in self.iter_live():
+                w.write(emb)
+                ids_parts.append(np.asarray(ids))
+        keys = np.concatenate(ids_parts) if ids_parts else np.zeros(0, dtype=str)
+        np.save(self._file(name, "ids"), keys)
+        np.save(self._file(name, "order"), np.argsort(keys, kind="stable"))
+        np.save(self._file(name, "live"), np.ones(len(keys), dtype=bool))
+        self.manifest["next_segment"] += 1
+        self.manifest["segments"] = [{"name": name, "rows": n_live, "live": n_live}]
+        self._save_manifest()
+        self.segments = [self._open_segment(name)]
+        for s in old:
+            del s.emb, s.ids, s.order, s.live
+            for part in ("emb", "ids", "order", "live"):
+                self._file(s.name, part).unlink(missing_ok=True)
+        logger.info(
+            "Compacted document store %s: %d live documents.", self.path, n_live
+        )
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+from authorship_attribution import runtime
+from authorship_attribution.features import FeatureExtractor
+
+
+class EmbeddingStoreWriter:
+    """
+    Preallocated float32 `.npy` file filled in row blocks through np.memmap.
+
+    Rows go to a `.partial` file that is renamed into place by close(), so an
+    interrupted run never leaves a truncated store behind a cache path.
+    """
+
+    def __init__(self, path: str | Path, n_rows: int, dim: int):
+        self.path = Path(path)
+        self.n_rows = int(n_rows)
+        self.dim = int(dim)
+        self.rows_written = 0
+        self._tmp = self.path.with_name(self.path.name + ".partial")
+        self._mm = np.lib.format.open_memmap(
+            self._tmp, mode="w+", dtype=np.float32, shape=(self.n_rows, self.dim)
+        )
+
+    def write(self, block: np.ndarray) -> None:
+        block = np.asarray(block, dtype=np.float32)
+        if block.ndim != 2 or block.shape[1] != self.dim:
+            raise ValueError(f"Expected blocks of shape (k, {self.dim}), got {block.shape}")
+        end = self.rows_written + block.shape[0]
+        if end > self.n_rows:
+            raise ValueError(f"Store holds {self.n_rows} rows; got {end}.")
+        self._mm[self.rows_written : end] = block
+        self.rows_written = end
+
+    def write_rows(self, row_ids: np.ndarray, block: np.ndarray) -> None:
+        """
+        Scatter a block to explicit row positions (e.g. when merging shards).
+        """
+        block = np.asarray(block, dtype=np.float32)
+        if block.ndim != 2 or block.shape != (len(row_ids), self.dim):
+            raise ValueError(f"Expected a block of shape ({len(row_ids)}, {self.dim})")
+        self._mm[np.asarray(row_ids, dtype=np.int64)] = block
+        self.rows_written += len(row_ids)
+
+    def close(self) -> Path:
+        if self.rows_written != self.n_rows:
+            raise ValueError(
+                f"Store incomplete: wrote {self.rows_written} of {self.n_rows} rows."
+            )
+        self._mm.flush()
+        del self._mm
+        os.replace(self._tmp, self.path)
+        return self.path
+
+    def abort(self) -> None:
+        if hasattr(self, "_mm"):
+            del self._mm
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self) -> "EmbeddingStoreWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.abort()
+        elif hasattr(self, "_mm"):
+            self.close()
+
+
+def _meta_path(path: str | Path) -> Path:
+    p = Path(path)
+    return p.with_name(p.name + ".json")
+
+
+def write_store_meta(path: str | Path, meta: Dict[str, Any]) -> None:
+    """
+    Sidecar JSON describing a store (extractor fingerprint, texts digest...).
+    """
+    _meta_path(path).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+
+def read_store_meta(path: str | Path) -> Dict[str, Any] | None:
+    p = _meta_path(path)
+    if not p.is_file():
+        return None
+    return json.loads(p.read_text(encoding="utf-8"))
+
+
+def open_embedding_store(path: str | Path) -> np.ndarray:
+    """
+    Open a finished store read-only; rows are paged in on access.
+    """
+    return np.load(Path(path), mmap_mode="r")
+
+
+_WORKER_EXTRACTOR: FeatureExtractor | None = None
+
+
+def _init_embed_worker(extractor: FeatureExtractor) -> None:
+    global _WORKER_EXTRACTOR
+    _WORKER_EXTRACTOR = extractor
+
+
+def _embed_batch_in_worker(texts: List[str]) -> np.ndarray:
+    assert _WORKER_EXTRACTOR is not None
+    return _WORKER_EXTRACTOR.transform(texts)
+
+
+def iter_embeddings_parallel(
+    extractor: FeatureExtractor,
+    texts: Sequence[str],
+    batch_size: int = 4096,
+    workers: int | None = None,
+) -> Iterator[np.ndarray]:
+    """
+    transform_iter() spread over a runtime process pool; batches come back
+    in order, with at most two per worker in flight.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    n_workers = runtime.get_config().pool_workers(workers)
+    with runtime.process_pool(
+        n_workers, initializer=_init_embed_worker, initargs=(extractor,)
+    ) as ex:
+        pending: Deque[Future] = deque()
+        limit = 2 * n_workers
+        for start in range(0, len(texts), batch_size):
+            batch = list(texts[start : start + batch_size])
+            pending.append(ex.submit(_embed_batch_in_worker, batch))
+            if len(pending) >= limit:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_embeddings_logged(
+    extractor: FeatureExtractor,
+    texts: List[str],
+    batch_size: int,
+    workers: int = 1,
+) -> Iterable[np.ndarray]:
+    """
+    transform_iter() (or its process-pool variant for workers > 1) with
+    per-batch progress and throughput logging.
+    """
+    logger = logging.getLogger(__name__)
+    n = len(texts)
+    done = 0
+    t_start = time.perf_counter()
+    if workers > 1:
+        blocks = iter_embeddings_parallel(extractor, texts, batch_size, workers)
+    else:
+        blocks = extractor.transform_iter(texts, batch_size=batch_size)
+    for block in blocks:
+        done += block.shape[0]
+        elapsed = time.perf_counter() - t_start
+        logger.info(
+            "Embedded %s/%s texts (%.1f%%) | %.1f texts/s",
+            f"{done:,}",
+            f"{n:,}",
+            100.0 * done / max(1, n),
+            done / max(elapsed, 1e-9),
+        )
+        yield block
+
+
+def embed_to_store(
+    extractor: FeatureExtractor,
+    texts: List[str],
+    path: str | Path,
+    batch_size: int = 4096,
+    workers: int = 1,
+) -> np.ndarray:
+    """
+    Embed texts batch by batch into an on-disk store and reopen it with mmap.
+    """
+    with EmbeddingStoreWriter(path, len(texts), extractor.output_dim) as writer:
+        for block in iter_embeddings_logged(extractor, texts, batch_size, workers):
+            writer.write(block)
+    return open_embedding_store(path)
+
+
+def embed_in_memory(
+    extractor: FeatureExtractor,
+    texts: List[str],
+    batch_size: int = 4096,
+    workers: int = 1,
+) -> np.ndarray:
+    """
+    Embed texts batch by batch into one preallocated array.
+    """
+    out = np.empty((len(texts), extractor.output_dim), dtype=np.float32)
+    start = 0
+    for block in iter_embeddings_logged(extractor, texts, batch_size, workers):
+        out[start : start + block.shape[0]] = block
+        start += block.shape[0]
+    return out
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ScoreCurve:
+    """
+    Confusion counts at every distinct score, computed with a single sort.
+
+    Entry k describes the classifier that predicts positive for all scores
+    >= thresholds[k] (thresholds are in decreasing order), so every metric
+    below is exact rather than sampled at a grid of percentiles.
+    """
+
+    thresholds: np.ndarray
+    tp: np.ndarray
+    fp: np.ndarray
+    n_pos: int
+    n_neg: int
+
+    @classmethod
+    def from_scores(cls, y_true: np.ndarray, y_prob: np.ndarray) -> "ScoreCurve":
+        y_true = np.asarray(y_true)
+        y_prob = np.asarray(y_prob, dtype=np.float64)
+        if y_true.ndim != 1 or y_prob.ndim != 1 or y_true.shape[0] != y_prob.shape[0]:
+            raise ValueError("y_true and y_prob must be 1D arrays of the same length.")
+
+        order = np.argsort(y_prob, kind="stable")[::-1]
+        scores = y_prob[order]
+        hits = y_true[order] == 1
+        del order
+
+        # Last position of each run of equal scores
+        ends = np.flatnonzero(np.diff(scores))
+        ends = np.append(ends, len(scores) - 1) if len(scores) else ends
+        tp = np.cumsum(hits, dtype=np.int64)[ends]
+        fp = ends + 1 - tp
+        n_pos = int(tp[-1]) if len(tp) else 0
+        n_neg = int(len(scores) - n_pos)
+        return cls(
+            thresholds=scores[ends],
+            tp=tp,
+            fp=fp,
+            n_pos=n_pos,
+            n_neg=n_neg,
+        )
+
+    @property
+    def n(self) -> int:
+        return self.n_pos + self.n_neg
+
+    # -------- per-threshold metrics -------- #
+    def precision(self) -> np.ndarray:
+        return self.tp / np.maximum(1, self.tp + self.fp)
+
+    def recall(self) -> np.ndarray:
+        return self.tp / max(1, self.n_pos)
+
+    def f1(self) -> np.ndarray:
+        # 2PR / (P + R) == 2TP / (TP + FP + P), zero when TP == 0
+        return 2.0 * self.tp / np.maximum(1, self.tp + self.fp + self.n_pos)
+
+    def accuracy(self) -> np.ndarray:
+        tn = self.n_neg - self.fp
+        return (self.tp + tn) / max(1, self.n)
+
+    def fpr(self) -> np.ndarray:
+        return self.fp / max(1, self.n_neg)
+
+    # -------- summaries -------- #
+    def roc_auc(self) -> float:
+        """
+        Trapezoidal ROC AUC (tie-aware). Returns NaN if not defined.
+        """
+        if self.n_pos == 0 or self.n_neg == 0:
+            return float("nan")
+        tpr = np.concatenate([[0.0], self.tp / self.n_pos])
+        fpr = np.concatenate([[0.0], self.fp / self.n_neg])
+        return float(np.trapezoid(tpr, fpr))
+
+    def best_threshold(self) -> float:
+        """
+        Exact F1-maximizing threshold (the highest one on ties).
+        """
+        if len(self.thresholds) == 0:
+            return 0.5
+        return float(self.thresholds[int(np.argmax(self.f1()))])
+
+    def at_threshold(self, threshold: float) -> Dict[str, float]:
+        """
+        Accuracy/precision/recall/F1 of the rule `score >= threshold`.
+        """
+        # Number of distinct scores >= threshold (thresholds are decreasing)
+        k = int(np.searchsorted(-self.thresholds, -float(threshold), side="right"))
+        tp = int(self.tp[k - 1]) if k > 0 else 0
+        fp = int(self.fp[k - 1]) if k > 0 else 0
+        tn = self.n_neg - fp
+        return {
+            "accuracy": (tp + tn) / max(1, self.n),
+            "precision": tp / max(1, tp + fp),
+            "recall": tp / max(1, self.n_pos),
+            "f1": 2.0 * tp / max(1, tp + fp + self.n_pos),
+            "threshold": float(threshold),
+        }
+
+    # -------- curves -------- #
+    def roc_curve(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (fpr, tpr, thresholds), starting at the (0, 0) point like sklearn.
+        """
+        fpr = np.concatenate([[0.0], self.fpr()])
+        tpr = np.concatenate([[0.0], self.recall()])
+        thr = np.concatenate([[np.inf], self.thresholds])
+        return fpr, tpr, thr
+
+    def pr_curve(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (precision, recall, thresholds) in decreasing threshold order.
+        """
+        return self.precision(), self.recall(), self.thresholds.copy()
+
+    def save(self, path: str | Path) -> Path:
+        """
+        Export ROC/PR curves and per-threshold metrics as a compressed .npz.
+        """
+        p = Path(path)
+        fpr, tpr, roc_thr = self.roc_curve()
+        np.savez_compressed(
+            p,
+            thresholds=self.thresholds,
+            tp=self.tp,
+            fp=self.fp,
+            precision=self.precision(),
+            recall=self.recall(),
+            f1=self.f1(),
+            accuracy=self.accuracy(),
+            roc_fpr=fpr,
+            roc_tpr=tpr,
+            roc_thresholds=roc_thr,
+            n_pos=self.n_pos,
+            n_neg=self.n_neg,
+        )
+        return p
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import sys
+import time
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Tuple
+from typing import Any, Iterator, List, Sequence, Tuple
 
 import numpy as np
 import re
+import scipy.sparse as sp
 from sklearn.decomposition import TruncatedSVD
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import StandardScaler
 
+from authorship_attribution import telemetry
+from authorship_attribution.vocab import CompactVocabulary, dict_nbytes
+
 _word_re = re.compile(r"[A-Za-z']+")
 
 # Subset of common English function words (can be extended)
@@ -159,6 +168,11 @@ FUNCTION_WORDS: List[str] = [
 ]
 
 
+# Column of each function word; duplicates in FUNCTION_WORDS collapse here,
+# so this (not the list) determines the width of the function-word block.
+_FW_VOCAB = {w: i for i, w in enumerate(FUNCTION_WORDS)}
+
+
 def simple_tokenize(text: str, lowercase: bool = True) -> List[str]:
     t = text.lower() if lowercase else text
     return _word_re.findall(t)
@@ -172,6 +186,200 @@ def count_selected_punct(text: str) -> dict:
     }
 
 
+# Raw character tallies behind the light stylistic features, in this order
+_CHAR_TALLIES = (
+    "length",
+    "upper",
+    "digit",
+    "comma",
+    "period",
+    "exclamation",
+    "question",
+    "semicolon",
+    "colon",
+    "dash",
+    "quote",
+    "paren",
+    "ellipsis",
+)
+
+
+def _char_tallies(text: str) -> np.ndarray:
+    return np.array(
+        [
+            len(text),
+            sum(map(str.isupper, text)),
+            sum(map(str.isdigit, text)),
+            text.count(","),
+            text.count("."),
+            text.count("!"),
+            text.count("?"),
+            text.count(";"),
+            text.count(":"),
+            text.count("-"),
+            text.count('"') + text.count("'"),
+            text.count("(") + text.count(")"),
+            text.count("..."),  # ellipsis approx
+        ],
+        dtype=np.int64,
+    )
+
+
+@dataclass
+class StyleTally:
+    """
+    Mergeable raw counts behind the function-word and 14 light features.
+
+    Counts (unlike the ratios computed from them) can be summed across
+    windows or appended chunks of one document.
+    """
+
+    fw_counts: np.ndarray = field(
+        default_factory=lambda: np.zeros(max(_FW_VOCAB.values()) + 1, np.int64)
+    )
+    n_tokens: int = 0
+    token_chars: int = 0
+    types: Counter = field(default_factory=Counter)
+    chars: np.ndarray = field(
+        default_factory=lambda: np.zeros(len(_CHAR_TALLIES), np.int64)
+    )
+
+    @classmethod
+    def from_text(cls, text: str) -> "StyleTally":
+        tally = cls(chars=_char_tallies(text))
+        tally.add_tokens(simple_tokenize(text, lowercase=True))
+        return tally
+
+    def add_tokens(self, toks: List[str], sign: int = 1) -> None:
+        for t in toks:
+            idx = _FW_VOCAB.get(t)
+            if idx is not None:
+                self.fw_counts[idx] += sign
+            self.token_chars += sign * len(t)
+            self.types[t] += sign
+            if self.types[t] <= 0:
+                del self.types[t]
+        self.n_tokens += sign * len(toks)
+
+    def merge(self, other: "StyleTally") -> "StyleTally":
+        self.fw_counts += other.fw_counts
+        self.n_tokens += other.n_tokens
+        self.token_chars += other.token_chars
+        self.types.update(other.types)
+        self.chars += other.chars
+        return self
+
+    def features(self) -> np.ndarray:
+        """
+        (F + 14,) float32 row, identical to the per-text computation.
+        """
+        F = len(_FW_VOCAB)
+        x = np.zeros(F + 14, dtype=np.float32)
+        n = self.n_tokens
+        if n == 0:
+            # leave zeros
+            return x
+        # function word relative frequencies
+        x[:F] = self.fw_counts[:F] / n
+        c = self.chars.tolist()
+        txt_len = max(1, c[0])
+        x[F + 0] = self.token_chars / n  # avg word length
+        x[F + 1] = len(self.types) / n  # type-token ratio
+        x[F + 2 : F + 14] = [
+            c[3] / txt_len,  # comma
+            c[4] / txt_len,  # period
+            c[1] / txt_len,  # upper
+            c[2] / txt_len,  # digit
+            *(v / txt_len for v in c[5:]),
+        ]
+        return x
+
+
+@dataclass
+class SparseRandomProjector:
+    """
+    Very sparse random projection (entries +-sqrt(1/density / k) with
+    probability density / 2 each, else 0), a drop-in for TruncatedSVD.
+
+    The matrix is regenerated from (n_features_, n_components, density,
+    random_state) on first use and never pickled, so fitting is instant and
+    bundles stay small.
+    """
+
+    n_components: int
+    random_state: int = 42
+    density: float | None = None  # None: 1 / sqrt(n_features)
+    n_features_: int = 0
+    _matrix: Any = field(default=None, init=False, repr=False, compare=False)
+
+    def fit(self, X: Any) -> "SparseRandomProjector":
+        self.n_features_ = int(X.shape[1])
+        self._matrix = None
+        return self
+
+    def fit_transform(self, X: Any) -> np.ndarray:
+        return self.fit(X).transform(X)
+
+    @property
+    def density_(self) -> float:
+        if self.density is not None:
+            return float(self.density)
+        return 1.0 / np.sqrt(max(1, self.n_features_))
+
+    @property
+    def matrix(self) -> sp.csr_matrix:
+        """
+        (n_features_, n_components) float32 projection matrix.
+        """
+        if self._matrix is None:
+            if self.n_features_ < 1:
+                raise RuntimeError("Projector not fitted; call fit() first.")
+            n, k, d = self.n_features_, self.n_components, self.density_
+            rng = np.random.default_rng(self.random_state)
+            nnz = int(rng.binomial(n * k, d))
+            flat = rng.choice(n * k, size=nnz, replace=False)
+            signs = rng.integers(0, 2, size=nnz) * 2 - 1
+            values = (signs * np.sqrt(1.0 / (d * k))).astype(np.float32)
+            self._matrix = sp.csr_matrix(
+                (values, (flat // k, flat % k)), shape=(n, k), dtype=np.float32
+            )
+        return self._matrix
+
+    @property
+    def components_(self) -> sp.csc_matrix:
+        """
+        (n_components, n_features_) view, as TruncatedSVD.components_.
+        """
+        return self.matrix.T.tocsc()
+
+    def transform(self, X: Any) -> np.ndarray:
+        out = X @ self.matrix
+        if sp.issparse(out):
+            out = out.toarray()
+        return np.asarray(out, dtype=np.float32)
+
+    def params(self) -> dict:
+        return {
+            "n_components": self.n_components,
+            "random_state": self.random_state,
+            "density": float(self.density_),
+            "n_features": self.n_features_,
+        }
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        state["_matrix"] = None
+        return state
+
+
+# Projection backends for the char n-gram block: TruncatedSVD on all rows,
+# TruncatedSVD on a row sample, or a regenerable sparse random projection
+PROJECTIONS = ("svd", "svd_sample", "random")
+
+# N-gram strings looked up per batch by the compact-vocabulary transform
+_GRAM_CHUNK = 65_536
+
+
 @dataclass
 class FeatureExtractor:
     """
@@ -188,10 +396,26 @@ class FeatureExtractor:
     random_state: int = 42
     min_df: int = 2  # new: configurable min_df
 
+    # Document mode: texts longer than `window_chars` are embedded as
+    # fixed-size char windows and pooled into one vector (None disables).
+    window_chars: int | None = None
+    max_doc_chars: int | None = None  # cap on chars embedded per document
+    window_sampling: str = "head"  # head | uniform | random (when capped)
+    window_pooling: str = "mean"  # mean | length (length-weighted mean)
+    window_batch_size: int = 256
+
+    projection: str = "svd"  # one of PROJECTIONS
+    projection_sample: int = 10_000  # rows fitted by "svd_sample"
+
+    # Replace the fitted vocabulary_ dict by a CompactVocabulary after fit
+    compact_vocabulary: bool = True
+
     # Internal components (initialized in __post_init__)
     char_vec: TfidfVectorizer = field(init=False, repr=False)
-    svd: TruncatedSVD = field(init=False, repr=False)
+    svd: TruncatedSVD | SparseRandomProjector = field(init=False, repr=False)
     fw_scaler: StandardScaler | None = field(default=None, init=False, repr=False)
+    vocab: CompactVocabulary | None = field(default=None, init=False, repr=False)
+    vocab_memory: dict | None = field(default=None, init=False, repr=False)
 
     # Cached dims
     _fw_dim: int = field(default=0, init=False, repr=False)
@@ -206,14 +430,21 @@ class FeatureExtractor:
             sublinear_tf=True,
             dtype=np.float32,  # type: ignore[arg-type]
         )
-        self.svd = TruncatedSVD(
-            n_components=self.svd_dim,
-            random_state=self.random_state,
-            algorithm="randomized",
-        )
+        if self.projection not in PROJECTIONS:
+            raise ValueError(f"projection must be one of {PROJECTIONS}")
+        if self.projection == "random":
+            self.svd = SparseRandomProjector(
+                n_components=self.svd_dim, random_state=self.random_state
+            )
+        else:
+            self.svd = TruncatedSVD(
+                n_components=self.svd_dim,
+                random_state=self.random_state,
+                algorithm="randomized",
+            )
         if self.use_function_words:
             # number of function words + 14 light features
-            self._fw_dim = len(FUNCTION_WORDS) + 14
+            self._fw_dim = len(_FW_VOCAB) + 14
         else:
             self._fw_dim = 0
 
@@ -222,78 +453,310 @@ class FeatureExtractor:
         """
         Number of output features after transform().
         """
-        return self.svd_dim + self._fw_dim
+        fw_dim = len(_FW_VOCAB) + 14 if self.use_function_words else 0
+        return self.svd_dim + fw_dim
+
+    def set_document_mode(
+        self,
+        window_chars: int | None,
+        max_doc_chars: int | None = None,
+        sampling: str = "head",
+        pooling: str = "mean",
+    ) -> "FeatureExtractor":
+        """
+        Enable (or, with window_chars=None, disable) windowed embedding of
+        long texts. Can be switched on for an already fitted extractor.
+        """
+        if window_chars is not None and window_chars < 1:
+            raise ValueError("window_chars must be >= 1")
+        if sampling not in ("head", "uniform", "random"):
+            raise ValueError("sampling must be 'head', 'uniform' or 'random'")
+        if pooling not in ("mean", "length"):
+            raise ValueError("pooling must be 'mean' or 'length'")
+        self.window_chars = window_chars
+        self.max_doc_chars = max_doc_chars
+        self.window_sampling = sampling
+        self.window_pooling = pooling
+        return self
 
     def fit(self, texts: List[str]) -> "FeatureExtractor":
+        # In document mode, windows are the TF-IDF/SVD documents
+        char_docs = texts if self.window_chars is None else self._split_windows(texts)[0]
         # Fit TF-IDF + SVD without creating an intermediate dense array
-        X_char = self.char_vec.fit_transform(texts)
+        X_char = self.char_vec.fit_transform(char_docs)
+        if self.projection == "svd_sample" and X_char.shape[0] > self.projection_sample:
+            rng = np.random.default_rng(self.random_state)
+            rows = np.sort(
+                rng.choice(X_char.shape[0], size=self.projection_sample, replace=False)
+            )
+            X_char = X_char[rows]
         self.svd.fit(X_char)
 
         if self.use_function_words:
             fw = self._function_word_features_batch(texts)
             self.fw_scaler = StandardScaler().fit(fw)
 
+        self.vocab = None
+        if self.compact_vocabulary:
+            self.compact_char_vocabulary()
         return self
 
+    def compact_char_vocabulary(self) -> dict:
+        """
+        Swap the vectorizer's vocabulary_ dict for a CompactVocabulary and
+        drop the pruned-term set; transform() output is unchanged.
+        Returns (and keeps in vocab_memory) the sizes before and after.
+        """
+        vec = self.char_vec
+        if self.vocab is not None:
+            return self.vocab_memory or {}
+        pruned = getattr(vec, "stop_words_", None)  # gone in newer sklearn
+        before = dict_nbytes(vec.vocabulary_)
+        if pruned is not None:
+            before += sys.getsizeof(pruned) + sum(map(sys.getsizeof, pruned))
+        if not CompactVocabulary.supports(vec.vocabulary_):
+            return {}
+        self.vocab = CompactVocabulary.from_dict(
+            vec.vocabulary_, width=self.char_ngram_range[1]
+        )
+        del vec.vocabulary_
+        if pruned is not None:
+            del vec.stop_words_
+        self.vocab_memory = {
+            "terms": len(self.vocab),
+            "dict_bytes": int(before),
+            "compact_bytes": self.vocab.nbytes,
+        }
+        return self.vocab_memory
+
+    def char_columns(self, grams: Sequence[str]) -> np.ndarray:
+        """
+        Vocabulary column of each char n-gram (-1 when absent).
+        """
+        if self.vocab is not None:
+            return self.vocab.lookup(grams)
+        get = self.char_vec.vocabulary_.get
+        return np.fromiter(
+            (get(g, -1) for g in grams), dtype=np.int64, count=len(grams)
+        )
+
+    def char_terms(self) -> List[str]:
+        """
+        Char n-gram vocabulary in feature-column order.
+        """
+        if self.vocab is not None:
+            return self.vocab.terms_by_column()
+        terms = sorted(self.char_vec.vocabulary_.items(), key=lambda kv: kv[1])
+        return [t for t, _ in terms]
+
     def transform(self, texts: List[str]) -> np.ndarray:
-        X_char = self.char_vec.transform(texts)
-        X_svd = self.svd.transform(X_char)
+        # Stage timings go to the metrics registry when one is enabled
+        if self.window_chars is None:
+            with telemetry.timer("aa_stage_seconds", stage="vectorize"):
+                X_char = self._char_tfidf(texts)
+            with telemetry.timer("aa_stage_seconds", stage="svd"):
+                X_svd = self.svd.transform(X_char)
+        else:
+            X_svd = self._windowed_svd(texts)
 
         if self.use_function_words:
-            fw = self._function_word_features_batch(texts)
             if self.fw_scaler is None:
                 raise RuntimeError(
                     "Function-word scaler not initialized; call fit() first."
                 )
-            fw = self.fw_scaler.transform(fw)
+            with telemetry.timer("aa_stage_seconds", stage="stylometric"):
+                fw = self._function_word_features_batch(texts)
+                fw = self.fw_scaler.transform(fw)
             out = np.hstack([X_svd, fw])
         else:
             out = X_svd
         return out.astype(np.float32, copy=False)
 
+    def fingerprint(self) -> str:
+        """
+        SHA-256 of the configuration and fitted state (vocabulary, idf,
+        projection, scaler): extractors that embed identically hash equal.
+        """
+        h = hashlib.sha256()
+        params = {
+            "char_ngram_range": list(self.char_ngram_range),
+            "max_char_features": self.max_char_features,
+            "svd_dim": self.svd_dim,
+            "text_lowercase": self.text_lowercase,
+            "use_function_words": self.use_function_words,
+            "min_df": self.min_df,
+            "window_chars": self.window_chars,
+            "max_doc_chars": self.max_doc_chars,
+            "window_sampling": self.window_sampling,
+            "window_pooling": self.window_pooling,
+        }
+        if self.projection != "svd":  # keeps existing SVD fingerprints stable
+            params["projection"] = self.projection
+        if isinstance(self.svd, SparseRandomProjector):
+            params["projector"] = self.svd.params()
+        h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+        h.update("\0".join(self.char_terms()).encode("utf-8"))
+        h.update(np.ascontiguousarray(self.char_vec.idf_).tobytes())
+        if not isinstance(self.svd, SparseRandomProjector):
+            # the random matrix is fully determined by the params above
+            h.update(np.ascontiguousarray(self.svd.components_).tobytes())
+        if self.fw_scaler is not None:
+            h.update(np.ascontiguousarray(self.fw_scaler.mean_).tobytes())
+            h.update(np.ascontiguousarray(self.fw_scaler.scale_).tobytes())
+        return h.hexdigest()
+
+    def transform_iter(
+        self, texts: Sequence[str], batch_size: int = 4096
+    ) -> Iterator[np.ndarray]:
+        """
+        Yield transform() of consecutive batches, so callers can stream
+        embeddings to disk instead of holding the full matrix.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        for start in range(0, len(texts), batch_size):
+            yield self.transform(list(texts[start : start + batch_size]))
+
     # -------- internals -------- #
+    def _char_tfidf(self, texts: Sequence[str]) -> sp.csr_matrix:
+        """
+        char_vec.transform(texts), counting n-grams through the compact
+        vocabulary when there is one.
+        """
+        if self.vocab is None:
+            return self.char_vec.transform(texts)
+        analyze = self.char_vec.build_analyzer()
+        V = len(self.char_vec.idf_)
+        indices: List[np.ndarray] = []  # per chunk, in (row, col) order
+        values: List[np.ndarray] = []
+        row_nnz = np.zeros(len(texts), dtype=np.int64)
+        grams: List[str] = []
+        owner: List[int] = []
+
+        def flush() -> None:
+            # Grams never exceed the vocabulary width; NUL needs the length check
+            check = any("\0" in g for g in grams)
+            cols = self.vocab.lookup(grams, check_lengths=check)
+            rows = np.asarray(owner, dtype=np.int64)
+            known = cols >= 0
+            keys, counts = np.unique(rows[known] * V + cols[known], return_counts=True)
+            row_nnz[:] += np.bincount(keys // V, minlength=len(texts))
+            indices.append((keys % V).astype(np.int32))
+            values.append(counts.astype(np.float32))
+            grams.clear()
+            owner.clear()
+
+        # Only a bounded chunk of n-gram strings is alive at a time, and the
+        # counts are kept as int32 columns / float32 values like sklearn's.
+        # Chunks end at document boundaries, so no (row, col) spans two.
+        for i, text in enumerate(texts):
+            g = analyze(text)
+            grams.extend(g)
+            owner.extend([i] * len(g))
+            if len(grams) >= _GRAM_CHUNK:
+                flush()
+        if grams:
+            flush()
+        # int32 index arrays unless the batch is too large for them
+        index_dtype = np.int32 if row_nnz.sum() < np.iinfo(np.int32).max else np.int64
+        indptr = np.zeros(len(texts) + 1, dtype=index_dtype)
+        np.cumsum(row_nnz, out=indptr[1:])
+        X = sp.csr_matrix(
+            (
+                np.concatenate(values) if values else np.zeros(0, np.float32),
+                np.concatenate(indices).astype(index_dtype, copy=False)
+                if indices
+                else np.zeros(0, index_dtype),
+                indptr,
+            ),
+            shape=(len(texts), V),
+            dtype=np.float32,
+        )
+        X.sort_indices()
+        return self.char_vec._tfidf.transform(X, copy=False)
+
+    def _doc_windows(self, text: str) -> List[str]:
+        w = self.window_chars
+        if w is None or len(text) <= w:
+            return [text]
+        starts = range(0, len(text), w)
+        k = len(starts)
+        if self.max_doc_chars is not None:
+            k = min(k, max(1, self.max_doc_chars // w))
+        if k < len(starts):
+            if self.window_sampling == "uniform":
+                picks = np.unique(np.linspace(0, len(starts) - 1, k).round().astype(int))
+            elif self.window_sampling == "random":
+                # Seeded by a digest of the text so a document always gets the
+                # same windows while equal-length documents get different ones
+                digest = hashlib.blake2b(
+                    text.encode("utf-8", "surrogatepass"), digest_size=8
+                ).digest()
+                rng = np.random.default_rng(
+                    [self.random_state, int.from_bytes(digest, "little")]
+                )
+                picks = np.sort(rng.choice(len(starts), size=k, replace=False))
+            else:
+                picks = np.arange(k)
+            starts = [starts[i] for i in picks.tolist()]
+        return [text[s : s + w] for s in starts]
+
+    def _split_windows(self, texts: List[str]) -> Tuple[List[str], np.ndarray]:
+        windows: List[str] = []
+        owner: List[int] = []
+        for i, text in enumerate(texts):
+            ws = self._doc_windows(text)
+            windows.extend(ws)
+            owner.extend([i] * len(ws))
+        return windows, np.asarray(owner, dtype=np.int64)
+
+    def _windowed_svd(self, texts: List[str]) -> np.ndarray:
+        """
+        SVD embeddings of each text, pooled over its windows. Windows are
+        vectorized in batches so one huge document cannot blow up the
+        sparse n-gram matrix; single-window texts keep their exact row.
+        """
+        windows, owner = self._split_windows(texts)
+        bs = max(1, self.window_batch_size)
+        blocks = []
+        t_vec = t_svd = 0.0
+        for s in range(0, len(windows), bs):
+            t0 = time.perf_counter()
+            X_char = self._char_tfidf(windows[s : s + bs])
+            t1 = time.perf_counter()
+            blocks.append(self.svd.transform(X_char))
+            t_vec += t1 - t0
+            t_svd += time.perf_counter() - t1
+        reg = telemetry.active()
+        if reg is not None:
+            reg.observe("aa_stage_seconds", t_vec, stage="vectorize")
+            reg.observe("aa_stage_seconds", t_svd, stage="svd")
+        if not blocks:
+            return np.zeros((0, self.svd_dim), dtype=np.float32)
+        W = np.vstack(blocks)
+        n_win = np.bincount(owner, minlength=len(texts))
+        if np.all(n_win == 1):
+            return W
+        if self.window_pooling == "length":
+            weights = np.fromiter(map(len, windows), dtype=np.float64, count=len(windows))
+        else:
+            weights = np.ones(len(windows), dtype=np.float64)
+        pooled = np.zeros((len(texts), W.shape[1]), dtype=np.float64)
+        np.add.at(pooled, owner, W * weights[:, None])
+        pooled /= np.maximum(np.bincount(owner, weights, minlength=len(texts)), 1e-12)[:, None]
+        single = n_win[owner] == 1
+        pooled[owner[single]] = W[single]
+        return pooled.astype(np.float32)
+
     def _function_word_features_batch(self, texts: List[str]) -> np.ndarray:
-        vocab = {w: i for i, w in enumerate(FUNCTION_WORDS)}
-        M = len(texts)
-        F = len(vocab)
-        X = np.zeros((M, F + 14), dtype=np.float32)
+        X = np.zeros((len(texts), len(_FW_VOCAB) + 14), dtype=np.float32)
         for m, text in enumerate(texts):
-            toks = simple_tokenize(text, lowercase=True)
-            n = len(toks)
-            if n == 0:
-                # leave zeros
-                continue
-
-            # function word relative frequencies
-            for t in toks:
-                idx = vocab.get(t)
-                if idx is not None:
-                    X[m, idx] += 1.0
-            X[m, :F] /= max(1, n)
-
-            avg_word_len = float(np.mean([len(t) for t in toks])) if toks else 0.0
-            type_token_ratio = float(len(set(toks)) / n) if n > 0 else 0.0
-            punct = count_selected_punct(text)
-            upper_ratio = sum(1 for ch in text if ch.isupper()) / max(1, len(text))
-            digit_ratio = sum(1 for ch in text if ch.isdigit()) / max(1, len(text))
-
-            # Six existing features
-            X[m, F + 0] = avg_word_len
-            X[m, F + 1] = type_token_ratio
-            X[m, F + 2] = punct["comma"]
-            X[m, F + 3] = punct["period"]
-            X[m, F + 4] = upper_ratio
-            X[m, F + 5] = digit_ratio
-
-            # Eight new light features
-            txt_len = max(1, len(text))
-            X[m, F + 6] = text.count("!") / txt_len
-            X[m, F + 7] = text.count("?") / txt_len
-            X[m, F + 8] = text.count(";") / txt_len
-            X[m, F + 9] = text.count(":") / txt_len
-            X[m, F + 10] = text.count("-") / txt_len
-            X[m, F + 11] = (text.count('"') + text.count("'")) / txt_len
-            X[m, F + 12] = (text.count("(") + text.count(")")) / txt_len
-            X[m, F + 13] = text.count("...") / txt_len  # ellipsis approx
-
+            if self.window_chars is None or len(text) <= self.window_chars:
+                tally = StyleTally.from_text(text)
+            else:
+                # Merge counts over the (capped) windows instead of the full text
+                tally = StyleTally()
+                for w in self._doc_windows(text):
+                    tally.merge(StyleTally.from_text(w))
+            X[m] = tally.features()
         return X
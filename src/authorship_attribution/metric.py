@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Iterator, Tuple
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+@dataclass
+class BilinearMetric:
+    """
+    Low-rank metric on extractor embeddings.
+
+    Documents are standardised, projected to `rank` dims and L2-normalised
+    once; same-author probability is sigmoid(a * cos + b), so scoring a
+    query against stored vectors is one matrix multiply.
+    """
+
+    mean: np.ndarray  # (D,)
+    scale: np.ndarray  # (D,)
+    W: np.ndarray  # (D, rank)
+    a: float
+    b: float
+
+    @property
+    def rank(self) -> int:
+        return int(self.W.shape[1])
+
+    def project(self, X: np.ndarray) -> np.ndarray:
+        """
+        (N, D) embeddings -> (N, rank) unit vectors (float32).
+        """
+        Z = (np.asarray(X, dtype=np.float32) - self.mean) / self.scale
+        P = Z @ self.W
+        P /= np.linalg.norm(P, axis=1, keepdims=True) + 1e-8
+        return P.astype(np.float32, copy=False)
+
+    def proba_from_cosine(self, cos: np.ndarray) -> np.ndarray:
+        return _sigmoid(self.a * np.asarray(cos, dtype=np.float64) + self.b)
+
+    def pair_proba(self, U: np.ndarray, V: np.ndarray) -> np.ndarray:
+        """
+        Row-wise probabilities for embedding pairs (same API role as
+        pairwise_features + classifier).
+        """
+        cos = np.sum(self.project(U) * self.project(V), axis=1)
+        return self.proba_from_cosine(cos)
+
+    def score_matrix(
+        self, queries: np.ndarray, docs: np.ndarray, chunk_size: int = 65_536
+    ) -> np.ndarray:
+        """
+        (q, n) probabilities for projected query vectors against projected
+        document vectors, computed in document chunks.
+        """
+        out = np.empty((len(queries), len(docs)), dtype=np.float32)
+        for start in range(0, len(docs), chunk_size):
+            C = queries @ np.asarray(docs[start : start + chunk_size]).T
+            out[:, start : start + C.shape[1]] = self.proba_from_cosine(C)
+        return out
+
+
+def _pair_batches(
+    n: int, batch_size: int, rng: np.random.Generator
+) -> Iterator[np.ndarray]:
+    order = rng.permutation(n)
+    for start in range(0, n, batch_size):
+        yield order[start : start + batch_size]
+
+
+def _cosines(
+    X: np.ndarray, pairs: np.ndarray, mean: np.ndarray, scale: np.ndarray, W: np.ndarray
+) -> np.ndarray:
+    m = BilinearMetric(mean=mean, scale=scale, W=W, a=1.0, b=0.0)
+    out = np.empty(len(pairs), dtype=np.float64)
+    for start in range(0, len(pairs), 65_536):
+        p = pairs[start : start + 65_536]
+        out[start : start + len(p)] = np.sum(
+            m.project(X[p[:, 0]]) * m.project(X[p[:, 1]]), axis=1
+        )
+    return out
+
+
+def fit_bilinear_metric(
+    X: np.ndarray,
+    pairs: np.ndarray,
+    labels: np.ndarray,
+    rank: int = 64,
+    epochs: int = 20,
+    batch_size: int = 2048,
+    lr: float = 0.01,
+    seed: int = 42,
+) -> BilinearMetric:
+    """
+    Learn W by minimising the pair log-loss of sigmoid(alpha * cos + beta)
+    with Adam (PCA-initialised), then calibrate (a, b) by Platt scaling of
+    the cosines on the training pairs.
+    """
+    logger = logging.getLogger(__name__)
+    rng = np.random.default_rng(seed)
+    used = np.unique(pairs)
+    sample = used if len(used) <= 20_000 else rng.choice(used, 20_000, replace=False)
+    Xs = np.asarray(X[np.sort(sample)], dtype=np.float64)
+    mean = Xs.mean(axis=0).astype(np.float32)
+    scale = Xs.std(axis=0)
+    scale = np.where(scale > 1e-8, scale, 1.0).astype(np.float32)
+    rank = min(rank, X.shape[1])
+    _, _, Vt = np.linalg.svd((Xs - mean) / scale, full_matrices=False)
+    W = np.ascontiguousarray(Vt[:rank].T, dtype=np.float32)
+    if W.shape[1] < rank:  # fewer sampled rows than rank
+        extra = rng.standard_normal((X.shape[1], rank - W.shape[1])).astype(np.float32)
+        W = np.hstack([W, 0.01 * extra])
+
+    # theta = (W, alpha, beta); Adam state per parameter
+    alpha, beta = np.float32(5.0), np.float32(0.0)
+    m_W, v_W = np.zeros_like(W), np.zeros_like(W)
+    m_ab, v_ab = np.zeros(2, np.float32), np.zeros(2, np.float32)
+    b1, b2, eps = 0.9, 0.999, 1e-8
+    y_all = labels.astype(np.float32)
+    step = 0
+    for epoch in range(epochs):
+        total = 0.0
+        for idx in _pair_batches(len(pairs), batch_size, rng):
+            p = pairs[idx]
+            y = y_all[idx]
+            U = (np.asarray(X[p[:, 0]], dtype=np.float32) - mean) / scale
+            V = (np.asarray(X[p[:, 1]], dtype=np.float32) - mean) / scale
+            P, Q = U @ W, V @ W
+            nP = np.linalg.norm(P, axis=1) + 1e-8
+            nQ = np.linalg.norm(Q, axis=1) + 1e-8
+            Ph, Qh = P / nP[:, None], Q / nQ[:, None]
+            c = np.sum(Ph * Qh, axis=1)
+            z = alpha * c + beta
+            s = _sigmoid(z)
+            total += float(
+                np.sum(np.logaddexp(0.0, z) - y * z)
+            )  # log-loss in logit form
+            g = (s - y) / len(idx)
+            dc = (g * alpha)[:, None]
+            dP = dc * (Qh - c[:, None] * Ph) / nP[:, None]
+            dQ = dc * (Ph - c[:, None] * Qh) / nQ[:, None]
+            grad_W = U.T @ dP + V.T @ dQ
+            grad_ab = np.array([np.sum(g * c), np.sum(g)], dtype=np.float32)
+
+            step += 1
+            corr1, corr2 = 1 - b1**step, 1 - b2**step
+            m_W = b1 * m_W + (1 - b1) * grad_W
+            v_W = b2 * v_W + (1 - b2) * grad_W**2
+            W -= lr * (m_W / corr1) / (np.sqrt(v_W / corr2) + eps)
+            m_ab = b1 * m_ab + (1 - b1) * grad_ab
+            v_ab = b2 * v_ab + (1 - b2) * grad_ab**2
+            alpha, beta = np.array([alpha, beta]) - 10 * lr * (m_ab / corr1) / (
+                np.sqrt(v_ab / corr2) + eps
+            )
+        logger.info(
+            "Bilinear metric epoch %d/%d | log-loss %.4f | alpha=%.2f beta=%.2f",
+            epoch + 1,
+            epochs,
+            total / max(1, len(pairs)),
+            alpha,
+            beta,
+        )
+
+    cos = _cosines(X, pairs, mean, scale, W)
+    platt = LogisticRegression(C=1e4, max_iter=1000).fit(cos[:, None], labels)
+    return BilinearMetric(
+        mean=mean,
+        scale=scale,
+        W=W,
+        a=float(platt.coef_[0, 0]),
+        b=float(platt.intercept_[0]),
+    )
+
+
+def metric_scores(
+    metric: BilinearMetric, X: np.ndarray, pairs: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (cosines, probabilities) for index pairs into X.
+    """
+    cos = _cosines(X, pairs, metric.mean, metric.scale, metric.W)
+    return cos, metric.proba_from_cosine(cos)
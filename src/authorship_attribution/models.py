@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 import numpy as np
 from joblib import dump, load
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 
+from authorship_attribution import runtime, telemetry
+from authorship_attribution.docstore import DocumentStore
 from authorship_attribution.features import FeatureExtractor
+from authorship_attribution.metric import BilinearMetric
+from authorship_attribution.profiles import (
+    AGGREGATIONS,
+    AuthorProfile,
+    aggregate_scores,
+)
+from authorship_attribution.scoring import FusedPairScorer
 from authorship_attribution.utils import ModelMeta
 
 
@@ -52,12 +62,31 @@ def pairwise_features(u: np.ndarray, v: np.ndarray) -> np.ndarray:
 @dataclass
 class ModelBundle:
     extractor: FeatureExtractor
-    classifier: LogisticRegression
+    classifier: LogisticRegression | None
     threshold: float
     meta: ModelMeta
     pair_scaler: StandardScaler | None = None  # new: standardize pairwise features
+    metric: BilinearMetric | None = None  # replaces the classifier when set
 
-    _FORMAT_VERSION: int = 3  # bumped due to added pair_scaler
+    _FORMAT_VERSION: int = 4  # bumped due to added metric
+
+    @property
+    def model_type(self) -> str:
+        return "bilinear" if self.metric is not None else "logistic"
+
+    def pair_proba(self, XA: np.ndarray, XB: np.ndarray) -> np.ndarray:
+        """
+        Same-author probabilities for row-aligned embedding pairs.
+        """
+        if self.metric is not None:
+            with telemetry.timer("aa_stage_seconds", stage="metric"):
+                return self.metric.pair_proba(XA, XB)
+        with telemetry.timer("aa_stage_seconds", stage="pairwise"):
+            pf = pairwise_features(XA, XB)
+        with telemetry.timer("aa_stage_seconds", stage="classifier"):
+            if self.pair_scaler is not None:
+                pf = self.pair_scaler.transform(pf)
+            return self.classifier.predict_proba(pf)[:, 1]
 
     def save(self, path: str) -> None:
         """
@@ -70,6 +99,7 @@ class ModelBundle:
             "threshold": float(self.threshold),
             "meta": self.meta,
             "pair_scaler": self.pair_scaler,
+            "metric": self.metric,
         }
         dump(payload, path)
 
@@ -86,38 +116,312 @@ class ModelBundle:
                 threshold=float(obj["threshold"]),
                 meta=obj["meta"],
                 pair_scaler=obj.get("pair_scaler", None),
+                metric=obj.get("metric", None),
             )
         raise ValueError("Unknown model file format.")
 
 
+def _record_call(
+    reg: telemetry.MetricsRegistry, texts: List[str], n_pairs: int, seconds: float
+) -> None:
+    reg.inc("aa_verify_calls_total")
+    reg.inc("aa_verify_requests_total", n_pairs)
+    reg.observe("aa_verify_batch_size", n_pairs)
+    reg.observe("aa_verify_seconds", seconds)
+    reg.observe_many("aa_text_length_chars", np.fromiter(map(len, texts), np.int64))
+
+
 class Verifier:
     """
     High-level API for inference.
     """
 
-    def __init__(self, bundle: ModelBundle):
+    def __init__(
+        self,
+        bundle: ModelBundle,
+        fused: bool = True,
+        store: DocumentStore | None = None,
+    ):
         self.bundle = bundle
+        # Folded scaler + classifier; None falls back to bundle.pair_proba
+        self.scorer = FusedPairScorer.from_bundle(bundle) if fused else None
+        self.store: DocumentStore | None = None
+        self._fingerprint: str | None = None
+        if store is not None:
+            self.attach_store(store)
 
     @staticmethod
     def from_path(path: str) -> "Verifier":
         return Verifier(ModelBundle.load(path))
 
+    def _pair_proba(self, XA: np.ndarray, XB: np.ndarray) -> np.ndarray:
+        if self.scorer is None:
+            return self.bundle.pair_proba(XA, XB)
+        with telemetry.timer("aa_stage_seconds", stage="fused"):
+            return self.scorer.proba(XA, XB)
+
     def score_proba(self, text_a: str, text_b: str) -> float:
         extractor = self.bundle.extractor
-        clf = self.bundle.classifier
-        XA = extractor.transform([text_a])
-        XB = extractor.transform([text_b])
-        pf = pairwise_features(XA, XB)
-        if self.bundle.pair_scaler is not None:
-            pf = self.bundle.pair_scaler.transform(pf)
-        prob = clf.predict_proba(pf)[0, 1]
+        t0 = time.perf_counter()
+        with runtime.stage("inference"):
+            XA = extractor.transform([text_a])
+            XB = extractor.transform([text_b])
+            prob = self._pair_proba(XA, XB)[0]
+        reg = telemetry.active()
+        if reg is not None:
+            _record_call(reg, [text_a, text_b], 1, time.perf_counter() - t0)
         return float(prob)
 
-    def verify(self, text_a: str, text_b: str) -> Dict[str, Any]:
-        prob = self.score_proba(text_a, text_b)
-        same = prob >= self.bundle.threshold
+    def score_proba_batch(
+        self, texts_a: List[str], texts_b: List[str]
+    ) -> np.ndarray:
+        """
+        Probabilities for many pairs with one transform over the unique texts.
+        """
+        if len(texts_a) != len(texts_b):
+            raise ValueError("texts_a and texts_b must have the same length.")
+        if not texts_a:
+            return np.empty(0, dtype=np.float64)
+        t0 = time.perf_counter()
+        index: Dict[str, int] = {}
+        ia = [index.setdefault(t, len(index)) for t in texts_a]
+        ib = [index.setdefault(t, len(index)) for t in texts_b]
+        unique = list(index)
+        with runtime.stage("inference"):
+            X = self.bundle.extractor.transform(unique)
+            probs = self._pair_proba(X[ia], X[ib])
+        reg = telemetry.active()
+        if reg is not None:
+            _record_call(reg, unique, len(texts_a), time.perf_counter() - t0)
+        return probs
+
+    def _one_vs_many(
+        self, x: np.ndarray, C: np.ndarray, chunk_size: int = 8192
+    ) -> np.ndarray:
+        """
+        Probabilities of one (D,) embedding against (n, D) candidates.
+        """
+        if self.scorer is not None:
+            with telemetry.timer("aa_stage_seconds", stage="fused"):
+                return self.scorer.proba_one_vs_many(x, C, chunk_size)
+        out = np.empty(len(C), dtype=np.float64)
+        metric = self.bundle.metric
+        q = metric.project(x[None, :]) if metric is not None else None
+        for start in range(0, len(C), chunk_size):
+            Cc = np.asarray(C[start : start + chunk_size])
+            if metric is not None:
+                with telemetry.timer("aa_stage_seconds", stage="metric"):
+                    p = metric.score_matrix(q, metric.project(Cc))[0]
+            else:
+                p = self.bundle.pair_proba(np.repeat(x[None, :], len(Cc), 0), Cc)
+            out[start : start + len(Cc)] = p
+        return out
+
+    def score_one_vs_many(self, text: str, candidates: List[str]) -> np.ndarray:
+        """
+        Probabilities that `text` shares an author with each candidate; the
+        query is embedded once and never repeated into a pair matrix.
+        """
+        if not candidates:
+            return np.empty(0, dtype=np.float64)
+        t0 = time.perf_counter()
+        with runtime.stage("inference"):
+            X = self.bundle.extractor.transform([text, *candidates])
+            probs = self._one_vs_many(X[0], X[1:])
+        reg = telemetry.active()
+        if reg is not None:
+            seconds = time.perf_counter() - t0
+            _record_call(reg, [text, *candidates], len(candidates), seconds)
+        return probs
+
+    # -------- known-author sets -------- #
+    def extractor_fingerprint(self) -> str:
+        if self._fingerprint is None:
+            self._fingerprint = self.bundle.extractor.fingerprint()
+        return self._fingerprint
+
+    def build_profile(self, known_texts: List[str], name: str = "") -> AuthorProfile:
+        """
+        Embed a candidate's known texts once, for repeated verify_against_set().
+        """
+        with runtime.stage("inference"):
+            X = self.bundle.extractor.transform(list(known_texts))
+        return AuthorProfile.from_embeddings(X, self.extractor_fingerprint(), name)
+
+    def verify_against_set(
+        self,
+        unknown: str,
+        known: List[str] | AuthorProfile,
+        aggregation: str = "mean",
+    ) -> Dict[str, Any]:
+        """
+        verify() of `unknown` against a set of known texts by one candidate
+        (or their prebuilt AuthorProfile), aggregated by the mean or max
+        pairwise probability, or the probability against the pooled profile
+        vector. All known texts and the pool are scored in one batch.
+        """
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"aggregation must be one of {AGGREGATIONS}")
+        t0 = time.perf_counter()
+        if isinstance(known, AuthorProfile):
+            profile = known
+            profile.check_extractor(self.extractor_fingerprint())
+            with runtime.stage("inference"):
+                x = self.bundle.extractor.transform([unknown])[0]
+            texts = [unknown]
+        else:
+            if not known:
+                raise ValueError("known must hold at least one text.")
+            with runtime.stage("inference"):
+                X = self.bundle.extractor.transform([unknown, *known])
+            x = X[0]
+            profile = AuthorProfile.from_embeddings(X[1:], "")
+            texts = [unknown, *known]
+        with runtime.stage("inference"):
+            probs = self._one_vs_many(x, profile.candidates())
+        prob = aggregate_scores(probs, aggregation)
+        reg = telemetry.active()
+        if reg is not None:
+            _record_call(reg, texts, len(profile), time.perf_counter() - t0)
+        return {
+            **self._result(prob),
+            "aggregation": aggregation,
+            "n_known": len(profile),
+            "known_probabilities": probs[:-1].tolist(),
+        }
+
+    # -------- archived documents -------- #
+    def attach_store(self, store: DocumentStore) -> "Verifier":
+        """
+        Score against `store` in verify_ids() / score_against_store(); it must
+        have been built with this bundle's extractor.
+        """
+        store.check_extractor(self.bundle.extractor)
+        self.store = store
+        return self
+
+    def _require_store(self) -> DocumentStore:
+        if self.store is None:
+            raise ValueError("No document store attached; call attach_store() first.")
+        return self.store
+
+    def verify_ids(self, query_text: str, doc_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        verify() of `query_text` against stored documents, by ID, using their
+        stored embeddings (the archived texts are not needed).
+        """
+        store = self._require_store()
+        C = store.get(doc_ids)
+        t0 = time.perf_counter()
+        with runtime.stage("inference"):
+            x = self.bundle.extractor.transform([query_text])[0]
+            probs = self._one_vs_many(x, C)
+        reg = telemetry.active()
+        if reg is not None:
+            _record_call(reg, [query_text], len(doc_ids), time.perf_counter() - t0)
+        return [{"id": i, **self._result(p)} for i, p in zip(doc_ids, probs)]
+
+    def score_against_store(
+        self, query_text: str, top_k: int | None = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (ids, probabilities) of `query_text` against every live stored
+        document, in store order, or the `top_k` most probable first.
+        """
+        store = self._require_store()
+        t0 = time.perf_counter()
+        ids_parts: List[np.ndarray] = []
+        prob_parts: List[np.ndarray] = []
+        with runtime.stage("inference"):
+            x = self.bundle.extractor.transform([query_text])[0]
+            for ids, emb in store.iter_live():
+                ids_parts.append(np.asarray(ids))
+                prob_parts.append(self._one_vs_many(x, emb))
+        ids = np.concatenate(ids_parts) if ids_parts else np.zeros(0, dtype=str)
+        probs = np.concatenate(prob_parts) if prob_parts else np.zeros(0)
+        reg = telemetry.active()
+        if reg is not None:
+            _record_call(reg, [query_text], len(ids), time.perf_counter() - t0)
+        if top_k is not None and top_k < len(probs):
+            top = np.argpartition(-probs, top_k)[:top_k]
+            top = top[np.argsort(-probs[top], kind="stable")]
+            return ids[top], probs[top]
+        if top_k is not None:
+            order = np.argsort(-probs, kind="stable")
+            return ids[order], probs[order]
+        return ids, probs
+
+    def _require_metric(self) -> BilinearMetric:
+        if self.bundle.metric is None:
+            raise ValueError("Document vectors need a bilinear-metric bundle.")
+        return self.bundle.metric
+
+    def document_vectors(self, texts: List[str], batch_size: int = 4096) -> np.ndarray:
+        """
+        Projected unit vectors for texts, to be stored and scored later with
+        score_against_vectors() (bilinear bundles only).
+        """
+        metric = self._require_metric()
+        out = np.empty((len(texts), metric.rank), dtype=np.float32)
+        with runtime.stage("inference"):
+            for start in range(0, len(texts), batch_size):
+                X = self.bundle.extractor.transform(texts[start : start + batch_size])
+                out[start : start + len(X)] = metric.project(X)
+        return out
+
+    def score_against_vectors(
+        self, text: str, vectors: np.ndarray, chunk_size: int = 65_536
+    ) -> np.ndarray:
+        """
+        Probabilities that `text` shares an author with each stored vector:
+        one transform plus a matrix-vector product per chunk.
+        """
+        metric = self._require_metric()
+        with runtime.stage("inference"):
+            q = metric.project(self.bundle.extractor.transform([text]))
+            with telemetry.timer("aa_stage_seconds", stage="metric"):
+                return metric.score_matrix(q, vectors, chunk_size)[0]
+
+    def _result(self, prob: float) -> Dict[str, Any]:
         return {
             "probability_same_author": float(prob),
-            "same_author": bool(same),
+            "same_author": bool(prob >= self.bundle.threshold),
             "threshold": float(self.bundle.threshold),
         }
+
+    def verify(self, text_a: str, text_b: str) -> Dict[str, Any]:
+        return self._result(self.score_proba(text_a, text_b))
+
+    def verify_batch(
+        self, texts_a: List[str], texts_b: List[str]
+    ) -> List[Dict[str, Any]]:
+        return [self._result(p) for p in self.score_proba_batch(texts_a, texts_b)]
+
+    def verify_embeddings(
+        self, XA: np.ndarray, XB: np.ndarray
+    ) -> List[Dict[str, Any]]:
+        """
+        verify_batch() on row-aligned embeddings already computed with this
+        bundle's extractor (e.g. shared between models by a registry).
+        """
+        with runtime.stage("inference"):
+            probs = self._pair_proba(XA, XB)
+        return [self._result(p) for p in probs]
+
+
+# -------- process-pool workers -------- #
+_WORKER_VERIFIER: Verifier | None = None
+
+
+def init_verifier_worker(bundle: ModelBundle) -> None:
+    """
+    Pool initializer: build the worker's Verifier once, not per task.
+    """
+    global _WORKER_VERIFIER
+    _WORKER_VERIFIER = Verifier(bundle)
+
+
+def worker_verifier() -> Verifier:
+    if _WORKER_VERIFIER is None:
+        raise RuntimeError("Worker not initialized with init_verifier_worker().")
+    return _WORKER_VERIFIER
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import tempfile
+import weakref
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from authorship_attribution import runtime
+from authorship_attribution.models import pairwise_features
+
+# Where worker-filled pair matrices live when no output path is given;
+# /dev/shm keeps them in RAM on Linux
+_TMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def pair_feature_dim(embeddings: np.ndarray) -> int:
+    return 2 * int(embeddings.shape[1]) + 3
+
+
+def fill_pair_features(
+    embeddings: np.ndarray,
+    pairs: np.ndarray,
+    out: np.ndarray,
+    scaler: Any = None,
+    chunk_size: int = 8192,
+) -> None:
+    """
+    Write pairwise_features() of index `pairs` into `out` (K, 2D + 3), a
+    chunk at a time, optionally standardised by a fitted pair scaler.
+    Every row depends only on its own pair, so results do not depend on
+    how the pairs are split.
+    """
+    for start in range(0, len(pairs), chunk_size):
+        p = pairs[start : start + chunk_size]
+        pf = pairwise_features(embeddings[p[:, 0]], embeddings[p[:, 1]])
+        if scaler is not None:
+            pf = scaler.transform(pf)
+        out[start : start + len(p)] = pf
+
+
+# -------- shared arrays -------- #
+def _share(arr: np.ndarray) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+    """
+    Copy `arr` into a new shared memory block; returns it and its spec.
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+    np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, {"shm": shm.name, "shape": arr.shape, "dtype": arr.dtype.str}
+
+
+def _array_spec(arr: np.ndarray) -> Dict[str, Any] | None:
+    """
+    Spec of a C-contiguous np.memmap that workers can map themselves.
+    """
+    if isinstance(arr, np.memmap) and arr.filename and arr.flags.c_contiguous:
+        return {
+            "path": arr.filename,
+            "offset": int(arr.offset),
+            "shape": arr.shape,
+            "dtype": arr.dtype.str,
+        }
+    return None
+
+
+def _attach(spec: Dict[str, Any]) -> Tuple[Any, np.ndarray]:
+    if "npy" in spec:
+        return None, np.load(spec["npy"], mmap_mode="r+")
+    dtype = np.dtype(spec["dtype"])
+    if "shm" in spec:
+        shm = shared_memory.SharedMemory(name=spec["shm"], track=False)
+        return shm, np.ndarray(spec["shape"], dtype, buffer=shm.buf)
+    arr = np.memmap(
+        spec["path"], dtype=dtype, mode="r", offset=spec["offset"], shape=spec["shape"]
+    )
+    return None, arr
+
+
+# -------- process-pool workers -------- #
+_WORKER: Dict[str, Any] = {}
+
+
+def _release_worker() -> None:
+    shm = _WORKER.pop("shm", None)
+    _WORKER.clear()  # drop the array view before closing its buffer
+    if shm is not None:
+        shm.close()
+
+
+def _init_pair_worker(embeddings_spec: Dict[str, Any], chunk_size: int) -> None:
+    shm, embeddings = _attach(embeddings_spec)
+    _WORKER.update(shm=shm, embeddings=embeddings, chunk_size=chunk_size)
+    atexit.register(_release_worker)
+
+
+def _fill_range(
+    pairs_spec: Dict[str, Any],
+    out_spec: Dict[str, Any],
+    start: int,
+    stop: int,
+    scaler: Any,
+) -> int:
+    pairs_shm, pairs = _attach(pairs_spec)
+    _, out = _attach(out_spec)
+    try:
+        fill_pair_features(
+            _WORKER["embeddings"],
+            pairs[start:stop],
+            out[start:stop],
+            scaler=scaler,
+            chunk_size=_WORKER["chunk_size"],
+        )
+    finally:
+        del pairs, out
+        if pairs_shm is not None:
+            pairs_shm.close()
+    return stop - start
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class ParallelPairBuilder:
+    """
+    Pair feature matrices built by worker processes over shared memory.
+
+    The embedding matrix is placed in shared memory once (an np.memmap,
+    such as the embedding store, is mapped by the workers directly), and
+    each build() hands workers disjoint pair ranges that they write straight
+    into one preallocated output matrix, optionally applying a fitted pair
+    scaler in the same pass (`scaler` may be changed between builds).
+    Output is identical to the serial path for any number of workers.
+    With workers=1, or fewer than `min_parallel_pairs` pairs, everything
+    runs in-process with no pool. Workers are capped by, and split, the
+    thread budget of `config`.
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        workers: int | None = 1,
+        scaler: Any = None,
+        chunk_size: int = 8192,
+        min_parallel_pairs: int = 65_536,
+        config: runtime.RuntimeConfig | None = None,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        self.embeddings = embeddings
+        self.scaler = scaler
+        self.chunk_size = chunk_size
+        self.min_parallel_pairs = min_parallel_pairs
+        # Thread budget for the pool (default: the process-wide config)
+        self.config = config or runtime.get_config()
+        self.workers = 1 if workers == 1 else self.config.pool_workers(workers)
+        self._pool: Any = None
+        self._shm: shared_memory.SharedMemory | None = None
+
+    def __enter__(self) -> "ParallelPairBuilder":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def _start_pool(self) -> Any:
+        if self._pool is None:
+            spec = _array_spec(self.embeddings)
+            if spec is None:
+                emb = np.ascontiguousarray(self.embeddings, dtype=np.float32)
+                self._shm, spec = _share(emb)
+            self._pool = runtime.process_pool(
+                self.workers,
+                initializer=_init_pair_worker,
+                initargs=(spec, self.chunk_size),
+                config=self.config,
+            )
+        return self._pool
+
+    def _ranges(self, n: int) -> List[Tuple[int, int]]:
+        # A few tasks per worker for balance, each a whole number of chunks
+        step = -(-n // (4 * self.workers))
+        step = -(-step // self.chunk_size) * self.chunk_size
+        return [(s, min(n, s + step)) for s in range(0, n, step)]
+
+    def build(self, pairs: np.ndarray, out: str | Path | None = None) -> np.ndarray:
+        """
+        (K, 2D + 3) float32 features of the (K, 2) index pairs; written to
+        the .npy file `out` (returned memory-mapped) when given.
+        """
+        pairs = np.ascontiguousarray(pairs, dtype=np.int64)
+        if pairs.ndim != 2 or pairs.shape[1] != 2:
+            raise ValueError("pairs must have shape (K, 2)")
+        shape = (len(pairs), pair_feature_dim(self.embeddings))
+        if self.workers == 1 or len(pairs) < self.min_parallel_pairs:
+            result = (
+                np.empty(shape, dtype=np.float32)
+                if out is None
+                else np.lib.format.open_memmap(
+                    str(out), mode="w+", dtype=np.float32, shape=shape
+                )
+            )
+            fill_pair_features(
+                self.embeddings, pairs, result, self.scaler, self.chunk_size
+            )
+            return result
+        return self._build_parallel(pairs, shape, out)
+
+    def _build_parallel(
+        self, pairs: np.ndarray, shape: Tuple[int, int], out: str | Path | None
+    ) -> np.ndarray:
+        pool = self._start_pool()
+        if out is None:
+            fd, path = tempfile.mkstemp(suffix=".npy", prefix="aa_pairs_", dir=_TMP_DIR)
+            os.close(fd)
+        else:
+            path = str(out)
+        result = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=shape)
+        pairs_shm, pairs_spec = _share(pairs)
+        try:
+            futures = [
+                pool.submit(
+                    _fill_range, pairs_spec, {"npy": path}, s, e, self.scaler
+                )
+                for s, e in self._ranges(len(pairs))
+            ]
+            done = sum(f.result() for f in futures)
+        except BaseException:
+            del result
+            if out is None:
+                _remove_file(path)
+            raise
+        finally:
+            pairs_shm.close()
+            pairs_shm.unlink()
+        logging.getLogger(__name__).debug(
+            "Built %d pair rows with %d workers -> %s", done, self.workers, path
+        )
+        if out is None:
+            # The mapping outlives the file name on POSIX; elsewhere the
+            # file is removed once the array is collected
+            try:
+                os.remove(path)
+            except OSError:
+                weakref.finalize(result, _remove_file, path)
+        return result
+
+
+def build_pair_matrix_parallel(
+    embeddings: np.ndarray,
+    pairs: np.ndarray,
+    workers: int | None = None,
+    scaler: Any = None,
+    out: str | Path | None = None,
+    chunk_size: int = 8192,
+) -> np.ndarray:
+    """
+    One-off ParallelPairBuilder(...).build(pairs); reuse a builder to keep
+    the pool and shared embeddings across several builds.
+    """
+    with ParallelPairBuilder(
+        embeddings, workers=workers, scaler=scaler, chunk_size=chunk_size
+    ) as builder:
+        return builder.build(pairs, out=out)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+_FORMAT_VERSION = 1
+
+# How verify_against_set() turns per-known-text scores into one probability:
+# mean / max of the pairwise probabilities, or the probability against the
+# pooled profile vector
+AGGREGATIONS = ("mean", "max", "profile")
+
+
+@dataclass
+class AuthorProfile:
+    """
+    Embedded known texts of one candidate author.
+
+    Holds the (K, D) embeddings of the known texts and their mean as a
+    pooled profile vector, tagged with the extractor fingerprint so a
+    profile is only ever scored by the model that embedded it. Build once
+    with Verifier.build_profile(); every later query costs one embedding.
+    """
+
+    embeddings: np.ndarray  # (K, D) float32
+    pooled: np.ndarray  # (D,) float32, mean of the embeddings
+    extractor_fingerprint: str
+    name: str = ""
+
+    @classmethod
+    def from_embeddings(
+        cls, embeddings: np.ndarray, extractor_fingerprint: str, name: str = ""
+    ) -> "AuthorProfile":
+        X = np.asarray(embeddings, dtype=np.float32)
+        if X.ndim != 2 or len(X) == 0:
+            raise ValueError("A profile needs at least one known embedding.")
+        return cls(
+            embeddings=X,
+            pooled=X.mean(axis=0, dtype=np.float64).astype(np.float32),
+            extractor_fingerprint=extractor_fingerprint,
+            name=name,
+        )
+
+    def __len__(self) -> int:
+        return int(len(self.embeddings))
+
+    @property
+    def dim(self) -> int:
+        return int(self.embeddings.shape[1])
+
+    def candidates(self) -> np.ndarray:
+        """
+        (K + 1, D) rows scored in one call: the known texts, then the pool.
+        """
+        return np.vstack([self.embeddings, self.pooled[None, :]])
+
+    def check_extractor(self, fingerprint: str) -> None:
+        if fingerprint != self.extractor_fingerprint:
+            raise ValueError(
+                f"Profile '{self.name}' was built with a different extractor "
+                f"({self.extractor_fingerprint[:12]} vs {fingerprint[:12]})."
+            )
+
+    # -------- persistence -------- #
+    def save(self, path: str | Path) -> Path:
+        """
+        Write the profile as an .npz with a JSON header (atomic via rename).
+        """
+        p = Path(path)
+        meta = {
+            "format_version": _FORMAT_VERSION,
+            "name": self.name,
+            "extractor_fingerprint": self.extractor_fingerprint,
+            "n_known": len(self),
+            "dim": self.dim,
+        }
+        tmp = p.with_name(p.name + ".partial.npz")
+        np.savez(
+            tmp,
+            embeddings=self.embeddings,
+            pooled=self.pooled,
+            meta=np.array(json.dumps(meta)),
+        )
+        os.replace(tmp, p)
+        return p
+
+    @classmethod
+    def load(cls, path: str | Path) -> "AuthorProfile":
+        with np.load(path) as npz:
+            meta: Dict[str, Any] = json.loads(str(npz["meta"]))
+            if meta.get("format_version") != _FORMAT_VERSION:
+                raise ValueError(f"Unsupported author profile format in {path}")
+            return cls(
+                embeddings=npz["embeddings"],
+                pooled=npz["pooled"],
+                extractor_fingerprint=meta["extractor_fingerprint"],
+                name=meta["name"],
+            )
+
+
+def aggregate_scores(probs: np.ndarray, aggregation: str) -> float:
+    """
+    One probability from AuthorProfile.candidates() scores (known texts,
+    then the pooled vector).
+    """
+    if aggregation == "mean":
+        return float(np.mean(probs[:-1]))
+    if aggregation == "max":
+        return float(np.max(probs[:-1]))
+    if aggregation == "profile":
+        return float(probs[-1])
+    raise ValueError(f"aggregation must be one of {AGGREGATIONS}")
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from authorship_attribution.models import ModelBundle, Verifier
+
+
+@dataclass(frozen=True)
+class RegisteredModel:
+    """
+    One immutable registry entry; swapping a model replaces the entry, so a
+    request holding the old one finishes on the old model.
+    """
+
+    name: str
+    path: str
+    fingerprint: str
+    verifier: Verifier
+
+
+class ModelRegistry:
+    """
+    Named verification models sharing extractors by fingerprint.
+
+    Bundles whose extractors hash equal (same settings and fitted state)
+    get one in-memory extractor instance and one LRU cache of embeddings,
+    so verify_all() embeds each text once per distinct extractor rather
+    than once per model. load()/swap() read the new bundle outside the lock
+    and then replace the entry atomically; unused extractors are released.
+    """
+
+    def __init__(self, embed_cache_size: int = 4096):
+        self.embed_cache_size = embed_cache_size
+        self._lock = threading.RLock()
+        self._models: Dict[str, RegisteredModel] = {}
+        self._extractors: Dict[str, Any] = {}
+        self._cache: Dict[str, "OrderedDict[str, np.ndarray]"] = {}
+
+    # -------- loading -------- #
+    def load(self, name: str, path: str | Path) -> RegisteredModel:
+        """
+        Load (or atomically replace) model `name` from a bundle file.
+        """
+        logger = logging.getLogger(__name__)
+        bundle = ModelBundle.load(str(path))
+        fp = bundle.extractor.fingerprint()
+        with self._lock:
+            shared = self._extractors.get(fp)
+            if shared is None:
+                self._extractors[fp] = bundle.extractor
+                self._cache[fp] = OrderedDict()
+            else:
+                bundle.extractor = shared
+            entry = RegisteredModel(
+                name=name, path=str(path), fingerprint=fp, verifier=Verifier(bundle)
+            )
+            previous = self._models.get(name)
+            self._models[name] = entry
+            self._release_unused()
+        logger.info(
+            "%s model '%s' from %s (extractor %s, %s)",
+            "Swapped" if previous is not None else "Loaded",
+            name,
+            path,
+            fp[:12],
+            "shared" if shared is not None else "new",
+        )
+        return entry
+
+    swap = load
+
+    def load_dir(self, directory: str | Path, pattern: str = "*.joblib") -> List[str]:
+        """
+        Register every bundle in `directory`: files matching `pattern` by
+        stem, and subdirectories holding aa_model.joblib by directory name.
+        """
+        root = Path(directory)
+        found: List[Tuple[str, Path]] = [
+            (p.stem, p) for p in sorted(root.glob(pattern))
+        ]
+        found += [
+            (d.name, d / "aa_model.joblib")
+            for d in sorted(root.iterdir())
+            if d.is_dir() and (d / "aa_model.joblib").is_file()
+        ]
+        for name, path in found:
+            self.load(name, path)
+        return [name for name, _ in found]
+
+    def unload(self, name: str) -> None:
+        with self._lock:
+            del self._models[name]
+            self._release_unused()
+
+    def _release_unused(self) -> None:
+        used = {m.fingerprint for m in self._models.values()}
+        for fp in [fp for fp in self._extractors if fp not in used]:
+            del self._extractors[fp]
+            del self._cache[fp]
+
+    # -------- lookup -------- #
+    def get(self, name: str) -> RegisteredModel:
+        with self._lock:
+            try:
+                return self._models[name]
+            except KeyError:
+                raise KeyError(f"No model named '{name}'") from None
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._models)
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    @property
+    def n_extractors(self) -> int:
+        return len(self._extractors)
+
+    # -------- scoring -------- #
+    def _embed(self, entry: RegisteredModel, texts: Sequence[str]) -> np.ndarray:
+        extractor = entry.verifier.bundle.extractor
+        with self._lock:
+            # None if the extractor was released by a swap mid-request
+            cache = self._cache.get(entry.fingerprint)
+            rows: Dict[str, np.ndarray] = {}
+            if cache is not None:
+                rows = {t: cache[t] for t in texts if t in cache}
+                for t in rows:
+                    cache.move_to_end(t)
+        missing = list(dict.fromkeys(t for t in texts if t not in rows))
+        if missing:
+            X = extractor.transform(missing)
+            rows.update(zip(missing, X))
+            if cache is not None:
+                with self._lock:
+                    cache.update(zip(missing, X))
+                    while len(cache) > self.embed_cache_size:
+                        cache.popitem(last=False)
+        return np.vstack([rows[t] for t in texts])
+
+    def embed(self, name: str, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embeddings of `texts` for model `name`, shared with (and cached for)
+        every model using the same extractor.
+        """
+        return self._embed(self.get(name), texts)
+
+    def verify(self, name: str, text_a: str, text_b: str) -> Dict[str, Any]:
+        entry = self.get(name)
+        X = self._embed(entry, [text_a, text_b])
+        return entry.verifier.verify_embeddings(X[:1], X[1:])[0]
+
+    def verify_all(
+        self, text_a: str, text_b: str, names: Sequence[str] | None = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        verify() against several models (default: all), embedding the two
+        texts once per distinct extractor.
+        """
+        with self._lock:
+            entries = [self._models[n] for n in (names or sorted(self._models))]
+        by_fp: Dict[str, List[RegisteredModel]] = {}
+        for e in entries:
+            by_fp.setdefault(e.fingerprint, []).append(e)
+        out: Dict[str, Dict[str, Any]] = {}
+        for group in by_fp.values():
+            X = self._embed(group[0], [text_a, text_b])
+            for e in group:
+                out[e.name] = e.verifier.verify_embeddings(X[:1], X[1:])[0]
+        return out
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from threadpoolctl import ThreadpoolController
+
+THREADS_ENV = "AA_THREADS"
+STAGES = ("fit", "embed", "pairwise", "classifier", "inference")
+_BLAS_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+_CONTROLLER: ThreadpoolController | None = None
+
+
+def _controller() -> ThreadpoolController:
+    # Built on first use, after numpy/scipy/sklearn have loaded their pools
+    global _CONTROLLER
+    if _CONTROLLER is None:
+        _CONTROLLER = ThreadpoolController()
+    return _CONTROLLER
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """
+    Thread budget for BLAS/OpenMP pools and the package's own worker pools.
+
+    `threads` is the overall budget (None = leave libraries alone);
+    `stage_threads` overrides it for single stages (see STAGES).
+    """
+
+    threads: int | None = None
+    stage_threads: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        unknown = sorted(set(self.stage_threads) - set(STAGES))
+        if unknown:
+            raise ValueError(f"Unknown stages {unknown}; expected some of {STAGES}")
+        values = [self.threads, *self.stage_threads.values()]
+        if any(v is not None and v < 1 for v in values):
+            raise ValueError("Thread counts must be >= 1.")
+
+    def threads_for(self, name: str) -> int | None:
+        return self.stage_threads.get(name, self.threads)
+
+    def stage(self, name: str):
+        """
+        Context manager limiting BLAS/OpenMP threads while a stage runs.
+        """
+        n = self.threads_for(name)
+        if n is None:
+            return nullcontext()
+        return _controller().limit(limits=n)
+
+    def pool_workers(self, requested: int | None = None) -> int:
+        """
+        Worker processes for a package pool, capped by the thread budget.
+        """
+        n = requested or self.threads or os.cpu_count() or 1
+        return max(1, min(n, self.threads) if self.threads else n)
+
+    def worker_threads(self, n_workers: int) -> int | None:
+        """
+        BLAS threads per worker so that workers * threads fits the budget.
+        """
+        if self.threads is None:
+            return None
+        return max(1, self.threads // max(1, n_workers))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"threads": self.threads, "stage_threads": dict(self.stage_threads)}
+
+
+def parse_threads(spec: str | int | None) -> RuntimeConfig:
+    """
+    Parse "8" or "8,fit=4,classifier=2" (or just "fit=4") into a config.
+    """
+    if spec is None or spec == "":
+        return RuntimeConfig()
+    if isinstance(spec, int):
+        return RuntimeConfig(threads=spec)
+    threads: int | None = None
+    stages: Dict[str, int] = {}
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            name, value = part.split("=", 1)
+            stages[name.strip()] = int(value)
+        else:
+            threads = int(part)
+    return RuntimeConfig(threads=threads, stage_threads=stages)
+
+
+def resolve(
+    threads: int | str | None = None,
+    stage_threads: Dict[str, int] | None = None,
+) -> RuntimeConfig:
+    """
+    Explicit settings win; otherwise fall back to the AA_THREADS env var.
+    """
+    base = parse_threads(threads if threads is not None else os.environ.get(THREADS_ENV))
+    if stage_threads:
+        base = RuntimeConfig(base.threads, {**base.stage_threads, **stage_threads})
+    return base
+
+
+_CONFIG: RuntimeConfig | None = None
+
+
+def configure(
+    threads: int | str | None = None,
+    stage_threads: Dict[str, int] | None = None,
+) -> RuntimeConfig:
+    """
+    Set the process-wide config used by stage() and process_pool().
+    """
+    global _CONFIG
+    _CONFIG = resolve(threads, stage_threads)
+    return _CONFIG
+
+
+def get_config() -> RuntimeConfig:
+    global _CONFIG
+    if _CONFIG is None:
+        _CONFIG = resolve()
+    return _CONFIG
+
+
+def stage(name: str):
+    return get_config().stage(name)
+
+
+@contextmanager
+def using(config: RuntimeConfig) -> Iterator[RuntimeConfig]:
+    """
+    Temporarily make `config` the process-wide config.
+    """
+    global _CONFIG
+    previous = _CONFIG
+    _CONFIG = config
+    try:
+        yield config
+    finally:
+        _CONFIG = previous
+
+
+def _init_pool_worker(
+    config: RuntimeConfig,
+    threads: int | None,
+    initializer: Callable[..., None] | None,
+    initargs: Tuple[Any, ...],
+) -> None:
+    global _CONFIG, _CONTROLLER
+    if threads is not None:
+        for var in _BLAS_ENV_VARS:
+            os.environ[var] = str(threads)
+        _CONTROLLER = None
+        _controller().limit(limits=threads)
+        # Stages inside the worker stay within the worker's share
+        config = RuntimeConfig(
+            threads=threads,
+            stage_threads={k: min(v, threads) for k, v in config.stage_threads.items()},
+        )
+    _CONFIG = config
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def process_pool(
+    max_workers: int | None = None,
+    initializer: Callable[..., None] | None = None,
+    initargs: Tuple[Any, ...] = (),
+    config: RuntimeConfig | None = None,
+) -> ProcessPoolExecutor:
+    """
+    ProcessPoolExecutor whose workers split the thread budget between them:
+    at most `threads` workers, each limited to threads // workers BLAS threads.
+    """
+    config = config or get_config()
+    workers = config.pool_workers(max_workers)
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_pool_worker,
+        initargs=(config, config.worker_threads(workers), initializer, initargs),
+    )
+
+
+def effective_settings(config: RuntimeConfig | None = None) -> Dict[str, Any]:
+    """
+    Configured budget plus the thread pools the libraries actually report.
+    """
+    config = config or get_config()
+    return {
+        **config.as_dict(),
+        "env": {v: os.environ[v] for v in (THREADS_ENV, *_BLAS_ENV_VARS) if v in os.environ},
+        "cpu_count": os.cpu_count(),
+        "libraries": [
+            {
+                "user_api": info["user_api"],
+                "internal_api": info["internal_api"],
+                "num_threads": info["num_threads"],
+            }
+            for info in _controller().info()
+        ],
+    }
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from scipy.special import expit
+from sklearn.linear_model import LogisticRegression
+
+
+@dataclass
+class FusedPairScorer:
+    """
+    Pair logit computed straight from two embeddings.
+
+    pair_scaler and the logistic model are both affine, so their
+    coefficients fold into one weight vector per block of
+    pairwise_features(): |u-v| (which also absorbs the mean-L1 term), u*v,
+    and the cosine and L2 scalars. The (N, 2D+3) pair matrix is never built.
+    """
+
+    w_diff: np.ndarray  # (D,) float32
+    w_prod: np.ndarray  # (D,) float32
+    w_cos: float
+    w_l2: float
+    bias: float
+
+    @property
+    def dim(self) -> int:
+        return int(self.w_diff.shape[0])
+
+    @classmethod
+    def from_bundle(cls, bundle: Any) -> "FusedPairScorer | None":
+        """
+        Fold a bundle's scaler and classifier; None when the bundle does not
+        use a binary LogisticRegression over pairwise_features().
+        """
+        clf = bundle.classifier
+        if getattr(bundle, "metric", None) is not None:
+            return None
+        if not isinstance(clf, LogisticRegression) or clf.coef_.shape[0] != 1:
+            return None
+        w = np.asarray(clf.coef_[0], dtype=np.float64)
+        b = float(clf.intercept_[0])
+        if (len(w) - 3) % 2:
+            return None
+        scaler = bundle.pair_scaler
+        if scaler is not None:
+            # w . (f - mean) / scale  ==  (w / scale) . f - (w / scale) . mean
+            if scaler.scale_ is not None:
+                w = w / scaler.scale_
+            if scaler.mean_ is not None:
+                b -= float(w @ scaler.mean_)
+        D = (len(w) - 3) // 2
+        return cls(
+            w_diff=(w[:D] + w[2 * D + 1] / D).astype(np.float32),
+            w_prod=w[D : 2 * D].astype(np.float32),
+            w_cos=float(w[2 * D]),
+            w_l2=float(w[2 * D + 2]),
+            bias=b,
+        )
+
+    def logits(self, U: np.ndarray, V: np.ndarray) -> np.ndarray:
+        """
+        Logits for row-aligned (N, D) embedding pairs.
+        """
+        U = np.atleast_2d(U).astype(np.float32, copy=False)
+        V = np.atleast_2d(V).astype(np.float32, copy=False)
+        if U.shape != V.shape or U.shape[1] != self.dim:
+            raise ValueError(
+                f"Expected two (N, {self.dim}) arrays, got {U.shape} and {V.shape}"
+            )
+        diff = U - V
+        dots = np.einsum("ij,ij->i", U, V)
+        cos = dots / (
+            (np.linalg.norm(U, axis=1) + 1e-8) * (np.linalg.norm(V, axis=1) + 1e-8)
+        )
+        l2 = np.sqrt(np.einsum("ij,ij->i", diff, diff) / self.dim)
+        np.abs(diff, out=diff)
+        z = (diff @ self.w_diff).astype(np.float64)
+        z += (U * V) @ self.w_prod
+        z += self.w_cos * cos + self.w_l2 * l2 + self.bias
+        return z
+
+    def logits_one_vs_many(
+        self, u: np.ndarray, C: np.ndarray, chunk_size: int = 8192
+    ) -> np.ndarray:
+        """
+        Logits of one (D,) embedding against (n, D) candidates. The u*v and
+        cosine terms are matrix-vector products; only the |u-v| block is
+        formed, one chunk of candidates at a time.
+        """
+        u = np.asarray(u, dtype=np.float32).reshape(-1)
+        C = np.atleast_2d(C)
+        if C.shape[1] != self.dim or u.shape[0] != self.dim:
+            raise ValueError(f"Expected ({self.dim},) and (n, {self.dim}) arrays")
+        out = np.empty(len(C), dtype=np.float64)
+        wu = self.w_prod * u
+        u_norm = float(np.linalg.norm(u)) + 1e-8
+        for start in range(0, len(C), chunk_size):
+            Cc = np.asarray(C[start : start + chunk_size], dtype=np.float32)
+            cos = (Cc @ u) / ((np.linalg.norm(Cc, axis=1) + 1e-8) * u_norm)
+            diff = Cc - u
+            l2 = np.sqrt(np.einsum("ij,ij->i", diff, diff) / self.dim)
+            np.abs(diff, out=diff)
+            z = out[start : start + len(Cc)]
+            z[:] = diff @ self.w_diff
+            z += Cc @ wu
+            z += self.w_cos * cos + self.w_l2 * l2 + self.bias
+        return out
+
+    def proba(self, U: np.ndarray, V: np.ndarray) -> np.ndarray:
+        return expit(self.logits(U, V))
+
+    def proba_one_vs_many(
+        self, u: np.ndarray, C: np.ndarray, chunk_size: int = 8192
+    ) -> np.ndarray:
+        return expit(self.logits_one_vs_many(u, C, chunk_size))
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from joblib import load
+
+from authorship_attribution import runtime
+from authorship_attribution.data import load_author_corpus
+from authorship_attribution.dedup import dedup_texts
+from authorship_attribution.embeddings import (
+    EmbeddingStoreWriter,
+    embed_in_memory,
+    write_store_meta,
+)
+from authorship_attribution.features import FeatureExtractor
+from authorship_attribution.views import MultiViewExtractor
+from authorship_attribution.utils import ensure_dir, texts_sha256
+
+SHARD_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """
+    How to rebuild the exact text list train() embeds (same filters/dedup).
+    """
+
+    path: str
+    text_col: str = "text"
+    author_col: str = "author"
+    min_text_len: int = 50
+    min_texts_per_author: int = 2
+    dedup_threshold: float | None = None
+    dedup_keep: str = "first"
+    seed: int = 42
+
+    def load_texts(self) -> List[str]:
+        corpus = load_author_corpus(
+            self.path,
+            text_col=self.text_col,
+            author_col=self.author_col,
+            min_text_len=self.min_text_len,
+            min_texts_per_author=self.min_texts_per_author,
+        )
+        if self.dedup_threshold is not None:
+            keep = dedup_texts(
+                corpus.texts,
+                threshold=self.dedup_threshold,
+                keep=self.dedup_keep,
+                seed=self.seed,
+            ).keep
+            corpus = corpus.select(keep, min_texts_per_author=self.min_texts_per_author)
+        return corpus.texts
+
+
+def load_extractor(path: str | Path) -> FeatureExtractor | MultiViewExtractor:
+    """
+    Fitted extractor from a cached extractor_*.joblib or a saved model bundle.
+    """
+    kinds = (FeatureExtractor, MultiViewExtractor)
+    obj = load(path)
+    if isinstance(obj, kinds):
+        return obj
+    if isinstance(obj, dict) and "extractor" in obj:
+        return obj["extractor"]
+    extractor = getattr(obj, "extractor", None)
+    if isinstance(extractor, kinds):
+        return extractor
+    raise ValueError(f"No FeatureExtractor found in {path}")
+
+
+def shard_rows(n_rows: int, shard_index: int, num_shards: int) -> np.ndarray:
+    """
+    Rows owned by a shard: contiguous, deterministic, covering 0..n_rows-1.
+    """
+    if not 0 <= shard_index < num_shards:
+        raise ValueError("shard_index must be in [0, num_shards).")
+    start = n_rows * shard_index // num_shards
+    end = n_rows * (shard_index + 1) // num_shards
+    return np.arange(start, end, dtype=np.int64)
+
+
+def shard_path(out_dir: str | Path, shard_index: int, num_shards: int) -> Path:
+    return Path(out_dir) / f"shard_{shard_index:05d}-of-{num_shards:05d}.npz"
+
+
+def embed_shard(
+    extractor: FeatureExtractor,
+    texts: List[str],
+    shard_index: int,
+    num_shards: int,
+    out_dir: str | Path,
+    batch_size: int = 4096,
+    hash_algo: str = "sha256",
+) -> Path:
+    """
+    Embed one shard and write a self-describing file: row ids, float32
+    embeddings and a JSON header (shard layout, extractor fingerprint and
+    digest of the full text list). Written atomically via rename.
+    """
+    rows = shard_rows(len(texts), shard_index, num_shards)
+    X = embed_in_memory(extractor, [texts[i] for i in rows.tolist()], batch_size)
+    meta = {
+        "format_version": SHARD_FORMAT_VERSION,
+        "shard_index": shard_index,
+        "num_shards": num_shards,
+        "n_rows": len(texts),
+        "dim": int(extractor.output_dim),
+        "extractor_fingerprint": extractor.fingerprint(),
+        "texts_digest": texts_sha256(texts, algo=hash_algo),
+        "hash_algo": hash_algo,
+    }
+    path = shard_path(ensure_dir(out_dir), shard_index, num_shards)
+    tmp = path.with_name(path.name + ".partial.npz")
+    np.savez(tmp, row_ids=rows, X=X, meta=np.array(json.dumps(meta)))
+    os.replace(tmp, path)
+    logging.getLogger(__name__).info(
+        "Shard %d/%d: %d rows -> %s", shard_index, num_shards, len(rows), path
+    )
+    return path
+
+
+def _read_shard_meta(path: Path) -> Dict[str, Any]:
+    with np.load(path) as npz:
+        return json.loads(str(npz["meta"]))
+
+
+def merge_shards(shard_dir: str | Path, store_path: str | Path) -> Path:
+    """
+    Validate that shards are complete and consistent, then write the
+    embedding store (plus its metadata sidecar) that train() can consume.
+    """
+    paths = sorted(
+        p for p in Path(shard_dir).glob("shard_*-of-*.npz") if ".partial" not in p.name
+    )
+    if not paths:
+        raise FileNotFoundError(f"No shard files in {shard_dir}")
+    metas = [_read_shard_meta(p) for p in paths]
+    ref = metas[0]
+    for key in ("num_shards", "n_rows", "dim", "extractor_fingerprint", "texts_digest"):
+        values = {m[key] for m in metas}
+        if len(values) != 1:
+            raise ValueError(f"Shards disagree on '{key}': {sorted(map(str, values))}")
+    num_shards = ref["num_shards"]
+    indices = sorted(m["shard_index"] for m in metas)
+    missing = sorted(set(range(num_shards)) - set(indices))
+    if missing or len(indices) != num_shards:
+        raise ValueError(f"Incomplete shard set: missing {missing}, found {indices}")
+
+    n_rows, dim = ref["n_rows"], ref["dim"]
+    seen = np.zeros(n_rows, dtype=bool)
+    with EmbeddingStoreWriter(store_path, n_rows, dim) as writer:
+        for p in paths:
+            with np.load(p) as npz:
+                row_ids = npz["row_ids"]
+                if seen[row_ids].any():
+                    raise ValueError(f"Shard {p.name} overlaps rows of another shard.")
+                seen[row_ids] = True
+                writer.write_rows(row_ids, npz["X"])
+        if not seen.all():
+            raise ValueError(f"Shards cover {int(seen.sum())} of {n_rows} rows.")
+    write_store_meta(
+        store_path,
+        {
+            "n_rows": n_rows,
+            "dim": dim,
+            "extractor_fingerprint": ref["extractor_fingerprint"],
+            "texts_digest": ref["texts_digest"],
+            "hash_algo": ref["hash_algo"],
+            "num_shards": num_shards,
+        },
+    )
+    logging.getLogger(__name__).info(
+        "Merged %d shards (%d rows) into %s", num_shards, n_rows, store_path
+    )
+    return Path(store_path)
+
+
+def _run_shard(task: Tuple[str, CorpusSpec, int, int, str, int, str]) -> str:
+    extractor_path, spec, shard_index, num_shards, out_dir, batch_size, algo = task
+    extractor = load_extractor(extractor_path)
+    texts = spec.load_texts()
+    return str(
+        embed_shard(
+            extractor, texts, shard_index, num_shards, out_dir, batch_size, algo
+        )
+    )
+
+
+def run_local_shards(
+    extractor_path: str | Path,
+    spec: CorpusSpec,
+    num_shards: int,
+    out_dir: str | Path,
+    store_path: str | Path,
+    workers: int | None = None,
+    batch_size: int = 4096,
+    hash_algo: str = "sha256",
+) -> Path:
+    """
+    Run every shard in a local process pool (each worker behaves like a
+    separate machine on a shared filesystem), then merge. Workers share
+    the runtime thread budget.
+    """
+    tasks = [
+        (str(extractor_path), spec, i, num_shards, str(out_dir), batch_size, hash_algo)
+        for i in range(num_shards)
+    ]
+    with runtime.process_pool(workers or num_shards) as ex:
+        list(ex.map(_run_shard, tasks))
+    return merge_shards(out_dir, store_path)
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)  # fmt: skip
+BATCH_BUCKETS = tuple(float(2**i) for i in range(13))  # 1 .. 4096
+LENGTH_BUCKETS = tuple(float(2**i) for i in range(6, 21))  # 64 .. 1M chars
+
+# name -> (type, help, buckets) for the metrics the package records
+METRICS: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {
+    "aa_verify_requests_total": ("counter", "Text pairs scored by Verifier.", ()),
+    "aa_verify_calls_total": ("counter", "Verifier scoring calls.", ()),
+    "aa_verify_seconds": (
+        "histogram",
+        "End-to-end latency of a Verifier scoring call.",
+        LATENCY_BUCKETS,
+    ),
+    "aa_stage_seconds": (
+        "histogram",
+        "Latency per stage (vectorize, svd, stylometric, pairwise, classifier, "
+        "fused, metric).",
+        LATENCY_BUCKETS,
+    ),
+    "aa_verify_batch_size": (
+        "histogram",
+        "Pairs per Verifier scoring call.",
+        BATCH_BUCKETS,
+    ),
+    "aa_text_length_chars": (
+        "histogram",
+        "Length of texts embedded for verification.",
+        LENGTH_BUCKETS,
+    ),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class Histogram:
+    """
+    Fixed-bucket histogram; counts[i] holds observations <= buckets[i]
+    (non-cumulative), with a final overflow slot for +Inf.
+    """
+
+    buckets: Tuple[float, ...]
+    counts: np.ndarray = field(init=False)
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        self.counts = np.zeros(len(self.buckets) + 1, dtype=np.int64)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def observe_many(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        idx = np.searchsorted(np.asarray(self.buckets), values, side="left")
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+        self.sum += float(values.sum())
+        self.count += int(values.size)
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bucket bound containing the q-quantile (inf if in overflow).
+        """
+        if self.count == 0:
+            return math.nan
+        rank = q * self.count
+        cum = np.cumsum(self.counts)
+        i = int(np.searchsorted(cum, rank, side="left"))
+        return self.buckets[i] if i < len(self.buckets) else math.inf
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(labels: Labels, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    items = [*labels, *extra]
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in items)
+    return "{" + body + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+def _json_float(v: float) -> float | None:
+    return v if math.isfinite(v) else None
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "t0")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.registry._observe(self.name, self.labels, time.perf_counter() - self.t0)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process counters and histograms with Prometheus text
+    and JSON exporters. Metric families are created on first use; names in
+    METRICS get their help text and buckets from there.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.started = time.time()
+
+    # -------- recording -------- #
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            family = self._counters.setdefault(name, {})
+            family[key] = family.get(key, 0.0) + value
+
+    def _histogram(self, name: str, key: Labels) -> Histogram:
+        family = self._histograms.setdefault(name, {})
+        hist = family.get(key)
+        if hist is None:
+            buckets = METRICS.get(name, ("histogram", "", LATENCY_BUCKETS))[2]
+            hist = family[key] = Histogram(buckets or LATENCY_BUCKETS)
+        return hist
+
+    def _observe(self, name: str, key: Labels, value: float) -> None:
+        with self._lock:
+            self._histogram(name, key).observe(value)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        self._observe(name, _labels(labels), value)
+
+    def observe_many(self, name: str, values: np.ndarray, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._histogram(name, key).observe_many(values)
+
+    def timer(self, name: str, **labels: Any) -> _Timer:
+        return _Timer(self, name, _labels(labels))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    # -------- export -------- #
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(k), "value": v} for k, v in family.items()]
+                for name, family in self._counters.items()
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(k),
+                        "count": h.count,
+                        "sum": h.sum,
+                        "mean": h.sum / h.count if h.count else None,
+                        **{
+                            f"p{int(q * 100)}": _json_float(h.quantile(q))
+                            for q in (0.5, 0.95, 0.99)
+                        },
+                        "buckets": list(h.buckets),
+                        "counts": h.counts.tolist(),
+                    }
+                    for k, h in family.items()
+                ]
+                for name, family in self._histograms.items()
+            }
+        return {
+            "timestamp": time.time(),
+            "uptime_seconds": time.time() - self.started,
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, family in sorted(self._counters.items()):
+                help_text = METRICS.get(name, ("counter", "", ()))[1]
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(family.items()):
+                    lines.append(f"{name}{_fmt_labels(key)} {_fmt_value(value)}")
+            for name, family in sorted(self._histograms.items()):
+                help_text = METRICS.get(name, ("histogram", "", ()))[1]
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in sorted(family.items()):
+                    cum = np.cumsum(h.counts)
+                    for bound, c in zip([*h.buckets, math.inf], cum.tolist()):
+                        le = (("le", _fmt_value(bound)),)
+                        lines.append(f"{name}_bucket{_fmt_labels(key, le)} {c}")
+                    lines.append(f"{name}_sum{_fmt_labels(key)} {_fmt_value(h.sum)}")
+                    lines.append(f"{name}_count{_fmt_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str | Path) -> Path:
+        return _write_atomic(path, json.dumps(self.snapshot(), indent=2, default=str))
+
+    def write_prometheus(self, path: str | Path) -> Path:
+        return _write_atomic(path, self.to_prometheus())
+
+    def write(self, path: str | Path) -> Path:
+        """
+        Prometheus text for .prom/.txt paths, a JSON snapshot otherwise.
+        """
+        if Path(path).suffix in (".prom", ".txt"):
+            return self.write_prometheus(path)
+        return self.write_json(path)
+
+
+def _write_atomic(path: str | Path, content: str) -> Path:
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(p.name + ".tmp")
+    tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, p)
+    return p
+
+
+# -------- process-wide registry (disabled by default) -------- #
+_REGISTRY: MetricsRegistry | None = None
+_NULL = nullcontext()
+
+
+def enable(registry: MetricsRegistry | None = None) -> MetricsRegistry:
+    global _REGISTRY
+    _REGISTRY = registry or _REGISTRY or MetricsRegistry()
+    return _REGISTRY
+
+
+def disable() -> None:
+    global _REGISTRY
+    _REGISTRY = None
+
+
+def active() -> MetricsRegistry | None:
+    return _REGISTRY
+
+
+def timer(name: str, **labels: Any):
+    """
+    Time a block into histogram `name`; a shared no-op when disabled.
+    """
+    reg = _REGISTRY
+    if reg is None:
+        return _NULL
+    return reg.timer(name, **labels)
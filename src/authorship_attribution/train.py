@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import logging
 import os
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import numpy as np
 from joblib import dump, load
@@ -12,27 +13,41 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 
 from .data import group_split_by_author, load_author_corpus, sample_pairs
+from . import runtime
+from .dedup import dedup_texts
+from .embeddings import (
+    embed_in_memory,
+    embed_to_store,
+    open_embedding_store,
+    read_store_meta,
+)
+from .evaluation import ScoreCurve
 from .features import FeatureExtractor
+from .metric import fit_bilinear_metric, metric_scores
 from .models import ModelBundle, pairwise_features
+from .pair_matrix import ParallelPairBuilder, build_pair_matrix_parallel
 from .utils import (
     ModelMeta,
     ensure_dir,
-    find_best_threshold,
-    metrics_at_threshold,
+    FingerprintManifest,
     params_sha256,
-    roc_auc,
-    file_sha256,
     texts_sha256,
 )
+from .views import MultiViewExtractor
 
 
-def build_pair_matrix(embeddings: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+def build_pair_matrix(
+    embeddings: np.ndarray, pairs: np.ndarray, workers: int | None = 1
+) -> np.ndarray:
     """
     Vectorized pairwise feature construction.
     embeddings: (N, D)
     pairs: (K, 2) with index pairs into embeddings
     returns: (K, 2D+3)
+    With workers > 1 the rows are built by a shared-memory process pool.
     """
+    if workers != 1:
+        return build_pair_matrix_parallel(embeddings, pairs, workers=workers)
     U = embeddings[pairs[:, 0]]
     V = embeddings[pairs[:, 1]]
     return pairwise_features(U, V)
@@ -55,15 +70,55 @@ class TrainingConfig:
     seed: int = 42
     use_cache: bool = True
     cache_dir: str | None = None
+    embed_batch_size: int = 4096
+    hash_algo: str = "sha256"
+    hash_workers: int | None = None
+    dedup_threshold: float | None = None
+    dedup_keep: str = "first"
+    window_chars: int | None = None
+    max_doc_chars: int | None = None
+    window_sampling: str = "head"
+    window_pooling: str = "mean"
+    embeddings_path: str | None = None
+    threads: int | str | None = None
+    views: tuple[str, ...] | None = None
+    word_ngram_range: tuple[int, int] = (1, 2)
+    max_word_features: int = 50_000
+    word_svd_dim: int = 128
+    word_min_df: int | float | None = None
+    model_type: str = "logistic"
+    metric_rank: int = 64
+    metric_epochs: int = 20
+    projection: str = "svd"
+    projection_sample: int = 10_000
+    pair_workers: int | None = 1
+
+
+def _cache_root(cfg: TrainingConfig) -> Path:
+    return Path(cfg.cache_dir or Path(cfg.out_dir) / "cache")
 
 
 def _cache_paths(
     cfg: TrainingConfig, data_key: str, train_key: str, texts_key: str
 ) -> Dict[str, Path]:
-    cache_root = Path(cfg.cache_dir or Path(cfg.out_dir) / "cache")
-    ensure_dir(cache_root)
+    cache_root = ensure_dir(_cache_root(cfg))
+    view_params: Dict[str, Any] = {}
+    if cfg.projection != "svd":  # default keeps earlier cache keys valid
+        view_params["projection"] = cfg.projection
+        if cfg.projection == "svd_sample":
+            view_params["projection_sample"] = cfg.projection_sample
+    if cfg.views is not None:
+        view_params = {
+            "views": list(cfg.views),
+            "word_ngram_range": list(cfg.word_ngram_range),
+            "max_word_features": cfg.max_word_features,
+            "word_svd_dim": cfg.word_svd_dim,
+        }
+        if cfg.word_min_df is not None:  # default keeps earlier cache keys valid
+            view_params["word_min_df"] = cfg.word_min_df
     extractor_key = params_sha256(
         {
+            **view_params,
             "data_key": data_key,
             "train_key": train_key,
             "char_ngram_range": list(cfg.char_ngram_range),
@@ -73,7 +128,13 @@ def _cache_paths(
             "text_lowercase": cfg.text_lowercase,
             "min_df": cfg.char_min_df,
             "seed": cfg.seed,
-            "extractor_class": "FeatureExtractor",
+            "window_chars": cfg.window_chars,
+            "max_doc_chars": cfg.max_doc_chars,
+            "window_sampling": cfg.window_sampling,
+            "window_pooling": cfg.window_pooling,
+            "extractor_class": "FeatureExtractor"
+            if cfg.views is None
+            else "MultiViewExtractor",
         }
     )
     emb_all_key = params_sha256(
@@ -84,7 +145,7 @@ def _cache_paths(
     )
     return {
         "extractor": cache_root / f"extractor_{extractor_key}.joblib",
-        "emb_all": cache_root / f"emb_all_{emb_all_key}.npz",
+        "emb_all": cache_root / f"emb_all_{emb_all_key}.npy",
         # pairs also depend on seed and sampling params, build per split below
     }
 
@@ -94,8 +155,7 @@ def _pairs_paths(
     split_name: str,
     authors_hash: str,
 ) -> Path:
-    cache_root = Path(cfg.cache_dir or Path(cfg.out_dir) / "cache")
-    ensure_dir(cache_root)
+    cache_root = ensure_dir(_cache_root(cfg))
     key = params_sha256(
         {
             "split": split_name,
@@ -108,6 +168,36 @@ def _pairs_paths(
     return cache_root / f"pairs_{split_name}_{key}.npz"
 
 
+def _check_embedding_store(
+    path: str,
+    X_all: np.ndarray,
+    extractor: FeatureExtractor | MultiViewExtractor,
+    texts: List[str],
+    texts_key: str,
+    algo: str,
+) -> None:
+    """
+    Raise ValueError unless an external store was built for these texts
+    with this extractor.
+    """
+    expected = (len(texts), extractor.output_dim)
+    if X_all.shape != expected:
+        raise ValueError(
+            f"Embedding store {path} has shape {X_all.shape}; expected {expected}."
+        )
+    meta = read_store_meta(path)
+    if meta is None:
+        raise ValueError(f"Embedding store {path} has no metadata sidecar.")
+    if meta.get("extractor_fingerprint") != extractor.fingerprint():
+        raise ValueError(
+            f"Embedding store {path} was computed with a different extractor."
+        )
+    store_algo = meta.get("hash_algo", "sha256")
+    digest = texts_key if store_algo == algo else texts_sha256(texts, algo=store_algo)
+    if meta.get("texts_digest") != digest:
+        raise ValueError(f"Embedding store {path} was computed for different texts.")
+
+
 def train(
     csv_path: str,
     text_col: str = "text",
@@ -124,6 +214,28 @@ def train(
     seed: int = 42,
     use_cache: bool = True,
     cache_dir: str | None = None,
+    embed_batch_size: int = 4096,
+    hash_algo: str = "sha256",
+    hash_workers: int | None = None,
+    dedup_threshold: float | None = None,
+    dedup_keep: str = "first",
+    window_chars: int | None = None,
+    max_doc_chars: int | None = None,
+    window_sampling: str = "head",
+    window_pooling: str = "mean",
+    embeddings_path: str | None = None,
+    threads: int | str | None = None,
+    views: tuple[str, ...] | List[str] | None = None,
+    word_ngram_range: tuple[int, int] = (1, 2),
+    max_word_features: int = 50_000,
+    word_svd_dim: int = 128,
+    word_min_df: int | float | None = None,
+    model_type: str = "logistic",
+    metric_rank: int = 64,
+    metric_epochs: int = 20,
+    projection: str = "svd",
+    projection_sample: int = 10_000,
+    pair_workers: int | None = 1,
 ) -> Dict[str, Any]:
     """
     Train an authorship verification model and save a serialized bundle.
@@ -150,32 +262,135 @@ def train(
         seed=seed,
         use_cache=use_cache,
         cache_dir=cache_dir,
+        embed_batch_size=embed_batch_size,
+        hash_algo=hash_algo,
+        hash_workers=hash_workers,
+        dedup_threshold=dedup_threshold,
+        dedup_keep=dedup_keep,
+        window_chars=window_chars,
+        max_doc_chars=max_doc_chars,
+        window_sampling=window_sampling,
+        window_pooling=window_pooling,
+        embeddings_path=embeddings_path,
+        threads=threads,
+        views=tuple(views) if views is not None else None,
+        word_ngram_range=word_ngram_range,
+        max_word_features=max_word_features,
+        word_svd_dim=word_svd_dim,
+        word_min_df=word_min_df,
+        model_type=model_type,
+        metric_rank=metric_rank,
+        metric_epochs=metric_epochs,
+        projection=projection,
+        projection_sample=projection_sample,
+        pair_workers=pair_workers,
     )
+    if cfg.model_type not in ("logistic", "bilinear"):
+        raise ValueError("model_type must be 'logistic' or 'bilinear'")
+    if cfg.views is not None and cfg.window_chars is not None:
+        raise ValueError("Windowed document mode is not supported with views.")
+    if cfg.views is not None and "style" in cfg.views and not cfg.use_function_words:
+        raise ValueError(
+            "use_function_words=False conflicts with the 'style' view; "
+            "leave 'style' out of views instead."
+        )
+    if cfg.views is not None and cfg.projection != "svd":
+        raise ValueError("Projection backends other than 'svd' need views=None.")
 
     os.makedirs(cfg.out_dir, exist_ok=True)
 
+    # Thread budget (threads arg, else AA_THREADS) applied per stage below
+    rt = runtime.resolve(cfg.threads)
+    logger.info("Runtime threads: %s", rt.as_dict())
+    hash_workers = cfg.hash_workers or rt.threads
+
     # 1) Load and minimally filter data
     logger.info("Loading data from %s", cfg.csv_path)
-    df, texts, authors = load_author_corpus(
+    corpus = load_author_corpus(
         cfg.csv_path,
         text_col=cfg.text_col,
         author_col=cfg.author_col,
         min_text_len=50,
         min_texts_per_author=2,
     )
-    logger.info("Loaded %d texts from %d authors.", len(texts), len(set(authors)))
+    logger.info("Loaded %d texts from %d authors.", len(corpus), corpus.n_authors)
 
-    # Data-level fingerprints
+    # Data-level fingerprints. The manifest remembers the file digest per
+    # (path, size, mtime, inode) and the text digests derived from it, so an
+    # unchanged input is not rehashed on every run.
+    manifest = FingerprintManifest(
+        _cache_root(cfg) / "fingerprints.json" if cfg.use_cache else None
+    )
+    algo = cfg.hash_algo
     data_key = params_sha256(
         {
-            "file_sha256": file_sha256(cfg.csv_path),
+            "file_digest": manifest.file_digest(cfg.csv_path, algo),
+            "hash_algo": algo,
             "text_col": cfg.text_col,
             "author_col": cfg.author_col,
             "min_text_len": 50,
             "min_texts_per_author": 2,
         }
     )
-    texts_key = texts_sha256(texts)
+
+    # 1b) Optional near-duplicate removal (keep indices cached per data_key)
+    dedup_params = (
+        {
+            "threshold": cfg.dedup_threshold,
+            "keep": cfg.dedup_keep,
+            "num_perm": 128,
+            "shingle_size": 5,
+            "seed": cfg.seed,
+        }
+        if cfg.dedup_threshold is not None
+        else None
+    )
+    corpus_key = params_sha256({"data_key": data_key, "dedup": dedup_params})
+    dedup_info: Dict[str, Any] | None = None
+    if dedup_params is not None:
+        n_before = len(corpus)
+        dedup_path = ensure_dir(_cache_root(cfg)) / f"dedup_{corpus_key}.npy"
+        t0 = time.perf_counter()
+        if cfg.use_cache and dedup_path.is_file():
+            logger.info("Cache hit: loading dedup keep indices from %s", dedup_path)
+            keep_idx = np.load(dedup_path)
+        else:
+            keep_idx = dedup_texts(
+                corpus.texts,
+                threshold=dedup_params["threshold"],
+                num_perm=dedup_params["num_perm"],
+                shingle_size=dedup_params["shingle_size"],
+                keep=dedup_params["keep"],
+                seed=dedup_params["seed"],
+            ).keep
+            if cfg.use_cache:
+                np.save(dedup_path, keep_idx)
+        corpus = corpus.select(keep_idx, min_texts_per_author=2)
+        dedup_info = {
+            "texts_before": n_before,
+            "texts_after": len(corpus),
+            "removed": n_before - len(corpus),
+            "seconds": time.perf_counter() - t0,
+        }
+        logger.info(
+            "Dedup removed %d of %d texts (%d authors left).",
+            dedup_info["removed"],
+            n_before,
+            corpus.n_authors,
+        )
+
+    texts = corpus.texts
+    authors = corpus.authors
+
+    def derived_key(name: str, seq: List[str]) -> str:
+        return manifest.derived(
+            cfg.csv_path,
+            f"{name}:{corpus_key}",
+            lambda: texts_sha256(seq, algo=algo, workers=hash_workers),
+            algo=algo,
+        )
+
+    texts_key = derived_key("texts", texts)
 
     # 2) Author-disjoint split (deterministic for seed)
     idx_train, idx_val = group_split_by_author(authors, train_frac=0.8, seed=cfg.seed)
@@ -184,49 +399,115 @@ def train(
     authors_train = [authors[i] for i in idx_train]
     authors_val = [authors[i] for i in idx_val]
 
-    train_key = texts_sha256(texts_train)
+    train_key = derived_key(f"train_texts:{cfg.seed}", texts_train)
     paths = _cache_paths(
-        cfg, data_key=data_key, train_key=train_key, texts_key=texts_key
+        cfg, data_key=corpus_key, train_key=train_key, texts_key=texts_key
     )
 
     # 3) Fit or load feature extractor (fit on train only; no leakage)
+    fit_seconds: float | None = None  # None when loaded from cache
     if cfg.use_cache and paths["extractor"].is_file():
         logger.info("Cache hit: loading extractor from %s", paths["extractor"])
-        extractor: FeatureExtractor = load(paths["extractor"])
+        extractor: FeatureExtractor | MultiViewExtractor = load(paths["extractor"])
     else:
         logger.info("Fitting feature extractor...")
-        extractor = FeatureExtractor(
-            char_ngram_range=cfg.char_ngram_range,
-            max_char_features=cfg.max_char_features,
-            svd_dim=cfg.svd_dim,
-            text_lowercase=cfg.text_lowercase,
-            use_function_words=cfg.use_function_words,
-            random_state=cfg.seed,
-            min_df=cfg.char_min_df,
-        ).fit(texts_train)
+        if cfg.views is not None:
+            logger.info("Extractor views: %s", ", ".join(cfg.views))
+            extractor = MultiViewExtractor(
+                views=cfg.views,
+                char_ngram_range=cfg.char_ngram_range,
+                max_char_features=cfg.max_char_features,
+                svd_dim=cfg.svd_dim,
+                word_ngram_range=cfg.word_ngram_range,
+                max_word_features=cfg.max_word_features,
+                word_svd_dim=cfg.word_svd_dim,
+                word_min_df=cfg.word_min_df,
+                text_lowercase=cfg.text_lowercase,
+                random_state=cfg.seed,
+                min_df=cfg.char_min_df,
+            )
+        else:
+            extractor = FeatureExtractor(
+                char_ngram_range=cfg.char_ngram_range,
+                max_char_features=cfg.max_char_features,
+                svd_dim=cfg.svd_dim,
+                text_lowercase=cfg.text_lowercase,
+                use_function_words=cfg.use_function_words,
+                random_state=cfg.seed,
+                min_df=cfg.char_min_df,
+                projection=cfg.projection,
+                projection_sample=cfg.projection_sample,
+            )
+            extractor.set_document_mode(
+                cfg.window_chars,
+                max_doc_chars=cfg.max_doc_chars,
+                sampling=cfg.window_sampling,
+                pooling=cfg.window_pooling,
+            )
+        t0 = time.perf_counter()
+        with rt.stage("fit"):
+            extractor.fit(texts_train)
+        fit_seconds = time.perf_counter() - t0
+        logger.info(
+            "Extractor fitted in %.2fs (projection=%s)", fit_seconds, cfg.projection
+        )
+        vocab_memory = getattr(extractor, "vocab_memory", None)
+        if vocab_memory:
+            logger.info(
+                "Char vocabulary compacted: %d terms, %d -> %d bytes",
+                vocab_memory["terms"],
+                vocab_memory["dict_bytes"],
+                vocab_memory["compact_bytes"],
+            )
         if cfg.use_cache:
             logger.info("Cache save: extractor -> %s", paths["extractor"])
             dump(extractor, paths["extractor"])
 
-    # 4) Transform texts to embeddings (reuse for all texts if cached)
-    if cfg.use_cache and paths["emb_all"].is_file():
-        logger.info("Cache hit: loading all embeddings from %s", paths["emb_all"])
-        X_all = np.load(paths["emb_all"])["X"]
+    # 4) Transform texts to embeddings (reuse for all texts if cached).
+    # The cached store is a plain .npy opened with mmap, so it is written
+    # batch by batch and never needs to be fully resident.
+    embed_seconds: float | None = None
+    if cfg.embeddings_path is not None:
+        # Precomputed store (e.g. merged aa-embed shards); must match both
+        # the extractor and the exact text list used here.
+        logger.info("Opening precomputed embeddings from %s", cfg.embeddings_path)
+        X_all = open_embedding_store(cfg.embeddings_path)
+        _check_embedding_store(
+            cfg.embeddings_path, X_all, extractor, texts, texts_key, algo
+        )
+    elif cfg.use_cache and paths["emb_all"].is_file():
+        logger.info("Cache hit: opening all embeddings from %s", paths["emb_all"])
+        X_all = open_embedding_store(paths["emb_all"])
     else:
-        logger.info("Transforming texts to embeddings (all)...")
-        X_all = extractor.transform(texts)
-        if cfg.use_cache:
-            logger.info("Cache save: embeddings -> %s", paths["emb_all"])
-            np.savez_compressed(paths["emb_all"], X=X_all)
-
-    X_train = X_all[idx_train]
-    X_val = X_all[idx_val]
+        t0 = time.perf_counter()
+        with rt.stage("embed"):
+            if cfg.use_cache:
+                logger.info(
+                    "Transforming texts to embeddings (all) -> %s", paths["emb_all"]
+                )
+                X_all = embed_to_store(
+                    extractor, texts, paths["emb_all"], batch_size=cfg.embed_batch_size
+                )
+            else:
+                logger.info("Transforming texts to embeddings (all)...")
+                X_all = embed_in_memory(
+                    extractor, texts, batch_size=cfg.embed_batch_size
+                )
+        embed_seconds = time.perf_counter() - t0
+    if dedup_info is not None and embed_seconds is not None:
+        # Removed texts would have cost the same per-text embedding time
+        dedup_info["est_embed_seconds_saved"] = (
+            dedup_info["removed"] * embed_seconds / max(1, len(texts))
+        )
 
     # 5) Pairs (author-disjoint), cache per split
     train_pairs_path = _pairs_paths(
-        cfg, "train", authors_hash=texts_sha256(authors_train)
+        cfg, "train", authors_hash=derived_key(f"train_authors:{cfg.seed}", authors_train)
+    )
+    val_pairs_path = _pairs_paths(
+        cfg, "val", authors_hash=derived_key(f"val_authors:{cfg.seed}", authors_val)
     )
-    val_pairs_path = _pairs_paths(cfg, "val", authors_hash=texts_sha256(authors_val))
+    manifest.save()
 
     if cfg.use_cache and train_pairs_path.is_file():
         logger.info("Cache hit: loading train pairs from %s", train_pairs_path)
@@ -270,14 +551,23 @@ def train(
 
     # 6) Build pairwise feature matrices
     logger.info("Building pair feature matrices...")
-    Pf_train = build_pair_matrix(X_train, pairs_train)
-    Pf_val = build_pair_matrix(X_val, pairs_val)
-
-    # 7) Standardize pairwise features
-    logger.info("Fitting StandardScaler for pairwise features...")
-    pair_scaler = StandardScaler().fit(Pf_train)
-    Pf_train = pair_scaler.transform(Pf_train)
-    Pf_val = pair_scaler.transform(Pf_val)
+    # Pairs index into the split; map them to rows of X_all instead of
+    # gathering per-split copies of the embedding matrix. With pair_workers
+    # > 1 both matrices come from one shared-memory worker pool.
+    with ParallelPairBuilder(
+        X_all, workers=cfg.pair_workers, config=rt
+    ) as pair_builder:
+        with rt.stage("pairwise"):
+            Pf_train = pair_builder.build(idx_train[pairs_train])
+
+        # 7) Standardize pairwise features; val rows are scaled as built
+        logger.info("Fitting StandardScaler for pairwise features...")
+        with rt.stage("classifier"):
+            pair_scaler = StandardScaler().fit(Pf_train)
+            Pf_train = pair_scaler.transform(Pf_train)
+        pair_builder.scaler = pair_scaler
+        with rt.stage("pairwise"):
+            Pf_val = pair_builder.build(idx_val[pairs_val])
 
     # 8) Tune LogisticRegression C on validation (no class weighting; pairs are balanced)
     logger.info("Tuning LogisticRegression(C) on validation set...")
@@ -288,7 +578,7 @@ def train(
         "C": None,
         "clf": None,
         "threshold": 0.5,
-        "val_probs": None,
+        "curve": None,
     }
     for C in C_grid:
         clf_tmp = LogisticRegression(
@@ -298,11 +588,14 @@ def train(
             random_state=cfg.seed,
             C=C,
         )
-        clf_tmp.fit(Pf_train, y_train)
-        val_probs_tmp = clf_tmp.predict_proba(Pf_val)[:, 1]
-        auc_tmp = roc_auc(y_val, val_probs_tmp)
-        thr_tmp = find_best_threshold(y_val, val_probs_tmp)
-        m_tmp = metrics_at_threshold(y_val, val_probs_tmp, threshold=thr_tmp)
+        with rt.stage("classifier"):
+            clf_tmp.fit(Pf_train, y_train)
+            val_probs_tmp = clf_tmp.predict_proba(Pf_val)[:, 1]
+        # One sort gives AUC, the exact best-F1 threshold and its metrics
+        curve_tmp = ScoreCurve.from_scores(y_val, val_probs_tmp)
+        auc_tmp = curve_tmp.roc_auc()
+        thr_tmp = curve_tmp.best_threshold()
+        m_tmp = curve_tmp.at_threshold(thr_tmp)
         logger.info(
             "C=%.3g | AUC=%.4f | F1@bestThr=%.4f thr=%.4f",
             C,
@@ -321,17 +614,17 @@ def train(
                     "C": float(C),
                     "clf": clf_tmp,
                     "threshold": float(thr_tmp),
-                    "val_probs": val_probs_tmp,
+                    "curve": curve_tmp,
                 }
             )
 
     clf = best["clf"]  # type: ignore[assignment]
     assert clf is not None
-    val_probs = best["val_probs"]  # type: ignore[assignment]
-    assert val_probs is not None
+    curve: ScoreCurve = best["curve"]  # type: ignore[assignment]
+    assert curve is not None
     threshold = float(best["threshold"])
     auc = float(best["auc"])
-    m = metrics_at_threshold(y_val, val_probs, threshold=threshold)
+    m = curve.at_threshold(threshold)
 
     logger.info(
         "Selected C=%.3g | Validation AUC: %.4f, Accuracy: %.4f, F1: %.4f at threshold %.4f",
@@ -342,42 +635,104 @@ def train(
         threshold,
     )
 
+    comparison: Dict[str, Dict[str, float]] = {
+        "logistic": {"val_auc": auc, "val_f1": float(m["f1"]), "threshold": threshold}
+    }
+    metric = None
+    if cfg.model_type == "bilinear":
+        # 8b) Low-rank metric on the same pairs; the logistic model above
+        # stays as the reference in the report
+        logger.info("Fitting bilinear metric (rank %d)...", cfg.metric_rank)
+        with rt.stage("classifier"):
+            metric = fit_bilinear_metric(
+                X_all,
+                idx_train[pairs_train],
+                y_train,
+                rank=cfg.metric_rank,
+                epochs=cfg.metric_epochs,
+                seed=cfg.seed,
+            )
+            _, metric_probs = metric_scores(metric, X_all, idx_val[pairs_val])
+        curve = ScoreCurve.from_scores(y_val, metric_probs)
+        auc = curve.roc_auc()
+        threshold = curve.best_threshold()
+        m = curve.at_threshold(threshold)
+        comparison["bilinear"] = {
+            "val_auc": float(auc),
+            "val_f1": float(m["f1"]),
+            "threshold": float(threshold),
+        }
+        logger.info(
+            "Bilinear metric | Validation AUC: %.4f, F1: %.4f at threshold %.4f "
+            "(logistic AUC %.4f, F1 %.4f)",
+            auc,
+            m["f1"],
+            threshold,
+            comparison["logistic"]["val_auc"],
+            comparison["logistic"]["val_f1"],
+        )
+
     # 9) Save model bundle
+    runtime_settings = runtime.effective_settings(rt)
     logger.info("Saving model bundle...")
     bundle = ModelBundle(
         extractor=extractor,
-        classifier=clf,  # tuned
+        classifier=clf if metric is None else None,  # tuned
         threshold=float(threshold),
         meta=ModelMeta(
-            feature_dim=int(X_train.shape[1]),
+            feature_dim=int(X_all.shape[1]),
             svd_dim=cfg.svd_dim,
             char_ngram_range=cfg.char_ngram_range,
             max_char_features=cfg.max_char_features,
-            use_function_words=cfg.use_function_words,
+            use_function_words=extractor.use_function_words,
             text_lowercase=cfg.text_lowercase,
             tokenizer="regex_word",
-            notes="Pairwise logistic on |u-v|, u*v + cosine + L1 + L2 from char n-gram SVD (+ function words). Pairwise features standardized.",
+            notes="Pairwise logistic on |u-v|, u*v + cosine + L1 + L2 from char n-gram SVD (+ function words). Pairwise features standardized."
+            if metric is None
+            else f"Bilinear metric: calibrated cosine in a learned rank-{metric.rank} projection of the embeddings.",
+            runtime=runtime_settings,
+            views=list(extractor.views)
+            if isinstance(extractor, MultiViewExtractor)
+            else ["char", "style"] if cfg.use_function_words else ["char"],
         ),
-        pair_scaler=pair_scaler,
+        pair_scaler=pair_scaler if metric is None else None,
+        metric=metric,
     )
     model_path = os.path.join(cfg.out_dir, "aa_model.joblib")
     bundle.save(model_path)
-    logger.info("Model saved to %s", model_path)
+    bundle_bytes = os.path.getsize(model_path)
+    logger.info("Model saved to %s (%d bytes)", model_path, bundle_bytes)
+    curves_path = curve.save(os.path.join(cfg.out_dir, "val_curves.npz"))
+    logger.info("Validation ROC/PR curves saved to %s", curves_path)
 
     return {
         "model_path": model_path,
+        "val_curves_path": str(curves_path),
         "val_auc": auc,
         "val_accuracy": m["accuracy"],
         "val_f1": m["f1"],
+        "val_precision": m["precision"],
+        "val_recall": m["recall"],
         "threshold": float(threshold),
         "best_C": float(best["C"]) if best["C"] is not None else None,
+        "model_type": cfg.model_type,
+        "projection": {
+            "backend": cfg.projection,
+            "fit_seconds": fit_seconds,
+            "bundle_bytes": bundle_bytes,
+            "val_auc": auc,
+        },
+        "model_comparison": comparison,
+        "vocab_memory": getattr(extractor, "vocab_memory", None),
         "n_train_pairs": int(len(Pf_train)),
         "n_val_pairs": int(len(Pf_val)),
         "n_train_texts": int(len(texts_train)),
         "n_val_texts": int(len(texts_val)),
+        "dedup": dedup_info,
+        "runtime": runtime_settings,
         "cache": {
             "used": bool(cfg.use_cache),
-            "cache_dir": str(Path(cfg.cache_dir or Path(cfg.out_dir) / "cache")),
+            "cache_dir": str(_cache_root(cfg)),
         },
     }
 
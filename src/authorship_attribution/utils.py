@@ -2,38 +2,37 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Sequence
+from typing import Any, Callable, Dict, List, Sequence
 
 import numpy as np
-from sklearn.metrics import accuracy_score, f1_score as sk_f1_score, roc_auc_score
+
+from authorship_attribution.evaluation import ScoreCurve
 
 
 def find_best_threshold(
     y_true: np.ndarray,
     y_prob: np.ndarray,
     *,
-    n_steps: int = 200,
+    n_steps: int | None = None,
 ) -> float:
     """
-    Pick threshold (by percentiles of y_prob) that maximizes F1.
+    Pick the threshold that maximizes F1 (exact, over all distinct scores).
+    n_steps is accepted for compatibility and ignored: the search no longer
+    samples percentile candidates.
     """
-    if y_true.ndim != 1 or y_prob.ndim != 1 or y_true.shape[0] != y_prob.shape[0]:
-        raise ValueError("y_true and y_prob must be 1D arrays of the same length.")
-    if n_steps <= 1:
-        return 0.5
-
-    # Avoid degenerate candidates by deduplicating
-    candidates = np.unique(np.percentile(y_prob, np.linspace(0, 100, n_steps)))
-    best_t, best_f1 = 0.5, -1.0
-    for t in candidates:
-        y_pred = (y_prob >= t).astype(int)
-        f1 = sk_f1_score(y_true, y_pred, zero_division=0)  # pyright: ignore[reportArgumentType]
-        if f1 > best_f1:
-            best_f1 = f1
-            best_t = float(t)
-    return best_t
+    if n_steps is not None:
+        warnings.warn(
+            "find_best_threshold(n_steps=...) is ignored; the threshold search "
+            "is exact over all distinct scores.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+    return ScoreCurve.from_scores(y_true, y_prob).best_threshold()
 
 
 def metrics_at_threshold(
@@ -42,25 +41,17 @@ def metrics_at_threshold(
     threshold: float,
 ) -> Dict[str, float]:
     """
-    Compute accuracy/F1 at a fixed threshold using sklearn metrics.
+    Compute accuracy/F1 at a fixed threshold.
     """
-    y_pred = (y_prob >= threshold).astype(int)
-    acc = float(accuracy_score(y_true, y_pred))
-    f1 = float(sk_f1_score(y_true, y_pred, zero_division=0))  # pyright: ignore[reportArgumentType]
-    return {"accuracy": acc, "f1": f1, "threshold": float(threshold)}
+    m = ScoreCurve.from_scores(y_true, y_prob).at_threshold(threshold)
+    return {"accuracy": m["accuracy"], "f1": m["f1"], "threshold": m["threshold"]}
 
 
 def roc_auc(y_true: np.ndarray, y_prob: np.ndarray) -> float:
     """
-    Compute ROC AUC via sklearn. Returns NaN if not defined.
+    Compute ROC AUC. Returns NaN if not defined.
     """
-    y_true = np.asarray(y_true)
-    y_prob = np.asarray(y_prob)
-    pos = int(np.sum(y_true == 1))
-    neg = int(np.sum(y_true == 0))
-    if pos == 0 or neg == 0:
-        return float("nan")
-    return float(roc_auc_score(y_true, y_prob))
+    return ScoreCurve.from_scores(y_true, y_prob).roc_auc()
 
 
 @dataclass
@@ -74,6 +65,8 @@ class ModelMeta:
     tokenizer: str
     notes: str = ""
     version: str = "1.0.0"
+    runtime: Dict[str, Any] | None = None  # thread settings used in training
+    views: List[str] | None = None  # extractor views, in output column order
 
 
 # ------------- caching helpers ------------- #
@@ -86,6 +79,31 @@ def sha256_update(obj: bytes | str, h: hashlib._Hash) -> None:
         h.update(obj)
 
 
+# blake2b is keyed so its digests never collide with plain content hashes
+_BLAKE2B_KEY = b"authorship-attribution"
+HASH_ALGOS = ("sha256", "blake2b")
+
+
+def new_hasher(algo: str = "sha256") -> hashlib._Hash:
+    """
+    sha256 (default) or keyed blake2b-256, which is faster on 64-bit CPUs
+    without SHA extensions.
+    """
+    if algo == "sha256":
+        return hashlib.sha256()
+    if algo == "blake2b":
+        return hashlib.blake2b(digest_size=32, key=_BLAKE2B_KEY)
+    raise ValueError(f"Unknown hash algorithm '{algo}'; expected one of {HASH_ALGOS}.")
+
+
+def file_digest(path: str | Path, algo: str = "sha256") -> str:
+    """
+    Streaming digest of a file's content (hashing runs without the GIL).
+    """
+    with Path(path).open("rb") as f:
+        return hashlib.file_digest(f, lambda: new_hasher(algo)).hexdigest()
+
+
 def file_sha256(path: str | Path, chunk_size: int = 1 << 20) -> str:
     """
     Streaming SHA-256 of a file's content.
@@ -101,19 +119,109 @@ def file_sha256(path: str | Path, chunk_size: int = 1 << 20) -> str:
     return h.hexdigest()
 
 
-def texts_sha256(texts: Sequence[str]) -> str:
+def _texts_chunk_digest(texts: Sequence[str], algo: str) -> bytes:
+    # Char lengths + one concatenated encode keep the per-text work in C and
+    # hand large buffers to the hasher, which releases the GIL.
+    h = new_hasher(algo)
+    h.update(np.fromiter(map(len, texts), dtype=np.int64, count=len(texts)).tobytes())
+    h.update("".join(texts).encode("utf-8", errors="replace"))
+    return h.digest()
+
+
+def texts_sha256(
+    texts: Sequence[str],
+    *,
+    algo: str = "sha256",
+    chunk_texts: int = 65_536,
+    workers: int | None = None,
+) -> str:
     """
     Hash a sequence of texts deterministically (length-prefixed).
+
+    Chunks of `chunk_texts` texts are hashed in a thread pool and the chunk
+    digests are hashed in order, so the result does not depend on `workers`.
     """
-    h = hashlib.sha256()
-    for t in texts:
-        b = t.encode("utf-8", errors="replace")
-        sha256_update(str(len(b)), h)
-        h.update(b)
-        sha256_update("|", h)
+    chunks = [texts[i : i + chunk_texts] for i in range(0, len(texts), chunk_texts)]
+    if workers is None:
+        workers = min(len(chunks), os.cpu_count() or 1)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            digests = list(ex.map(lambda c: _texts_chunk_digest(c, algo), chunks))
+    else:
+        digests = [_texts_chunk_digest(c, algo) for c in chunks]
+    h = new_hasher(algo)
+    sha256_update(f"{len(texts)}|{chunk_texts}|", h)
+    for d in digests:
+        h.update(d)
     return h.hexdigest()
 
 
+class FingerprintManifest:
+    """
+    Persistent map of file (path, size, mtime, inode) -> content digest.
+
+    Unchanged inputs skip rehashing. Values derived from a file (e.g. the
+    digest of the texts loaded from it) are memoized under the same entry
+    and are dropped as soon as the file's stat signature changes.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path is not None else None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        if self.path is not None and self.path.is_file():
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._entries = {}  # corrupt manifest: start over
+
+    @staticmethod
+    def _signature(path: Path) -> Dict[str, int]:
+        st = path.stat()
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+
+    def _entry(self, path: str | Path, algo: str) -> Dict[str, Any]:
+        p = Path(path).resolve()
+        sig = self._signature(p)
+        key = str(p)
+        entry = self._entries.get(key)
+        if entry is None or entry.get("algo") != algo or any(
+            entry.get(k) != v for k, v in sig.items()
+        ):
+            entry = {**sig, "algo": algo, "digest": file_digest(p, algo), "derived": {}}
+            self._entries[key] = entry
+            self._dirty = True
+        return entry
+
+    def file_digest(self, path: str | Path, algo: str = "sha256") -> str:
+        return self._entry(path, algo)["digest"]
+
+    def derived(
+        self,
+        path: str | Path,
+        name: str,
+        compute: Callable[[], str],
+        algo: str = "sha256",
+    ) -> str:
+        """
+        Memoized digest of something computed from `path` (keyed by `name`).
+        """
+        derived = self._entry(path, algo)["derived"]
+        if name not in derived:
+            derived[name] = compute()
+            self._dirty = True
+        return derived[name]
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        ensure_dir(self.path.parent)
+        tmp = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._entries, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
 def params_sha256(params: Any) -> str:
     """
     Hash an arbitrary JSON-serializable structure deterministically.
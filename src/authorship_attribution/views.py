@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import StandardScaler
+
+from authorship_attribution import telemetry
+from authorship_attribution.features import (
+    _FW_VOCAB,
+    StyleTally,
+    _char_tallies,
+    _word_re,
+)
+
+
+@dataclass
+class PreparedBatch:
+    """
+    Texts normalised and tokenized once, shared by every view.
+
+    lower: lowercased texts
+    norm: what char-level views see (lower, or the raw text when the
+          extractor keeps case)
+    tokens: per text, the regex word tokens of `lower`
+    char_tallies: (N, 13) raw character-class counts of the raw texts
+
+    Token offsets are derived on demand (spans()); regex findall is several
+    times cheaper than collecting match spans for every token.
+    """
+
+    texts: List[str]
+    lower: List[str]
+    norm: List[str]
+    tokens: List[List[str]]
+    char_tallies: np.ndarray
+
+    @classmethod
+    def from_texts(cls, texts: Sequence[str], lowercase: bool = True) -> "PreparedBatch":
+        texts = list(texts)
+        lower = [t.lower() for t in texts]
+        tokens = [_word_re.findall(t) for t in lower]
+        tallies = (
+            np.vstack([_char_tallies(t) for t in texts])
+            if texts
+            else np.zeros((0, 13), dtype=np.int64)
+        )
+        return cls(
+            texts=texts,
+            lower=lower,
+            norm=lower if lowercase else texts,
+            tokens=tokens,
+            char_tallies=tallies,
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def spans(self, i: int) -> np.ndarray:
+        """
+        (k, 2) int32 start/end offsets of text i's tokens in lower[i].
+        """
+        return np.array(
+            [m.span() for m in _word_re.finditer(self.lower[i])], dtype=np.int32
+        ).reshape(-1, 2)
+
+
+class TokenNgrams:
+    """
+    Picklable analyzer turning a token list into word n-grams.
+    """
+
+    def __init__(self, ngram_range: Tuple[int, int]):
+        self.ngram_range = tuple(ngram_range)
+
+    def __call__(self, tokens: List[str]) -> List[str]:
+        lo, hi = self.ngram_range
+        out: List[str] = []
+        for n in range(lo, hi + 1):
+            if n == 1:
+                out.extend(tokens)
+            else:
+                out.extend(" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+        return out
+
+
+class View(ABC):
+    """
+    One block of output columns computed from a PreparedBatch.
+    """
+
+    name: str = ""
+
+    @property
+    @abstractmethod
+    def dim(self) -> int: ...
+
+    @abstractmethod
+    def fit(self, batch: PreparedBatch) -> None: ...
+
+    @abstractmethod
+    def transform(self, batch: PreparedBatch) -> np.ndarray: ...
+
+    def state_arrays(self) -> List[np.ndarray]:
+        """
+        Fitted arrays that determine the output (for fingerprints).
+        """
+        return []
+
+    def params(self) -> Dict[str, object]:
+        return {}
+
+
+def _tfidf_svd_state(vec: TfidfVectorizer, svd: TruncatedSVD) -> List[np.ndarray]:
+    terms = sorted(vec.vocabulary_.items(), key=lambda kv: kv[1])
+    return [
+        np.frombuffer("\0".join(t for t, _ in terms).encode("utf-8"), dtype=np.uint8),
+        np.asarray(vec.idf_),
+        np.asarray(svd.components_),
+    ]
+
+
+@dataclass
+class CharNgramView(View):
+    """
+    Char n-gram TF-IDF + SVD over the shared normalised strings.
+    """
+
+    ngram_range: Tuple[int, int] = (3, 5)
+    max_features: int = 50_000
+    svd_dim: int = 256
+    min_df: int = 2
+    random_state: int = 42
+    name: str = "char"
+    vec: TfidfVectorizer = field(init=False, repr=False)
+    svd: TruncatedSVD = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Lowercasing already happened in PreparedBatch
+        self.vec = TfidfVectorizer(
+            analyzer="char",
+            ngram_range=self.ngram_range,
+            lowercase=False,
+            min_df=self.min_df,
+            max_features=self.max_features,
+            sublinear_tf=True,
+            dtype=np.float32,  # type: ignore[arg-type]
+        )
+        self.svd = TruncatedSVD(
+            n_components=self.svd_dim,
+            random_state=self.random_state,
+            algorithm="randomized",
+        )
+
+    @property
+    def dim(self) -> int:
+        return self.svd_dim
+
+    def fit(self, batch: PreparedBatch) -> None:
+        self.svd.fit(self.vec.fit_transform(batch.norm))
+
+    def transform(self, batch: PreparedBatch) -> np.ndarray:
+        with telemetry.timer("aa_stage_seconds", stage="vectorize"):
+            X = self.vec.transform(batch.norm)
+        with telemetry.timer("aa_stage_seconds", stage="svd"):
+            return self.svd.transform(X)
+
+    def state_arrays(self) -> List[np.ndarray]:
+        return _tfidf_svd_state(self.vec, self.svd)
+
+    def params(self) -> Dict[str, object]:
+        return {
+            "ngram_range": list(self.ngram_range),
+            "max_features": self.max_features,
+            "svd_dim": self.svd_dim,
+            "min_df": self.min_df,
+        }
+
+
+@dataclass
+class StyleView(View):
+    """
+    Function-word frequencies and light stylistic ratios (standardised),
+    built from the shared tokens and char tallies.
+    """
+
+    name: str = "style"
+    scaler: StandardScaler | None = field(default=None, init=False, repr=False)
+
+    @property
+    def dim(self) -> int:
+        return len(_FW_VOCAB) + 14
+
+    def _raw(self, batch: PreparedBatch) -> np.ndarray:
+        X = np.zeros((len(batch), self.dim), dtype=np.float32)
+        for i in range(len(batch)):
+            tally = StyleTally(chars=batch.char_tallies[i].copy())
+            tally.add_tokens(batch.tokens[i])
+            X[i] = tally.features()
+        return X
+
+    def fit(self, batch: PreparedBatch) -> None:
+        self.scaler = StandardScaler().fit(self._raw(batch))
+
+    def transform(self, batch: PreparedBatch) -> np.ndarray:
+        if self.scaler is None:
+            raise RuntimeError("Style scaler not initialized; call fit() first.")
+        with telemetry.timer("aa_stage_seconds", stage="stylometric"):
+            return self.scaler.transform(self._raw(batch))
+
+    def state_arrays(self) -> List[np.ndarray]:
+        if self.scaler is None:
+            return []
+        return [np.asarray(self.scaler.mean_), np.asarray(self.scaler.scale_)]
+
+
+@dataclass
+class WordNgramView(View):
+    """
+    Word n-gram TF-IDF + SVD over the shared tokens (no re-tokenizing).
+    """
+
+    ngram_range: Tuple[int, int] = (1, 2)
+    max_features: int = 50_000
+    svd_dim: int = 128
+    min_df: int = 2
+    random_state: int = 42
+    name: str = "word"
+    vec: TfidfVectorizer = field(init=False, repr=False)
+    svd: TruncatedSVD = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.vec = TfidfVectorizer(
+            analyzer=TokenNgrams(self.ngram_range),
+            min_df=self.min_df,
+            max_features=self.max_features,
+            sublinear_tf=True,
+            dtype=np.float32,  # type: ignore[arg-type]
+        )
+        self.svd = TruncatedSVD(
+            n_components=self.svd_dim,
+            random_state=self.random_state,
+            algorithm="randomized",
+        )
+
+    @property
+    def dim(self) -> int:
+        return self.svd_dim
+
+    def fit(self, batch: PreparedBatch) -> None:
+        self.svd.fit(self.vec.fit_transform(batch.tokens))
+
+    def transform(self, batch: PreparedBatch) -> np.ndarray:
+        with telemetry.timer("aa_stage_seconds", stage="word_ngrams"):
+            return self.svd.transform(self.vec.transform(batch.tokens))
+
+    def state_arrays(self) -> List[np.ndarray]:
+        return _tfidf_svd_state(self.vec, self.svd)
+
+    def params(self) -> Dict[str, object]:
+        return {
+            "ngram_range": list(self.ngram_range),
+            "max_features": self.max_features,
+            "svd_dim": self.svd_dim,
+            "min_df": self.min_df,
+        }
+
+
+# name -> factory(extractor) building the view from the extractor's settings
+VIEW_REGISTRY: Dict[str, Callable[["MultiViewExtractor"], View]] = {
+    "char": lambda ex: CharNgramView(
+        ngram_range=ex.char_ngram_range,
+        max_features=ex.max_char_features,
+        svd_dim=ex.svd_dim,
+        min_df=ex.min_df,
+        random_state=ex.random_state,
+    ),
+    "style": lambda ex: StyleView(),
+    "word": lambda ex: WordNgramView(
+        ngram_range=ex.word_ngram_range,
+        max_features=ex.max_word_features,
+        svd_dim=ex.word_svd_dim,
+        min_df=ex.min_df if ex.word_min_df is None else ex.word_min_df,
+        random_state=ex.random_state,
+    ),
+}
+
+
+def register_view(name: str, factory: Callable[["MultiViewExtractor"], View]) -> None:
+    """
+    Make a new view selectable by name (e.g. in train(views=...)).
+    """
+    VIEW_REGISTRY[name] = factory
+
+
+@dataclass
+class MultiViewExtractor:
+    """
+    Extractor assembled from named views over one shared preprocessing pass.
+
+    Each batch is normalised and tokenized once into a PreparedBatch; every
+    view reads from it and their outputs are concatenated in `views` order.
+    views=("char", "style") reproduces FeatureExtractor's output.
+    """
+
+    views: Tuple[str, ...] = ("char", "style")
+    char_ngram_range: Tuple[int, int] = (3, 5)
+    max_char_features: int = 50_000
+    svd_dim: int = 256
+    word_ngram_range: Tuple[int, int] = (1, 2)
+    max_word_features: int = 50_000
+    word_svd_dim: int = 128
+    text_lowercase: bool = True
+    random_state: int = 42
+    min_df: int = 2
+    word_min_df: int | float | None = None  # word view; None: same as min_df
+    window_chars: int | None = None  # document mode is not supported here
+
+    components: List[View] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.views = tuple(self.views)
+        unknown = [v for v in self.views if v not in VIEW_REGISTRY]
+        if unknown or not self.views:
+            raise ValueError(
+                f"Unknown views {unknown}; available: {sorted(VIEW_REGISTRY)}"
+            )
+        self.components = [VIEW_REGISTRY[v](self) for v in self.views]
+
+    @property
+    def output_dim(self) -> int:
+        return sum(v.dim for v in self.components)
+
+    @property
+    def use_function_words(self) -> bool:
+        return "style" in self.views
+
+    def set_document_mode(self, window_chars: int | None, **_: object) -> "MultiViewExtractor":
+        if window_chars is not None:
+            raise ValueError("Windowed document mode needs FeatureExtractor (no views).")
+        return self
+
+    def prepare(self, texts: Sequence[str]) -> PreparedBatch:
+        with telemetry.timer("aa_stage_seconds", stage="preprocess"):
+            return PreparedBatch.from_texts(texts, lowercase=self.text_lowercase)
+
+    def fit(self, texts: List[str]) -> "MultiViewExtractor":
+        batch = self.prepare(texts)
+        for view in self.components:
+            view.fit(batch)
+        return self
+
+    def transform(self, texts: List[str]) -> np.ndarray:
+        batch = self.prepare(texts)
+        blocks = [view.transform(batch) for view in self.components]
+        return np.hstack(blocks).astype(np.float32, copy=False)
+
+    def transform_iter(
+        self, texts: Sequence[str], batch_size: int = 4096
+    ) -> Iterator[np.ndarray]:
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        for start in range(0, len(texts), batch_size):
+            yield self.transform(list(texts[start : start + batch_size]))
+
+    def fingerprint(self) -> str:
+        h = hashlib.sha256()
+        params = {
+            "views": list(self.views),
+            "text_lowercase": self.text_lowercase,
+            "view_params": [v.params() for v in self.components],
+        }
+        h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+        for view in self.components:
+            for arr in view.state_arrays():
+                h.update(np.ascontiguousarray(arr).tobytes())
+        return h.hexdigest()
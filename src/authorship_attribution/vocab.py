@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+
+def _hash_codes(codes: np.ndarray, seed: int) -> np.ndarray:
+    """
+    64-bit FNV-style hash of each row of (m, width) uint32 code points.
+    """
+    h = np.full(codes.shape[0], np.uint64(0xCBF29CE484222325) ^ np.uint64(seed))
+    with np.errstate(over="ignore"):
+        for j in range(codes.shape[1]):
+            h ^= codes[:, j].astype(np.uint64)
+            h *= _FNV_PRIME
+    return h
+
+
+def dict_nbytes(vocab: Dict[str, int]) -> int:
+    """
+    Approximate resident size of a term -> column dict.
+    """
+    return sys.getsizeof(vocab) + sum(
+        sys.getsizeof(k) + sys.getsizeof(v) for k, v in vocab.items()
+    )
+
+
+@dataclass
+class CompactVocabulary:
+    """
+    N-gram vocabulary as numpy arrays instead of a dict of Python strings.
+
+    Terms are stored as fixed-width UTF-32 (`width` code points), ordered
+    by a seeded 64-bit hash of their code points. A batch lookup hashes the
+    query n-grams, binary-searches the sorted keys and confirms each hit
+    against the stored term, so results are exactly the dict's. The seed is
+    chosen at build time so that no two terms share a key.
+    """
+
+    terms: np.ndarray  # (V,) <U{width}, in key order
+    keys: np.ndarray  # (V,) uint64, sorted
+    columns: np.ndarray  # (V,) int32 feature column of each term
+    lengths: np.ndarray  # (V,) int16 term lengths
+    seed: int = 0
+
+    @property
+    def width(self) -> int:
+        return self.terms.dtype.itemsize // 4
+
+    def __len__(self) -> int:
+        return int(len(self.terms))
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self.terms.nbytes
+            + self.keys.nbytes
+            + self.columns.nbytes
+            + self.lengths.nbytes
+        )
+
+    @classmethod
+    def supports(cls, vocab: Dict[str, int]) -> bool:
+        # NUL is numpy's string padding, so such terms cannot be stored exactly
+        return all("\x00" not in t for t in vocab)
+
+    @classmethod
+    def from_dict(cls, vocab: Dict[str, int], width: int = 0) -> "CompactVocabulary":
+        if not cls.supports(vocab):
+            raise ValueError("Terms containing NUL characters cannot be compacted.")
+        items = list(vocab.items())
+        width = max([width, 1, *(len(t) for t, _ in items)])
+        terms = np.array([t for t, _ in items], dtype=f"<U{width}")
+        columns = np.array([c for _, c in items], dtype=np.int32)
+        lengths = np.array([len(t) for t, _ in items], dtype=np.int16)
+        codes = terms.view(np.uint32).reshape(len(terms), width)
+        for seed in range(64):
+            keys = _hash_codes(codes, seed)
+            order = np.argsort(keys, kind="stable")
+            keys = keys[order]
+            if not (keys[1:] == keys[:-1]).any():
+                return cls(
+                    terms=terms[order],
+                    keys=keys,
+                    columns=columns[order],
+                    lengths=lengths[order],
+                    seed=seed,
+                )
+        raise RuntimeError("Could not find a collision-free hash seed.")
+
+    def __getstate__(self) -> dict:
+        # Pickle as one UTF-8 blob in column order; the arrays are rebuilt on
+        # load, which keeps bundles smaller than a pickled dict
+        order = np.argsort(self.columns, kind="stable")
+        blob = "\0".join(self.terms[order].tolist()).encode("utf-8")
+        columns = self.columns[order]
+        if np.array_equal(columns, np.arange(len(columns))):
+            columns = None  # the usual 0..V-1, implied by the order
+        return {
+            "blob": blob,
+            "columns": columns,
+            "width": self.width,
+            "seed": self.seed,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        width, seed = state["width"], state["seed"]
+        blob = state["blob"].decode("utf-8")
+        terms = np.array(blob.split("\0") if blob else [], dtype=f"<U{width}")
+        columns = state["columns"]
+        if columns is None:
+            columns = np.arange(len(terms))
+        columns = np.asarray(columns, dtype=np.int32)
+        keys = _hash_codes(terms.view(np.uint32).reshape(len(terms), width), seed)
+        order = np.argsort(keys, kind="stable")
+        self.terms = terms[order]
+        self.keys = keys[order]
+        self.columns = columns[order]
+        self.lengths = np.char.str_len(self.terms).astype(np.int16)
+        self.seed = seed
+
+    def to_dict(self) -> Dict[str, int]:
+        return {str(t): int(c) for t, c in zip(self.terms.tolist(), self.columns)}
+
+    def terms_by_column(self) -> List[str]:
+        """
+        Terms ordered by feature column (as vocabulary_ sorted by value).
+        """
+        return self.terms[np.argsort(self.columns, kind="stable")].tolist()
+
+    def lookup(self, grams: Sequence[str], check_lengths: bool = True) -> np.ndarray:
+        """
+        Feature column of each n-gram, -1 if it is not in the vocabulary.
+
+        Grams longer than `width` are truncated and trailing NULs dropped by
+        the fixed-width conversion, so lengths are compared too unless the
+        caller knows neither can occur (check_lengths=False).
+        """
+        m = len(grams)
+        if m == 0 or len(self) == 0:
+            return np.full(m, -1, dtype=np.int64)
+        q = np.array(grams, dtype=self.terms.dtype)  # longer grams are truncated
+        codes = q.view(np.uint32).reshape(m, self.width)
+        keys = _hash_codes(codes, self.seed)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self) - 1)
+        hit = (self.keys[pos] == keys) & (self.terms[pos] == q)
+        if check_lengths:
+            lens = np.fromiter(map(len, grams), dtype=np.int64, count=m)
+            hit &= self.lengths[pos] == lens
+        return np.where(hit, self.columns[pos], -1).astype(np.int64)
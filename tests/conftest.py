@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from authorship_attribution.features import FeatureExtractor
+from authorship_attribution.models import ModelBundle, pairwise_features
+from authorship_attribution.utils import ModelMeta
+
+_WORDS = (
+    "the of and to in that it was he she for on with as his her at by "
+    "quiet river stone lantern harbour meadow thunder velvet copper whisper "
+    "gallant ember frost orchard cinder marble willow saffron tundra beacon"
+).split()
+
+
+def _author_texts(author: int, n: int, rng: np.random.Generator) -> List[str]:
+    # Each author favours its own slice of the vocabulary and punctuation
+    weights = np.ones(len(_WORDS))
+    weights[author * 5 : author * 5 + 8] += 6.0
+    weights /= weights.sum()
+    mark = ",;:!?"[author % 5]
+    texts = []
+    for _ in range(n):
+        words = rng.choice(_WORDS, size=int(rng.integers(40, 90)), p=weights)
+        sentences = [" ".join(words[i : i + 9]) for i in range(0, len(words), 9)]
+        texts.append(f"{mark} ".join(s.capitalize() for s in sentences) + ".")
+    return texts
+
+
+@pytest.fixture(scope="session")
+def corpus() -> tuple[List[str], List[int]]:
+    rng = np.random.default_rng(0)
+    texts: List[str] = []
+    labels: List[int] = []
+    for author in range(4):
+        texts += _author_texts(author, 8, rng)
+        labels += [author] * 8
+    return texts, labels
+
+
+@pytest.fixture(scope="session")
+def extractor(corpus) -> FeatureExtractor:
+    texts, _ = corpus
+    return FeatureExtractor(
+        char_ngram_range=(2, 4), max_char_features=2_000, svd_dim=16, min_df=1
+    ).fit(texts)
+
+
+@pytest.fixture(scope="session")
+def bundle(corpus, extractor) -> ModelBundle:
+    texts, labels = corpus
+    X = extractor.transform(texts)
+    i, j = np.triu_indices(len(texts), k=1)
+    y = (np.asarray(labels)[i] == np.asarray(labels)[j]).astype(int)
+    pf = pairwise_features(X[i], X[j])
+    scaler = StandardScaler().fit(pf)
+    clf = LogisticRegression(max_iter=1000).fit(scaler.transform(pf), y)
+    meta = ModelMeta(
+        feature_dim=int(X.shape[1]),
+        svd_dim=extractor.svd_dim,
+        char_ngram_range=extractor.char_ngram_range,
+        max_char_features=extractor.max_char_features,
+        use_function_words=extractor.use_function_words,
+        text_lowercase=extractor.text_lowercase,
+        tokenizer="char",
+    )
+    return ModelBundle(extractor, clf, 0.5, meta, pair_scaler=scaler)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from authorship_attribution.accumulator import DocumentAccumulator
+
+# Chunk boundaries that split whitespace runs, words and runs of dots
+_TRICKY = [
+    "Hello  ", "  world...", "..", ". Dots....", "don'",
+    "t stop\n", "\n\n", "end  \t", " ΣΟΦΙΑ", "!",
+]
+
+
+def _chunks(text: str, n: int, rng: np.random.Generator) -> list[str]:
+    cuts = np.sort(rng.choice(np.arange(1, len(text)), size=n, replace=False))
+    return [text[i:j] for i, j in zip([0, *cuts], [*cuts, len(text)])]
+
+
+@pytest.mark.parametrize("doc", range(4))
+def test_matches_transform(extractor, corpus, doc):
+    texts, _ = corpus
+    rng = np.random.default_rng(doc)
+    parts = _chunks(texts[doc] + " " + texts[doc + 8], 12, rng)
+    acc = DocumentAccumulator(extractor)
+    for k, part in enumerate(parts):
+        acc.append(part)
+        full = "".join(parts[: k + 1])
+        np.testing.assert_allclose(
+            acc.embedding(), extractor.transform([full])[0], atol=1e-6
+        )
+
+
+def test_tricky_boundaries_and_state_round_trip(extractor):
+    acc = DocumentAccumulator(extractor).extend(_TRICKY)
+    text = "".join(_TRICKY)
+    np.testing.assert_allclose(acc.embedding(), extractor.transform([text])[0], atol=1e-6)
+
+    restored = DocumentAccumulator.loads(extractor, acc.dumps())
+    restored.append(" more text here.")
+    np.testing.assert_allclose(
+        restored.embedding(),
+        extractor.transform([text + " more text here."])[0],
+        atol=1e-6,
+    )
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from authorship_attribution.async_verifier import AsyncVerifier
+from authorship_attribution.models import Verifier
+
+
+def _blocking_verifier(bundle, monkeypatch, **kwargs) -> tuple[AsyncVerifier, threading.Event]:
+    av = AsyncVerifier(bundle, max_workers=1, max_batch_size=1, max_wait_ms=0, **kwargs)
+    release = threading.Event()
+    verify_batch = av._verifier.verify_batch
+
+    def slow_verify_batch(texts_a, texts_b):
+        release.wait(timeout=10)
+        return verify_batch(texts_a, texts_b)
+
+    monkeypatch.setattr(av._verifier, "verify_batch", slow_verify_batch)
+    return av, release
+
+
+async def _wait_until(cond) -> None:
+    for _ in range(500):
+        if cond():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition never became true")
+
+
+def test_verify_matches_verifier(bundle, corpus):
+    texts, _ = corpus
+
+    async def main():
+        async with AsyncVerifier(bundle) as av:
+            return await av.verify(texts[0], texts[1])
+
+    res = asyncio.run(main())
+    expected = Verifier(bundle).verify(texts[0], texts[1])
+    assert res["probability_same_author"] == pytest.approx(
+        expected["probability_same_author"], abs=1e-6
+    )
+
+
+def test_aclose_fails_held_batch(bundle, corpus, monkeypatch):
+    texts, _ = corpus
+
+    async def main():
+        av, release = _blocking_verifier(bundle, monkeypatch)
+        await av.start()
+        first = asyncio.create_task(av.verify(texts[0], texts[1]))
+        await _wait_until(lambda: len(av._inflight) == 1)
+        # The batcher takes this one off the queue, then waits for a slot
+        second = asyncio.create_task(av.verify(texts[2], texts[3]))
+        await _wait_until(lambda: len(av._held) == 1)
+        close = asyncio.create_task(av.aclose())
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.wait_for(close, 10)
+        assert "probability_same_author" in await asyncio.wait_for(first, 10)
+        with pytest.raises(RuntimeError, match="closed"):
+            await asyncio.wait_for(second, 10)
+
+    asyncio.run(main())
+
+
+def test_aclose_fails_blocked_producers(bundle, corpus, monkeypatch):
+    texts, _ = corpus
+
+    async def main():
+        av, release = _blocking_verifier(bundle, monkeypatch, max_queue=1)
+        await av.start()
+        calls = [asyncio.create_task(av.verify(texts[0], texts[i])) for i in range(1, 6)]
+        # One scoring, one held, one queued, the rest blocked on the full queue
+        await _wait_until(lambda: len(av._held) == 1 and av._queue.full())
+        close = asyncio.create_task(av.aclose())
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.wait_for(close, 10)
+        results = await asyncio.wait_for(
+            asyncio.gather(*calls, return_exceptions=True), 10
+        )
+        assert "probability_same_author" in results[0]
+        assert all(
+            isinstance(r, RuntimeError) and "closed" in str(r) for r in results[1:]
+        )
+
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import json
+import sys
+
+import pytest
+
+from authorship_attribution.cli import verify_main
+
+
+@pytest.fixture
+def model_path(tmp_path, bundle):
+    path = tmp_path / "model.joblib"
+    bundle.save(str(path))
+    return str(path)
+
+
+def test_verify_accepts_empty_text(model_path, monkeypatch, capsys):
+    argv = ["aa-verify", "--model", model_path, "--text-a", "", "--text-b", "Some text."]
+    monkeypatch.setattr(sys, "argv", argv)
+    assert verify_main() == 0
+    assert "probability_same_author" in json.loads(capsys.readouterr().out)
+
+
+def test_verify_rejects_pairs_with_empty_text(model_path, monkeypatch):
+    argv = ["aa-verify", "--model", model_path, "--pairs", "p.csv", "--text-a", ""]
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit):
+        verify_main()
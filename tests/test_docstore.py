@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from authorship_attribution.docstore import DocumentStore
+
+
+def _emb(n: int, dim: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def _store(tmp_path, extractor, **kwargs) -> DocumentStore:
+    kwargs.setdefault("max_segments", 100)
+    kwargs.setdefault("max_dead_fraction", 1.0)
+    return DocumentStore.create(tmp_path / "store", extractor, **kwargs)
+
+
+def test_add_get_reopen(tmp_path, extractor):
+    store = _store(tmp_path, extractor)
+    emb = _emb(5, store.dim, 0)
+    store.add([f"d{i}" for i in range(5)], emb)
+    reopened = DocumentStore.open(tmp_path / "store")
+    assert len(reopened) == 5
+    np.testing.assert_array_equal(reopened.get(["d3", "d0"]), emb[[3, 0]])
+    with pytest.raises(KeyError):
+        reopened.get(["nope"])
+
+
+def test_remove_readd_compact_bookkeeping(tmp_path, extractor):
+    store = _store(tmp_path, extractor)
+    first = _emb(4, store.dim, 1)
+    store.add(["d0", "d1", "d2", "d3"], first)
+
+    assert store.remove(["d1", "d1"]) == 1
+    assert len(store) == 3 and store.n_rows == 4
+    assert store.remove(["d1", "missing"]) == 0
+    assert len(store) == 3
+
+    # Re-adding replaces the live row only
+    second = _emb(2, store.dim, 2)
+    store.add(["d1", "d2"], second)
+    assert len(store) == 4 and store.n_rows == 6
+    assert [s["live"] for s in store.manifest["segments"]] == [2, 2]
+
+    store.compact()
+    assert len(store) == 4 and store.n_rows == 4
+    assert len(store.segments) == 1
+    np.testing.assert_array_equal(
+        store.get(["d0", "d1", "d2", "d3"]),
+        np.vstack([first[0], second[0], second[1], first[3]]),
+    )
+    ids = np.concatenate([ids for ids, _ in store.iter_live()])
+    assert sorted(ids.tolist()) == ["d0", "d1", "d2", "d3"]
+
+
+def test_dead_fraction_triggers_compaction(tmp_path, extractor):
+    store = _store(tmp_path, extractor, max_dead_fraction=0.25)
+    store.add([f"d{i}" for i in range(8)], _emb(8, store.dim, 3))
+    store.remove(["d0", "d0", "d1"])
+    assert len(store.segments) == 1 and store.n_rows == 8
+    store.remove(["d2"])
+    assert store.n_rows == len(store) == 5
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from authorship_attribution.features import FeatureExtractor
+
+
+def test_random_windows_depend_on_content_not_length():
+    ex = FeatureExtractor(window_chars=10, max_doc_chars=30, window_sampling="random")
+    # Distinct characters, so every window occurs once
+    a = "".join(chr(0x4E00 + i) for i in range(200))
+    b = "".join(chr(0x5000 + i) for i in range(200))
+    assert len(a) == len(b)
+    assert ex._doc_windows(a) == ex._doc_windows(a)
+    assert len(ex._doc_windows(a)) == 3
+    starts_a = [a.index(w) for w in ex._doc_windows(a)]
+    starts_b = [b.index(w) for w in ex._doc_windows(b)]
+    assert starts_a != starts_b
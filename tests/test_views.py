@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from authorship_attribution.views import MultiViewExtractor, View
+
+
+def test_view_is_abstract():
+    with pytest.raises(TypeError):
+        View()
+
+
+def test_multiview_columns_follow_views(corpus):
+    texts, _ = corpus
+    mv = MultiViewExtractor(
+        views=("char", "style", "word"),
+        max_char_features=2_000,
+        svd_dim=8,
+        max_word_features=500,
+        word_svd_dim=4,
+        min_df=1,
+    ).fit(texts)
+    X = mv.transform(texts[:5])
+    assert X.shape == (5, mv.output_dim)
+    assert X.dtype == np.float32
+    np.testing.assert_array_equal(X, mv.transform(texts[:5]))
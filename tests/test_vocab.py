@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pickle
+
+import numpy as np
+import pytest
+
+from authorship_attribution.features import FeatureExtractor
+from authorship_attribution.vocab import CompactVocabulary
+
+_EXTRA = ["", "a", "ab\x00cd x\x00y", "ÉÇ  ünïcode 日本語 text", "x" * 3000, "  \t\n  "]
+
+
+def test_round_trips_dict():
+    vocab = {"abc": 2, "b c": 0, "日本語": 3, "zz": 1}
+    cv = CompactVocabulary.from_dict(vocab)
+    assert cv.to_dict() == vocab
+    assert cv.terms_by_column() == ["b c", "zz", "abc", "日本語"]
+    np.testing.assert_array_equal(
+        cv.lookup(["zz", "nope", "abc", "日本語"], check_lengths=False), [1, -1, 2, 3]
+    )
+    assert pickle.loads(pickle.dumps(cv)).to_dict() == vocab
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"text_lowercase": False}, {"char_ngram_range": (1, 3)}, {"window_chars": 120}],
+)
+def test_bit_identical_to_dict_path(corpus, kwargs):
+    texts, _ = corpus
+    params = dict(max_char_features=3_000, svd_dim=16, min_df=1, **kwargs)
+    ref = FeatureExtractor(compact_vocabulary=False, **params).fit(texts)
+    ex = FeatureExtractor(**params).fit(texts)
+    assert ex.vocab is not None and ref.vocab is None
+    assert ex.fingerprint() == ref.fingerprint()
+
+    docs = texts + _EXTRA
+    A = ref.char_vec.transform(docs)
+    B = ex._char_tfidf(docs)
+    assert A.dtype == B.dtype
+    np.testing.assert_array_equal(A.indptr, B.indptr)
+    np.testing.assert_array_equal(A.indices, B.indices)
+    np.testing.assert_array_equal(A.data, B.data)
+    np.testing.assert_array_equal(ref.transform(docs), ex.transform(docs))
+    assert pickle.loads(pickle.dumps(ex)).transform(docs[:3]).tobytes() == (
+        ex.transform(docs[:3]).tobytes()
+    )